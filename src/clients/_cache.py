@@ -0,0 +1,94 @@
+"""
+Cache em disco para respostas de APIs externas.
+
+Cada entrada é um arquivo JSON em `base_dir` com o valor e o instante em que
+foi gravado; a validade é conferida na leitura, contra o TTL informado.
+
+Exemplo de uso:
+    >>> from src.clients._cache import FileCache
+    >>>
+    >>> cache = FileCache(".cache/bcb", ttl=3600)
+    >>> cache.set("chave", [{"date": "2023-01-01", "value": 13.75}])
+    >>> cache.get("chave")
+    [{'date': '2023-01-01', 'value': 13.75}]
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class FileCache:
+    """
+    Cache chave → valor (JSON) persistido em arquivos.
+    
+    Attributes:
+        base_dir: Diretório onde as entradas são gravadas
+        ttl: Validade padrão das entradas, em segundos
+    """
+    
+    def __init__(self, base_dir: Union[str, Path], ttl: float = 24 * 3600):
+        """
+        Inicializa o cache, criando o diretório se necessário.
+        
+        Args:
+            base_dir: Diretório das entradas
+            ttl: Validade padrão em segundos (float("inf") = sem expiração)
+        """
+        self.base_dir = Path(base_dir)
+        self.ttl = ttl
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        return self.base_dir / f"{key}.json"
+    
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Lê uma entrada, se existir e estiver dentro da validade.
+        
+        Args:
+            key: Chave da entrada (usada como nome do arquivo)
+            ttl: Validade em segundos para esta leitura (padrão: self.ttl)
+        
+        Returns:
+            Valor armazenado, ou None se ausente, expirado ou ilegível
+        """
+        ttl = self.ttl if ttl is None else ttl
+        
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get("ts", 0) >= ttl:
+            return None
+        
+        return entry.get("value")
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Grava uma entrada de forma atômica (arquivo temporário + os.replace).
+        
+        Args:
+            key: Chave da entrada
+            value: Valor serializável em JSON
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"ts": time.time(), "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("cache_write_failed", key=key, error=str(e))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
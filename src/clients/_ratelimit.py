@@ -0,0 +1,77 @@
+"""
+Rate limiting para clientes de APIs externas.
+
+Token bucket simples: até `capacity` requisições saem imediatamente e, a
+partir daí, o ritmo fica limitado a `rate` requisições por segundo. Só há
+espera quando o orçamento se esgota.
+
+Exemplo de uso:
+    >>> from src.clients._ratelimit import TokenBucket
+    >>>
+    >>> limiter = TokenBucket(rate=10)
+    >>> limiter.acquire()  # bloqueia apenas se não houver token disponível
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe com versões síncrona e assíncrona de acquire.
+    
+    Attributes:
+        rate: Tokens repostos por segundo (requisições/s em regime)
+        capacity: Máximo de tokens acumulados (tamanho da rajada)
+        tokens: Tokens disponíveis (negativo = reservas aguardando)
+        last_refill: Instante (time.monotonic) da última reposição
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Inicializa o bucket cheio.
+        
+        Args:
+            rate: Requisições por segundo
+            capacity: Tamanho da rajada (padrão: max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError(f"rate deve ser positivo, recebido: {rate}")
+        
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        Repõe tokens pelo tempo decorrido e reserva um.
+        
+        Returns:
+            Segundos a esperar até o token reservado estar disponível
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            self.tokens -= 1
+            
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def acquire(self) -> None:
+        """Obtém um token, dormindo apenas se o orçamento estiver esgotado."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def aacquire(self) -> None:
+        """Versão assíncrona de acquire (não bloqueia o event loop)."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
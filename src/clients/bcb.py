@@ -9,6 +9,8 @@ Exemplo de uso:
     >>> 
     >>> client = BCBClient()
     >>> 
+    >>> # Ou, fechando as conexões ao final: with BCBClient() as client: ...
+    >>> 
     >>> # Buscar uma série (IPCA - código 433)
     >>> ipca_data = client.fetch_series(433, start_date="01/01/2023", end_date="31/12/2023")
     >>> 
@@ -19,14 +21,52 @@ Exemplo de uso:
     ...     "igpm": 189
     ... }
     >>> data = client.fetch_multiple_series(series_map)
+    >>> 
+    >>> # Reaproveitar séries já buscadas entre execuções
+    >>> from src.clients._cache import FileCache
+    >>> cached_client = BCBClient(cache=FileCache(".cache/bcb"))
+    >>> 
+    >>> # Buscar múltiplas séries concorrentemente (requer aiohttp)
+    >>> async_client = BCBClient(use_async=True)
+    >>> data = async_client.fetch_multiple_series(series_map)
 """
 
+import asyncio
+import hashlib
+import json
+import random
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
 import requests
 import structlog
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+from src.clients._cache import FileCache
+from src.clients._ratelimit import TokenBucket
 
 logger = structlog.get_logger(__name__)
 
@@ -43,6 +83,13 @@ class BCBClient:
         timeout: Timeout em segundos para requisições HTTP
         max_retries: Número máximo de tentativas em caso de falha
         retry_delay: Delay inicial em segundos para retry (com backoff exponencial)
+        max_backoff: Teto em segundos para a espera entre tentativas
+        rate_limit: Máximo de requisições por segundo à API
+        use_async: Se True, fetch_multiple_series busca as séries
+            concorrentemente com aiohttp (se instalado)
+        max_concurrency: Máximo de requisições simultâneas em fetch_multiple_series
+        cache: Cache em disco das séries já processadas (opcional)
+        session: Sessão HTTP compartilhada (keep-alive entre requisições)
     """
     
     # Séries diárias (dados disponíveis D+1)
@@ -53,6 +100,18 @@ class BCBClient:
         10814,  # GBP/BRL
     }
     
+    # Validade do cache: janelas encerradas há mais de 60 dias não mudam mais;
+    # as recentes ainda podem receber revisões/novos pontos
+    CACHE_FROZEN_AFTER = timedelta(days=60)
+    CACHE_RECENT_TTL = 3600
+    
+    # Respostas acima deste tamanho são decodificadas em streaming (ijson),
+    # sem manter o corpo inteiro em memória junto com a lista decodificada
+    STREAM_MIN_BYTES = 8 * 1024 * 1024
+    
+    # Status que merecem nova tentativa e podem trazer Retry-After
+    RETRY_AFTER_STATUSES = {429, 503}
+    
     # Séries mensais (dados disponíveis após fim do mês)
     MONTHLY_SERIES = {
         432,    # Selic
@@ -72,7 +131,12 @@ class BCBClient:
         base_url: str = "https://api.bcb.gov.br/dados/serie/bcdata.sgs",
         timeout: int = 60,
         max_retries: int = 3,
-        retry_delay: int = 1
+        retry_delay: int = 1,
+        max_backoff: float = 30,
+        rate_limit: float = 10,
+        use_async: bool = False,
+        max_concurrency: int = 8,
+        cache: Optional[FileCache] = None
     ):
         """
         Inicializa o cliente BCB.
@@ -82,11 +146,32 @@ class BCBClient:
             timeout: Timeout em segundos para requisições
             max_retries: Número máximo de tentativas em caso de falha
             retry_delay: Delay inicial para retry em segundos
+            max_backoff: Espera máxima entre tentativas em segundos
+            rate_limit: Requisições por segundo (token bucket compartilhado
+                pelas buscas síncronas e assíncronas)
+            use_async: Buscar múltiplas séries concorrentemente (aiohttp)
+            max_concurrency: Requisições simultâneas em fetch_multiple_series
+                (threads, ou tarefas no modo assíncrono)
+            cache: FileCache para reaproveitar séries entre execuções
+                (ex.: FileCache(".cache/bcb")); None desativa o cache
         """
         self.base_url = base_url
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.rate_limit = rate_limit
+        self.limiter = TokenBucket(rate=rate_limit)
+        self.use_async = use_async
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        
+        # Reaproveitar conexões TCP/TLS entre séries; retries ficam no loop próprio
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+        )
         
         logger.info(
             "bcb_client_initialized",
@@ -95,6 +180,16 @@ class BCBClient:
             max_retries=max_retries
         )
     
+    def close(self) -> None:
+        """Fecha a sessão HTTP e suas conexões."""
+        self.session.close()
+    
+    def __enter__(self) -> "BCBClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
     def _is_daily_series(self, series_id: int) -> bool:
         """
         Verifica se série é diária.
@@ -172,6 +267,233 @@ class BCBClient:
         
         return start_date, end_date
     
+    def _build_request(
+        self,
+        series_id: int,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> tuple[str, Dict[str, str], str, str]:
+        """
+        Monta URL e parâmetros da requisição de uma série.
+        
+        Args:
+            series_id: Código da série
+            start_date: Data inicial (DD/MM/YYYY) ou None
+            end_date: Data final (DD/MM/YYYY) ou None
+        
+        Returns:
+            Tupla (url, params, start_date_ajustada, end_date_ajustada)
+        """
+        # VALIDAÇÃO: Ajustar datas para evitar dados futuros/não disponíveis
+        start_date, end_date = self._validate_and_adjust_dates(
+            series_id, start_date, end_date
+        )
+        
+        url = f"{self.base_url}.{series_id}/dados"
+        params = {}
+        
+        if start_date:
+            params["dataInicial"] = start_date
+        if end_date:
+            params["dataFinal"] = end_date
+        
+        logger.info(
+            "fetching_bcb_series",
+            series_id=series_id,
+            start_date=start_date,
+            end_date=end_date,
+            url=url
+        )
+        
+        return url, params, start_date, end_date
+    
+    def _handle_payload(
+        self,
+        series_id: int,
+        raw_data: List[Dict[str, str]],
+        start_date: str,
+        end_date: str,
+        attempt: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Valida e processa a resposta JSON de uma série.
+        
+        Args:
+            series_id: Código da série
+            raw_data: JSON retornado pela API
+            start_date: Data inicial usada na requisição
+            end_date: Data final usada na requisição
+            attempt: Tentativa em que a resposta foi obtida
+        
+        Returns:
+            Lista processada com 'date' e 'value'
+        """
+        # VALIDAÇÃO: Resposta vazia da API
+        if not raw_data:
+            logger.warning(
+                "api_returned_empty",
+                series_id=series_id,
+                start_date=start_date,
+                end_date=end_date,
+                message="API retornou lista vazia - série pode não ter dados no período"
+            )
+            return []
+        
+        # Processar e transformar dados
+        processed_data = self._process_series_data(raw_data)
+        
+        # VALIDAÇÃO: Detectar valores constantes suspeitos
+        if processed_data and len(processed_data) > 10:
+            unique_values = set(item['value'] for item in processed_data)
+            if len(unique_values) == 1:
+                logger.warning(
+                    "suspicious_constant_value",
+                    series_id=series_id,
+                    constant_value=processed_data[0]['value'],
+                    records_count=len(processed_data),
+                    message="Todos os registros têm o mesmo valor - pode indicar dados default/placeholder"
+                )
+        
+        logger.info(
+            "bcb_series_fetched",
+            series_id=series_id,
+            records_count=len(processed_data),
+            unique_values_count=len(set(item['value'] for item in processed_data)) if processed_data else 0,
+            attempt=attempt
+        )
+        
+        return processed_data
+    
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Espera antes da próxima tentativa.
+        
+        Usa o Retry-After do servidor quando presente (segundos ou data HTTP);
+        senão, backoff exponencial limitado a max_backoff com jitter de ±50%
+        para que clientes simultâneos não repitam as requisições juntos.
+        
+        Args:
+            attempt: Tentativa que acabou de falhar (1-based)
+            retry_after: Valor do header Retry-After, se houver
+        
+        Returns:
+            Delay em segundos
+        """
+        if isinstance(retry_after, str) and retry_after.strip():
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(self.max_backoff, max(0.0, delay))
+        
+        delay = min(self.max_backoff, self.retry_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.5)
+    
+    @classmethod
+    def _parse_json(cls, response: requests.Response) -> Any:
+        """
+        Decodifica o corpo JSON da resposta, com orjson quando disponível.
+        
+        Respostas grandes (Content-Length >= STREAM_MIN_BYTES) são lidas em
+        streaming com ijson, se instalado. Erros de decodificação viram
+        requests.exceptions.JSONDecodeError, como em response.json(), para
+        seguirem o mesmo fluxo de retry.
+        """
+        content_length = (getattr(response, "headers", None) or {}).get("Content-Length")
+        if (
+            IJSON_AVAILABLE
+            and isinstance(content_length, str)
+            and content_length.isdigit()
+            and int(content_length) >= cls.STREAM_MIN_BYTES
+        ):
+            logger.debug("bcb_streaming_json", content_length=int(content_length))
+            response.raw.decode_content = True
+            try:
+                return list(ijson.items(response.raw, "item"))
+            except ijson.JSONError as e:
+                raise requests.exceptions.JSONDecodeError(str(e), "", 0)
+        
+        content = getattr(response, "content", None)
+        if not ORJSON_AVAILABLE or not isinstance(content, (bytes, bytearray)):
+            return response.json()
+        
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+    
+    def _cache_key(self, series_id: int, start_date: str, end_date: str) -> str:
+        """Chave do cache para (série, data inicial, data final)."""
+        return hashlib.md5(f"{series_id}|{start_date}|{end_date}".encode()).hexdigest()
+    
+    def _cache_ttl(self, end_date: str) -> float:
+        """
+        Validade do cache conforme a janela pedida.
+        
+        Janelas encerradas há mais de CACHE_FROZEN_AFTER são históricas e
+        não expiram; as demais valem CACHE_RECENT_TTL segundos.
+        """
+        try:
+            end_dt = datetime.strptime(end_date, "%d/%m/%Y")
+        except ValueError:
+            return self.CACHE_RECENT_TTL
+        
+        if end_dt < datetime.now() - self.CACHE_FROZEN_AFTER:
+            return float("inf")
+        return self.CACHE_RECENT_TTL
+    
+    def _cached_series(
+        self,
+        series_id: int,
+        start_date: str,
+        end_date: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Série processada do cache, se houver entrada válida.
+        
+        Returns:
+            Dados em cache ou None (sem cache, ausente ou expirado)
+        """
+        if self.cache is None:
+            return None
+        
+        data = self.cache.get(
+            self._cache_key(series_id, start_date, end_date),
+            ttl=self._cache_ttl(end_date)
+        )
+        
+        if data is not None:
+            logger.info(
+                "bcb_series_cache_hit",
+                series_id=series_id,
+                start_date=start_date,
+                end_date=end_date,
+                records_count=len(data)
+            )
+        
+        return data
+    
+    def _store_series(
+        self,
+        series_id: int,
+        start_date: str,
+        end_date: str,
+        data: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Grava a série processada no cache (se configurado).
+        
+        Respostas vazias não são gravadas: em janelas históricas o cache não
+        expira, e uma falha transitória da API ficaria congelada para sempre.
+        """
+        if self.cache is not None and data:
+            self.cache.set(self._cache_key(series_id, start_date, end_date), data)
+    
     def fetch_series(
         self,
         series_id: int,
@@ -204,36 +526,25 @@ class BCBClient:
             >>> print(data[0])
             {'date': '2023-01-01', 'value': 5.79}
         """
-        # VALIDAÇÃO: Ajustar datas para evitar dados futuros/não disponíveis
-        start_date, end_date = self._validate_and_adjust_dates(
+        url, params, start_date, end_date = self._build_request(
             series_id, start_date, end_date
         )
         
-        url = f"{self.base_url}.{series_id}/dados"
-        params = {}
-        
-        if start_date:
-            params["dataInicial"] = start_date
-        if end_date:
-            params["dataFinal"] = end_date
-        
-        logger.info(
-            "fetching_bcb_series",
-            series_id=series_id,
-            start_date=start_date,
-            end_date=end_date,
-            url=url
-        )
+        cached = self._cached_series(series_id, start_date, end_date)
+        if cached is not None:
+            return cached
         
         # Retry com backoff exponencial
         last_exception = None
         for attempt in range(1, self.max_retries + 1):
             try:
-                response = requests.get(
+                self.limiter.acquire()
+                response = self.session.get(
                     url,
                     params=params,
                     timeout=self.timeout,
-                    headers={"Accept": "application/json"}
+                    headers={"Accept": "application/json"},
+                    stream=True
                 )
                 
                 # Verificar status HTTP
@@ -247,59 +558,36 @@ class BCBClient:
                     )
                     response.raise_for_status()
                 
-                raw_data = response.json()
+                raw_data = self._parse_json(response)
                 
-                # VALIDAÇÃO: Resposta vazia da API
-                if not raw_data:
-                    logger.warning(
-                        "api_returned_empty",
-                        series_id=series_id,
-                        start_date=start_date,
-                        end_date=end_date,
-                        message="API retornou lista vazia - série pode não ter dados no período"
-                    )
-                    return []
-                
-                # Processar e transformar dados
-                processed_data = self._process_series_data(raw_data)
-                
-                # VALIDAÇÃO: Detectar valores constantes suspeitos
-                if processed_data and len(processed_data) > 10:
-                    unique_values = set(item['value'] for item in processed_data)
-                    if len(unique_values) == 1:
-                        logger.warning(
-                            "suspicious_constant_value",
-                            series_id=series_id,
-                            constant_value=processed_data[0]['value'],
-                            records_count=len(processed_data),
-                            message="Todos os registros têm o mesmo valor - pode indicar dados default/placeholder"
-                        )
-                
-                logger.info(
-                    "bcb_series_fetched",
-                    series_id=series_id,
-                    records_count=len(processed_data),
-                    unique_values_count=len(set(item['value'] for item in processed_data)) if processed_data else 0,
-                    attempt=attempt
+                processed_data = self._handle_payload(
+                    series_id, raw_data, start_date, end_date, attempt
                 )
+                self._store_series(series_id, start_date, end_date, processed_data)
                 
                 return processed_data
             
             except requests.exceptions.HTTPError as e:
                 last_exception = e
-                # Não fazer retry para erros 4xx (client errors)
-                if 400 <= e.response.status_code < 500:
+                failed = e.response if e.response is not None else response
+                status_code = failed.status_code
+                
+                # Não fazer retry para erros 4xx (client errors), exceto 429
+                if 400 <= status_code < 500 and status_code not in self.RETRY_AFTER_STATUSES:
                     logger.error(
                         "bcb_client_error",
                         series_id=series_id,
-                        status_code=e.response.status_code,
+                        status_code=status_code,
                         error=str(e)
                     )
                     raise
                 
-                # Retry para erros 5xx (server errors)
+                # Retry para erros 5xx (server errors) e 429 (rate limit)
                 if attempt < self.max_retries:
-                    delay = self.retry_delay * (2 ** (attempt - 1))
+                    retry_after = None
+                    if status_code in self.RETRY_AFTER_STATUSES:
+                        retry_after = (getattr(failed, "headers", None) or {}).get("Retry-After")
+                    delay = self._backoff_delay(attempt, retry_after)
                     logger.warning(
                         "bcb_server_error_retrying",
                         series_id=series_id,
@@ -321,7 +609,7 @@ class BCBClient:
             except (requests.exceptions.Timeout, requests.exceptions.RequestException) as e:
                 last_exception = e
                 if attempt < self.max_retries:
-                    delay = self.retry_delay * (2 ** (attempt - 1))
+                    delay = self._backoff_delay(attempt)
                     logger.warning(
                         "bcb_request_error_retrying",
                         series_id=series_id,
@@ -357,7 +645,11 @@ class BCBClient:
         """
         Busca múltiplas séries temporais da API do BCB.
         
-        Adiciona pausa de 1 segundo entre requisições para evitar sobrecarga da API.
+        O ritmo das requisições é controlado pelo rate limiter do cliente
+        (sem pausas fixas entre séries).
+        As séries são buscadas concorrentemente, limitadas a max_concurrency
+        requisições simultâneas: com aiohttp se use_async=True (e instalado),
+        senão em um ThreadPoolExecutor.
         
         Args:
             series_map: Dicionário mapeando identificadores para códigos SGS
@@ -391,31 +683,31 @@ class BCBClient:
         results = {}
         errors = {}
         
-        for idx, (series_name, series_id) in enumerate(series_map.items(), 1):
-            try:
-                logger.debug(
-                    "fetching_series",
-                    series_name=series_name,
-                    series_id=series_id,
-                    progress=f"{idx}/{len(series_map)}"
-                )
-                
-                data = self.fetch_series(series_id, start_date, end_date)
-                results[series_name] = data
-                
-                # Pausa entre requisições (exceto na última)
-                if idx < len(series_map):
-                    time.sleep(1)
-            
-            except Exception as e:
+        if self.use_async and not AIOHTTP_AVAILABLE:
+            logger.warning(
+                "aiohttp_not_available",
+                message="aiohttp não instalado - buscando séries em threads"
+            )
+        
+        if self.use_async and AIOHTTP_AVAILABLE:
+            outcomes = asyncio.run(
+                self._afetch_multiple(series_map, start_date, end_date)
+            )
+        else:
+            outcomes = self._fetch_multiple_threaded(series_map, start_date, end_date)
+        
+        for (series_name, series_id), outcome in zip(series_map.items(), outcomes):
+            if isinstance(outcome, Exception):
                 logger.error(
                     "error_fetching_series",
                     series_name=series_name,
                     series_id=series_id,
-                    error=str(e),
-                    error_type=type(e).__name__
+                    error=str(outcome),
+                    error_type=type(outcome).__name__
                 )
-                errors[series_name] = str(e)
+                errors[series_name] = str(outcome)
+            else:
+                results[series_name] = outcome
         
         if errors:
             logger.warning(
@@ -434,68 +726,230 @@ class BCBClient:
         
         return results
     
-    def _process_series_data(self, raw_data: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    def _fetch_multiple_threaded(
+        self,
+        series_map: Dict[str, int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[Any]:
         """
-        Processa dados brutos da API BCB.
+        Busca as séries em threads (requests libera o GIL durante o I/O).
         
-        Converte formato de data DD/MM/YYYY para YYYY-MM-DD e valores com vírgula
-        decimal para float.
+        Returns:
+            Resultado (ou exceção) de cada série, na ordem de series_map
+        """
+        max_workers = max(1, min(self.max_concurrency, len(series_map)))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.fetch_series, series_id, start_date, end_date)
+                for series_id in series_map.values()
+            ]
+        
+        return [future.exception() or future.result() for future in futures]
+    
+    async def _afetch_series(
+        self,
+        session: "aiohttp.ClientSession",
+        semaphore: asyncio.Semaphore,
+        series_id: int,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Versão assíncrona de fetch_series (mesmas validações e retries).
         
         Args:
-            raw_data: Lista de dicionários com 'data' e 'valor' da API
+            session: Sessão aiohttp compartilhada
+            semaphore: Limita as requisições simultâneas
+            series_id: Código da série no SGS
+            start_date: Data inicial no formato DD/MM/YYYY (opcional)
+            end_date: Data final no formato DD/MM/YYYY (opcional)
         
         Returns:
-            Lista processada com 'date' e 'value'
+            Lista de dicionários com 'date' (YYYY-MM-DD) e 'value' (float)
         
         Raises:
-            ValueError: Erro ao processar data ou valor
+            aiohttp.ClientResponseError: Erro HTTP (4xx, ou 5xx após retries)
+            aiohttp.ClientError: Erro de conexão após retries
+            asyncio.TimeoutError: Timeout após retries
         """
-        processed = []
-        hoje = datetime.now().date()
+        url, params, start_date, end_date = self._build_request(
+            series_id, start_date, end_date
+        )
+        
+        cached = self._cached_series(series_id, start_date, end_date)
+        if cached is not None:
+            return cached
         
-        for item in raw_data:
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
+        for attempt in range(1, self.max_retries + 1):
             try:
-                # Converter data de DD/MM/YYYY para YYYY-MM-DD
-                date_str = item.get("data", "")
-                date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-                formatted_date = date_obj.strftime("%Y-%m-%d")
+                async with semaphore:
+                    await self.limiter.aacquire()
+                    async with session.get(
+                        url,
+                        params=params,
+                        timeout=timeout,
+                        headers={"Accept": "application/json"}
+                    ) as response:
+                        if response.status >= 400:
+                            logger.warning(
+                                "bcb_api_error",
+                                series_id=series_id,
+                                status_code=response.status,
+                                response_text=(await response.text())[:500],
+                                attempt=attempt
+                            )
+                            response.raise_for_status()
+                        
+                        raw_data = await response.json(
+                            content_type=None,
+                            loads=orjson.loads if ORJSON_AVAILABLE else json.loads
+                        )
                 
-                # VALIDAÇÃO: Ignorar datas futuras (dados não confiáveis)
-                if date_obj.date() > hoje:
-                    logger.warning(
-                        "future_date_ignored",
-                        date=formatted_date,
-                        today=str(hoje)
-                    )
-                    continue
+                processed_data = self._handle_payload(
+                    series_id, raw_data, start_date, end_date, attempt
+                )
+                self._store_series(series_id, start_date, end_date, processed_data)
                 
-                # Converter valor: substituir vírgula por ponto e converter para float
-                value_str = item.get("valor", "0")
-                value = float(value_str.replace(",", "."))
+                return processed_data
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Não fazer retry para erros 4xx (client errors), exceto 429
+                if (
+                    isinstance(e, aiohttp.ClientResponseError)
+                    and 400 <= e.status < 500
+                    and e.status not in self.RETRY_AFTER_STATUSES
+                ):
+                    logger.error(
+                        "bcb_client_error",
+                        series_id=series_id,
+                        status_code=e.status,
+                        error=str(e)
+                    )
+                    raise
                 
-                # VALIDAÇÃO: Ignorar valores inválidos
-                if value == 0 or abs(value) > 1_000_000:
-                    logger.warning(
-                        "invalid_value_ignored",
-                        date=formatted_date,
-                        value=value,
-                        reason="zero or extreme outlier"
+                if attempt >= self.max_retries:
+                    logger.error(
+                        "bcb_max_retries_exceeded",
+                        series_id=series_id,
+                        attempts=attempt,
+                        error=str(e),
+                        error_type=type(e).__name__
                     )
-                    continue
+                    raise
                 
-                processed.append({
-                    "date": formatted_date,
-                    "value": value
-                })
-            
-            except (ValueError, KeyError) as e:
+                retry_after = None
+                if isinstance(e, aiohttp.ClientResponseError) and e.status in self.RETRY_AFTER_STATUSES:
+                    retry_after = (e.headers or {}).get("Retry-After")
+                delay = self._backoff_delay(attempt, retry_after)
                 logger.warning(
-                    "error_processing_data_point",
-                    item=item,
+                    "bcb_request_error_retrying",
+                    series_id=series_id,
+                    attempt=attempt,
+                    max_retries=self.max_retries,
+                    retry_delay=delay,
                     error=str(e),
                     error_type=type(e).__name__
                 )
-                # Continuar processando outros pontos
-                continue
+                await asyncio.sleep(delay)
+        
+        return []
+    
+    async def _afetch_multiple(
+        self,
+        series_map: Dict[str, int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> List[Any]:
+        """
+        Busca todas as séries concorrentemente numa única sessão aiohttp.
         
-        return processed
+        Returns:
+            Resultado (ou exceção) de cada série, na ordem de series_map
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrency)
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(
+                *(
+                    self._afetch_series(session, semaphore, series_id, start_date, end_date)
+                    for series_id in series_map.values()
+                ),
+                return_exceptions=True
+            )
+    
+    def _process_series_data(self, raw_data: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Processa dados brutos da API BCB.
+        
+        Converte formato de data DD/MM/YYYY para YYYY-MM-DD e valores com vírgula
+        decimal para float.
+        
+        Args:
+            raw_data: Lista de dicionários com 'data' e 'valor' da API
+        
+        Returns:
+            Lista processada com 'date' e 'value'
+        
+        Pontos com data/valor inválidos, datas futuras, zeros e outliers
+        são descartados (com log), sem interromper o processamento.
+        """
+        if not raw_data:
+            return []
+        
+        df = pd.DataFrame(raw_data).reindex(columns=["data", "valor"])
+        
+        # Converter data de DD/MM/YYYY e valor com vírgula decimal (vetorizado)
+        datas = pd.to_datetime(df["data"], format="%d/%m/%Y", errors="coerce")
+        valores = pd.to_numeric(
+            df["valor"].fillna("0").astype(str).str.replace(",", ".", regex=False),
+            errors="coerce"
+        )
+        
+        data_invalida = datas.isna()
+        # VALIDAÇÃO: Ignorar datas futuras (dados não confiáveis)
+        futura = ~data_invalida & (datas > pd.Timestamp(datetime.now().date()))
+        valor_invalido = ~data_invalida & ~futura & valores.isna()
+        # VALIDAÇÃO: Ignorar valores zerados ou outliers extremos
+        fora_da_faixa = (
+            ~data_invalida & ~futura & ~valor_invalido
+            & ((valores == 0) | (valores.abs() > 1_000_000))
+        )
+        
+        datas_fmt = datas.dt.strftime("%Y-%m-%d")
+        
+        # Logs apenas para os pontos descartados (em geral poucos)
+        for i in np.flatnonzero(data_invalida | valor_invalido):
+            logger.warning(
+                "error_processing_data_point",
+                item=raw_data[i],
+                error="data ou valor em formato inválido",
+                error_type="ValueError"
+            )
+        for i in np.flatnonzero(futura):
+            logger.warning(
+                "future_date_ignored",
+                date=datas_fmt.iat[i],
+                today=str(datetime.now().date())
+            )
+        for i in np.flatnonzero(fora_da_faixa):
+            logger.warning(
+                "invalid_value_ignored",
+                date=datas_fmt.iat[i],
+                value=float(valores.iat[i]),
+                reason="zero or extreme outlier"
+            )
+        
+        validos = ~(data_invalida | futura | valor_invalido | fora_da_faixa)
+        
+        return [
+            {"date": date, "value": value}
+            for date, value in zip(
+                datas_fmt[validos].tolist(),
+                valores[validos].astype(float).tolist()
+            )
+        ]
@@ -35,6 +35,7 @@ from typing import Any, Dict, List, Optional
 from functools import wraps
 
 import gspread
+import numpy as np
 import pandas as pd
 import structlog
 from oauth2client.service_account import ServiceAccountCredentials
@@ -84,6 +85,12 @@ class SheetsLoader:
     _client: Optional[gspread.Client] = None
     _spreadsheet: Optional[gspread.Spreadsheet] = None
     
+    # Colunas numéricas da aba fact_series
+    FACT_NUMERIC_COLUMNS = ("valor", "variacao_mom", "variacao_yoy")
+    
+    # Colunas obrigatórias no DataFrame recebido por write_fact_series
+    FACT_REQUIRED_COLUMNS = frozenset({"data_referencia", "valor"})
+    
     def __new__(cls):
         """Implementa padrão singleton."""
         if cls._instance is None:
@@ -126,6 +133,9 @@ class SheetsLoader:
             spreadsheet_id=self.spreadsheet_id
         )
         
+        # Cópia em memória de fact_series (evita reler a aba a cada série)
+        self._fact_cache: Optional[pd.DataFrame] = None
+        
         self._initialized = True
     
     def _get_client(self) -> gspread.Client:
@@ -482,6 +492,10 @@ class SheetsLoader:
         Retorna dados como DataFrame pandas com todas as colunas.
         Se a aba não existir ou estiver vazia, retorna DataFrame vazio.
         
+        O resultado fica em memória no processo e é mantido em dia por
+        write_fact_series; use invalidate_cache() se a aba for alterada
+        por fora do loader.
+        
         Returns:
             DataFrame com dados existentes ou DataFrame vazio
         
@@ -490,6 +504,10 @@ class SheetsLoader:
             >>> df = loader.read_fact_series()
             >>> print(f"Registros existentes: {len(df)}")
         """
+        if self._fact_cache is not None:
+            logger.debug("fact_series_cache_hit", rows=len(self._fact_cache))
+            return self._fact_cache.copy()
+        
         logger.info("reading_fact_series")
         
         try:
@@ -503,19 +521,17 @@ class SheetsLoader:
             headers = data[0]
             rows = data[1:]
             
-            # Criar DataFrame
+            # Criar DataFrame direto das listas (sem conversão célula a célula)
             df = pd.DataFrame(rows, columns=headers)
             
-            # Converter strings vazias para NaN
-            df = df.replace('', pd.NA)
+            # Colunas numéricas: uma conversão vetorizada ('' vira NaN)
+            numeric_cols = [col for col in self.FACT_NUMERIC_COLUMNS if col in df.columns]
+            if numeric_cols:
+                df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
             
-            # Converter tipos de dados
-            if 'valor' in df.columns:
-                df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
-            if 'variacao_mom' in df.columns:
-                df['variacao_mom'] = pd.to_numeric(df['variacao_mom'], errors='coerce')
-            if 'variacao_yoy' in df.columns:
-                df['variacao_yoy'] = pd.to_numeric(df['variacao_yoy'], errors='coerce')
+            # Demais colunas: converter strings vazias para NA
+            text_cols = [col for col in df.columns if col not in numeric_cols]
+            df[text_cols] = df[text_cols].replace('', pd.NA)
             
             logger.info(
                 "fact_series_read",
@@ -523,7 +539,8 @@ class SheetsLoader:
                 columns=list(df.columns)
             )
             
-            return df
+            self._fact_cache = df
+            return df.copy()
         
         except gspread.exceptions.WorksheetNotFound:
             logger.info("fact_series_not_found_returning_empty")
@@ -573,9 +590,10 @@ class SheetsLoader:
         
         initial_count = len(df)
         
-        # Ordenar por created_at para garantir ordem correta
+        # Ordenar por created_at para garantir ordem correta; ordenação estável
+        # para que, em empates, prevaleça a última linha na ordem de entrada
         if 'created_at' in df.columns:
-            df = df.sort_values('created_at')
+            df = df.sort_values('created_at', kind='stable')
         
         # Remover duplicatas mantendo o mais recente
         df_clean = df.drop_duplicates(subset=['id_fato'], keep=keep)
@@ -605,10 +623,12 @@ class SheetsLoader:
         
         Implementa UPSERT (Update or Insert):
         1. Lê dados existentes da aba fact_series
-        2. Identifica registros novos vs. duplicados por id_fato
-        3. Remove duplicatas dos dados existentes (mantém mais recente)
-        4. Combina dados existentes limpos + novos dados
-        5. Sobrescreve aba completamente com dados dedupicados
+        2. Identifica registros novos vs. existentes por id_fato
+        3. Acrescenta os novos ao final da aba (append_rows)
+        4. Reescreve apenas as linhas existentes cujos valores mudaram
+           (batch_update com um range A1 por linha)
+        
+        Se a aba estiver vazia, escreve header + dados de uma vez.
         
         Args:
             series_id: Identificador da série (ex: "ipca", "selic")
@@ -627,11 +647,11 @@ class SheetsLoader:
             ... })
             >>> loader.write_fact_series('ipca', df, 'exec_20230101')
         """
-        required_cols = {"data_referencia", "valor"}
-        if not required_cols.issubset(data.columns):
-            missing = required_cols - set(data.columns)
+        missing = self.FACT_REQUIRED_COLUMNS.difference(data.columns)
+        if missing:
             raise ValueError(
-                f"DataFrame deve conter colunas {required_cols}. Faltando: {missing}"
+                f"DataFrame deve conter colunas {sorted(self.FACT_REQUIRED_COLUMNS)}. "
+                f"Faltando: {sorted(missing)}"
             )
         
         logger.info(
@@ -647,7 +667,7 @@ class SheetsLoader:
         df_new = data.copy()
         
         # Adicionar colunas de metadados
-        df_new["id_fato"] = [f"{series_id}_{row['data_referencia']}" for _, row in df_new.iterrows()]
+        df_new["id_fato"] = f"{series_id}_" + df_new["data_referencia"].astype(str)
         df_new["series_id"] = series_id
         df_new["fonte_original"] = "bcb_sgs"
         df_new["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -657,59 +677,9 @@ class SheetsLoader:
         df_new["variacao_mom"] = df_new["valor"].pct_change() * 100  # Month-over-month %
         df_new["variacao_yoy"] = df_new["valor"].pct_change(periods=12) * 100  # Year-over-year %
         
-        # ============================================
-        # PASSO 2: Ler dados existentes
-        # ============================================
-        df_existing = self.read_fact_series()
-        
-        existing_count = len(df_existing)
-        logger.info("existing_data_read", existing_count=existing_count)
-        
-        # ============================================
-        # PASSO 3: Identificar novos vs. atualizações
-        # ============================================
-        if df_existing.empty:
-            # Não há dados existentes, todos são novos
-            df_final = df_new
-            new_count = len(df_new)
-            updated_count = 0
-            logger.info("no_existing_data_all_new", new_count=new_count)
-        else:
-            # Identificar IDs novos
-            existing_ids = set(df_existing['id_fato'].values)
-            new_ids = set(df_new['id_fato'].values)
-            
-            truly_new_ids = new_ids - existing_ids
-            update_ids = new_ids & existing_ids
-            
-            new_count = len(truly_new_ids)
-            updated_count = len(update_ids)
-            
-            logger.info(
-                "upsert_analysis",
-                existing_ids=len(existing_ids),
-                new_ids=new_count,
-                update_ids=updated_count
-            )
-            
-            # Remover registros que serão atualizados dos dados existentes
-            df_existing_filtered = df_existing[~df_existing['id_fato'].isin(update_ids)]
-            
-            # Combinar dados existentes (sem os que serão atualizados) + novos dados
-            df_combined = pd.concat([df_existing_filtered, df_new], ignore_index=True)
-            
-            # Remover duplicatas (caso haja) mantendo mais recente
-            df_final, duplicates_removed = self.deduplicate_fact_series(df_combined)
-            
-            if duplicates_removed > 0:
-                logger.warning(
-                    "duplicates_found_and_removed",
-                    duplicates_removed=duplicates_removed
-                )
+        # Mesma data repetida no lote: manter a última ocorrência
+        df_new = df_new.drop_duplicates(subset=["id_fato"], keep="last")
         
-        # ============================================
-        # PASSO 4: Reordenar colunas e preparar para escrita
-        # ============================================
         columns_order = [
             "id_fato",
             "series_id",
@@ -720,35 +690,103 @@ class SheetsLoader:
             "fonte_original",
             "created_at"
         ]
-        df_final = df_final[columns_order]
-        
-        # Ordenar por series_id e data_referencia para organização
-        df_final = df_final.sort_values(["series_id", "data_referencia"])
-        
-        # Converter para lista de listas
-        headers = [columns_order]
-        rows = df_final.values.tolist()
-        
-        # Converter NaN para string vazia
-        rows = [
-            ['' if pd.isna(val) else val for val in row]
-            for row in rows
-        ]
         
         # ============================================
-        # PASSO 5: Sobrescrever aba completamente
+        # PASSO 2: Ler dados existentes
         # ============================================
+        df_existing = self.read_fact_series()
+        
+        existing_count = len(df_existing)
+        logger.info("existing_data_read", existing_count=existing_count)
+        
         try:
             # Criar aba se não existir
             self.create_sheet_if_not_exists("fact_series", headers=columns_order)
-            
-            # Limpar aba completamente e escrever dados dedupicados
             worksheet = self._get_spreadsheet().worksheet("fact_series")
-            worksheet.clear()
             
-            # Escrever header + dados
-            all_data = headers + rows
-            worksheet.update('A1', all_data)
+            # ============================================
+            # PASSO 3: Aba vazia → escrita completa
+            # ============================================
+            if df_existing.empty:
+                df_final = df_new[columns_order].sort_values(["series_id", "data_referencia"])
+                new_count = len(df_final)
+                updated_count = 0
+                logger.info("no_existing_data_all_new", new_count=new_count)
+                
+                worksheet.clear()
+                worksheet.update('A1', [columns_order] + self._to_sheet_rows(df_final))
+                
+                df_merged = df_final
+            
+            # ============================================
+            # PASSO 4: Diff contra a aba → append + batch_update
+            # ============================================
+            else:
+                # Linha na planilha (1-based, após o header) de cada registro existente
+                existing_rows = pd.Series(
+                    range(2, existing_count + 2),
+                    index=df_existing["id_fato"].values
+                )
+                
+                is_existing = df_new["id_fato"].isin(existing_rows.index)
+                to_append = df_new[~is_existing]
+                
+                # Atualizar apenas registros existentes cujos valores mudaram
+                matched = df_new[is_existing]
+                previous = (
+                    df_existing.drop_duplicates("id_fato", keep="last")
+                    .set_index("id_fato")
+                    .reindex(matched["id_fato"])
+                )
+                changed = pd.Series(False, index=matched.index)
+                for col in self.FACT_NUMERIC_COLUMNS:
+                    old = pd.to_numeric(previous[col], errors="coerce").to_numpy(dtype=float)
+                    new = pd.to_numeric(matched[col], errors="coerce").to_numpy(dtype=float)
+                    changed |= ~np.isclose(old, new, equal_nan=True)
+                to_update = matched[changed.values]
+                
+                new_count = len(to_append)
+                updated_count = len(to_update)
+                
+                logger.info(
+                    "upsert_analysis",
+                    existing_ids=existing_rows.index.nunique(),
+                    new_ids=new_count,
+                    update_ids=updated_count,
+                    unchanged_ids=len(matched) - updated_count
+                )
+                
+                if updated_count:
+                    # Um range por linha; ids repetidos na aba são todos atualizados
+                    payload = [
+                        {"range": f"A{row_idx}:H{row_idx}", "values": [row]}
+                        for id_fato, row in zip(
+                            to_update["id_fato"],
+                            self._to_sheet_rows(to_update[columns_order])
+                        )
+                        for row_idx in existing_rows.loc[[id_fato]]
+                    ]
+                    worksheet.batch_update(payload, value_input_option="RAW")
+                
+                to_append = to_append[columns_order].sort_values(["series_id", "data_referencia"])
+                if new_count:
+                    worksheet.append_rows(
+                        self._to_sheet_rows(to_append),
+                        value_input_option="RAW"
+                    )
+                
+                # Estado da aba após a escrita, na mesma ordem das linhas
+                df_merged = df_existing.copy()
+                if updated_count:
+                    updated = to_update[columns_order].set_index("id_fato")
+                    hit = df_merged["id_fato"].isin(updated.index)
+                    value_cols = columns_order[1:]
+                    df_merged.loc[hit, value_cols] = (
+                        updated.loc[df_merged.loc[hit, "id_fato"], value_cols].values
+                    )
+                df_merged = pd.concat([df_merged, to_append], ignore_index=True)
+            
+            self._fact_cache = df_merged.reset_index(drop=True)
             
             logger.info(
                 "fact_series_upsert_complete",
@@ -757,11 +795,13 @@ class SheetsLoader:
                 existing_rows=existing_count,
                 new_rows=new_count,
                 updated_rows=updated_count,
-                final_total=len(df_final),
+                final_total=existing_count + new_count,
                 operation="upsert"
             )
         
         except Exception as e:
+            # Escrita parcial: estado da aba desconhecido
+            self.invalidate_cache()
             logger.error(
                 "write_fact_series_failed",
                 series_id=series_id,
@@ -771,6 +811,24 @@ class SheetsLoader:
             )
             raise
     
+    def invalidate_cache(self) -> None:
+        """Descarta a cópia em memória de fact_series (próxima leitura vai à API)."""
+        self._fact_cache = None
+    
+    @staticmethod
+    def _to_sheet_rows(df: pd.DataFrame) -> List[List[Any]]:
+        """
+        Converte DataFrame em lista de linhas para o Sheets (NaN → '').
+        
+        Args:
+            df: DataFrame já com as colunas na ordem da aba
+        
+        Returns:
+            Lista de listas com os valores
+        """
+        # Uma conversão vetorizada (object + where) em vez de pd.isna por célula
+        return df.astype(object).where(df.notna(), '').values.tolist()
+    
     def write_ingestion_log(
         self,
         exec_id: str,
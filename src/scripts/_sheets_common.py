@@ -0,0 +1,585 @@
+"""
+Utilitários compartilhados pelos scripts de atualização de dim_geo.
+
+Centraliza sessão HTTP, conexão ao Google Sheets, leitura da aba dim_geo,
+consulta de população/área na API SIDRA e aplicação de atualizações em
+batch, usados por
+update_municipios_sc_data.py e update_populacao_dim_geo.py.
+
+Autor: Sistema de ETL - Construction Data Pipeline
+"""
+
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import gspread
+import orjson
+import requests
+import structlog
+from dotenv import load_dotenv
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+from urllib3.util.retry import Retry
+
+# Configurar logger estruturado
+structlog.configure(
+    processors=[
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.add_log_level,
+        structlog.processors.JSONRenderer(),
+    ]
+)
+logger = structlog.get_logger()
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Token OAuth do Google Sheets (fora do repositório, reuso entre processos)
+SHEETS_TOKEN_CACHE_PATH = Path.home() / ".cache" / "construction_pipeline" / "gsheets_token.json"
+
+# Worksheets já resolvidas, por (id da planilha, nome da aba)
+_WORKSHEET_CACHE: Dict[Tuple[str, str], gspread.Worksheet] = {}
+
+# Snapshot local de dim_geo para dry-runs sem acessar o Google Sheets
+DIM_GEO_SNAPSHOT_PATH = Path.home() / ".cache" / "construction_pipeline" / "dim_geo_snapshot.json"
+DIM_GEO_SNAPSHOT_TTL = timedelta(days=1)
+
+# API SIDRA (mais estável que agregados)
+SIDRA_POPULACAO_URL = "https://apisidra.ibge.gov.br/values/t/4709/n6/all/v/93/p/2022"
+SIDRA_AREA_URL = "https://apisidra.ibge.gov.br/values/t/1301/n6/all/v/615/p/last%201"
+
+# Cache local das respostas SIDRA (uma cópia por URL por dia)
+SIDRA_CACHE_DIR = Path("data/cache/sidra")
+
+# Colunas de dim_geo usadas pelos scripts de atualização
+DIM_GEO_COLUMNS = ("cod_ibge", "nome_municipio", "populacao_2022", "area_km2")
+
+
+@functools.lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Sessão HTTP compartilhada (keep-alive + retry com backoff para 429/5xx).
+
+    Returns:
+        requests.Session com pool de conexões HTTPS
+    """
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        ),
+    )
+    return session
+
+
+def _token_cache_key(credentials: Credentials) -> Dict[str, Any]:
+    """Identificar a service account e os escopos a que o token pertence."""
+    return {
+        "account": credentials.service_account_email,
+        "scopes": sorted(credentials.scopes or []),
+    }
+
+
+def _load_cached_token(credentials: Credentials) -> None:
+    """
+    Reaproveitar token OAuth salvo por uma execução anterior, se ainda válido.
+
+    Evita a troca JWT → access token com o endpoint OAuth do Google quando
+    o script é executado várias vezes dentro do TTL do token. O token só é
+    reaproveitado se pertencer à mesma service account e aos mesmos escopos.
+
+    Args:
+        credentials: Credenciais da service account (modificadas in-place)
+    """
+    try:
+        with open(SHEETS_TOKEN_CACHE_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached["expiry"])
+        key = {"account": cached["account"], "scopes": cached["scopes"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+
+    if key != _token_cache_key(credentials):
+        logger.info("sheets_token_cache_mismatch", account=key["account"])
+        return
+
+    # Margem de 60s para não usar token prestes a expirar
+    if expiry - timedelta(seconds=60) > datetime.utcnow():
+        credentials.token = cached["token"]
+        credentials.expiry = expiry
+        logger.info("using_cached_sheets_token", expiry=cached["expiry"])
+
+
+def _save_cached_token(credentials: Credentials) -> None:
+    """
+    Persistir token OAuth atual para reuso entre processos.
+
+    O arquivo temporário já nasce com permissão 0600 e substitui o cache
+    de forma atômica, sem janela em que o token fique legível por outros.
+
+    Args:
+        credentials: Credenciais com token já obtido
+    """
+    if not credentials.token or not credentials.expiry:
+        return
+
+    SHEETS_TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SHEETS_TOKEN_CACHE_PATH.with_name(
+        f"{SHEETS_TOKEN_CACHE_PATH.name}.{os.getpid()}.tmp"
+    )
+
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        os.unlink(tmp_path)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    **_token_cache_key(credentials),
+                    "token": credentials.token,
+                    "expiry": credentials.expiry.isoformat(),
+                },
+                f,
+            )
+        os.replace(tmp_path, SHEETS_TOKEN_CACHE_PATH)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def get_worksheet(spreadsheet: gspread.Spreadsheet, name: str) -> gspread.Worksheet:
+    """
+    Obter worksheet pelo nome, memorizando o resultado por (planilha, aba).
+
+    Args:
+        spreadsheet: Planilha conectada
+        name: Nome da aba
+
+    Returns:
+        Worksheet solicitada
+    """
+    key = (spreadsheet.id, name)
+
+    if key not in _WORKSHEET_CACHE:
+        _WORKSHEET_CACHE[key] = spreadsheet.worksheet(name)
+
+    return _WORKSHEET_CACHE[key]
+
+
+@functools.lru_cache(maxsize=1)
+def connect_sheets() -> gspread.Spreadsheet:
+    """
+    Conectar ao Google Sheets usando service account.
+
+    A conexão é memorizada no processo e o token OAuth é reaproveitado
+    entre execuções enquanto não expirar.
+
+    Returns:
+        Objeto da planilha conectada
+
+    Raises:
+        ValueError: Se credenciais não configuradas
+        gspread.exceptions.APIError: Se falhar ao conectar
+    """
+    creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS_PATH")
+    sheet_id = os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
+
+    if not creds_path or not sheet_id:
+        raise ValueError(
+            "Variáveis GOOGLE_SHEETS_CREDENTIALS_PATH e GOOGLE_SHEETS_SPREADSHEET_ID "
+            "devem estar definidas no arquivo .env"
+        )
+
+    logger.info("connecting_to_sheets", credentials_path=creds_path)
+
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive.file",
+    ]
+
+    credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
+    _load_cached_token(credentials)
+    client = gspread.authorize(credentials)
+
+    spreadsheet = client.open_by_key(sheet_id)
+    _save_cached_token(credentials)
+
+    logger.info("sheets_connected", spreadsheet_title=spreadsheet.title)
+
+    return spreadsheet
+
+
+def load_dim_geo_snapshot() -> Optional[List[List[str]]]:
+    """
+    Carregar snapshot local de dim_geo, se existir e estiver dentro do TTL.
+
+    Returns:
+        Valores da aba (header + linhas) ou None se ausente/expirado
+    """
+    try:
+        idade = datetime.now() - datetime.fromtimestamp(
+            DIM_GEO_SNAPSHOT_PATH.stat().st_mtime
+        )
+        if idade > DIM_GEO_SNAPSHOT_TTL:
+            return None
+        with open(DIM_GEO_SNAPSHOT_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_dim_geo_snapshot(all_data: List[List[str]]) -> None:
+    """
+    Salvar snapshot local de dim_geo (header + linhas).
+
+    Args:
+        all_data: Valores da aba no formato de get_all_values()
+    """
+    DIM_GEO_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(DIM_GEO_SNAPSHOT_PATH, "w", encoding="utf-8") as f:
+        json.dump(all_data, f, ensure_ascii=False)
+    logger.info("dim_geo_snapshot_saved", path=str(DIM_GEO_SNAPSHOT_PATH))
+
+
+def get_dim_geo_rows(
+    spreadsheet: Optional[gspread.Spreadsheet],
+    use_cache: bool = False,
+) -> Tuple[List[str], List[List[str]], Dict[str, int]]:
+    """
+    Ler a aba dim_geo e localizar as colunas usadas nas atualizações.
+
+    Args:
+        spreadsheet: Planilha conectada (pode ser None se use_cache e
+            houver snapshot válido)
+        use_cache: Se True, usa o snapshot local em vez de ler o Sheets
+
+    Returns:
+        Tupla (header, rows, col_index), onde col_index mapeia cada nome em
+        DIM_GEO_COLUMNS para seu índice (0-based) no header
+
+    Raises:
+        ValueError: Se a aba estiver vazia ou faltar alguma coluna
+    """
+    all_data = load_dim_geo_snapshot() if use_cache else None
+
+    if all_data is not None:
+        logger.info("using_dim_geo_snapshot", path=str(DIM_GEO_SNAPSHOT_PATH))
+    else:
+        worksheet = get_worksheet(spreadsheet, "dim_geo")
+
+        logger.info("fetching_dim_geo_data")
+
+        # Pegar todos os dados
+        all_data = worksheet.get_all_values()
+
+    if not all_data:
+        logger.error("empty_worksheet")
+        raise ValueError("Worksheet dim_geo está vazia")
+
+    # Header na primeira linha
+    header = all_data[0]
+    rows = all_data[1:]
+
+    # Identificar índices das colunas
+    try:
+        col_index = {col: header.index(col) for col in DIM_GEO_COLUMNS}
+    except ValueError as e:
+        logger.error("missing_column", error=str(e))
+        raise ValueError(f"Coluna não encontrada: {e}")
+
+    return header, rows, col_index
+
+
+def coalesce_row_updates(
+    row_values: Dict[int, List[Any]],
+    first_col: int,
+) -> List[Dict[str, Any]]:
+    """
+    Agrupar linhas consecutivas em ranges retangulares para batch_update.
+
+    Cada sequência contínua de linhas vira um único {"range", "values"},
+    em vez de um range por linha.
+
+    Args:
+        row_values: {número da linha na planilha (1-based): valores da linha};
+            todas as linhas com a mesma largura
+        first_col: Coluna (1-based) do primeiro valor de cada linha
+
+    Returns:
+        Lista de {"range", "values"} ordenada por linha
+    """
+    updates = []
+    inicio = anterior = None
+    valores: List[List[Any]] = []
+
+    def fechar_retangulo() -> None:
+        last_col = first_col + len(valores[0]) - 1
+        updates.append({
+            "range": (
+                f"{gspread.utils.rowcol_to_a1(inicio, first_col)}:"
+                f"{gspread.utils.rowcol_to_a1(anterior, last_col)}"
+            ),
+            "values": valores,
+        })
+
+    for row_num in sorted(row_values):
+        if anterior is None or row_num != anterior + 1:
+            if valores:
+                fechar_retangulo()
+            inicio, valores = row_num, []
+        valores.append(row_values[row_num])
+        anterior = row_num
+
+    if valores:
+        fechar_retangulo()
+
+    return updates
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """Indica se a exceção é um HTTP 429 (quota) da API do Google Sheets."""
+    return (
+        isinstance(exc, gspread.exceptions.APIError)
+        and exc.response is not None
+        and exc.response.status_code == 429
+    )
+
+
+@retry(
+    retry=retry_if_exception(_is_rate_limited),
+    wait=wait_exponential(multiplier=1, max=60),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+def _batch_update(
+    worksheet: gspread.Worksheet,
+    batch: List[Dict[str, Any]],
+    value_input_option: str,
+) -> None:
+    """Enviar um batch_update, recuando exponencialmente apenas em HTTP 429."""
+    worksheet.batch_update(batch, value_input_option=value_input_option)
+
+
+def apply_updates(
+    worksheet: gspread.Worksheet,
+    updates: List[Dict[str, Any]],
+    batch_size: int = 500,
+    value_input_option: str = "RAW",
+    verbose: bool = False,
+) -> None:
+    """
+    Aplicar atualizações {"range", "values"} em lotes de `batch_size` ranges.
+
+    Args:
+        worksheet: Aba de destino
+        updates: Lista de {"range", "values"}
+        batch_size: Ranges por requisição (limite da API é por requisição)
+        value_input_option: "RAW" ou "USER_ENTERED"
+        verbose: Se True, mostra progresso por lote
+    """
+    total_batches = (len(updates) + batch_size - 1) // batch_size
+
+    for i in range(0, len(updates), batch_size):
+        _batch_update(worksheet, updates[i:i + batch_size], value_input_option)
+
+        if verbose:
+            print(f"   ✓ Batch {i // batch_size + 1}/{total_batches}")
+
+
+def disk_cache(ttl_days: int = 1) -> Callable:
+    """
+    Decorator que persiste em disco a resposta JSON de uma URL.
+
+    O arquivo é nomeado `{yyyy-mm-dd}-{sha1(url)}.json`; execuções no
+    mesmo dia reutilizam o arquivo sem acessar a rede. Arquivos com mais
+    de `ttl_days` dias são removidos a cada chamada.
+
+    Args:
+        ttl_days: Dias de validade de cada arquivo de cache
+
+    Returns:
+        Decorator para funções `func(url) -> dados JSON`
+    """
+    def decorator(func: Callable[[str], Any]) -> Callable[[str], Any]:
+        @functools.wraps(func)
+        def wrapper(url: str) -> Any:
+            SIDRA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+            # Invalidar arquivos expirados
+            limite = (date.today() - timedelta(days=ttl_days)).isoformat()
+            for arquivo in SIDRA_CACHE_DIR.glob("*.json"):
+                if arquivo.name[:10] <= limite:
+                    arquivo.unlink(missing_ok=True)
+
+            url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()
+            cache_path = SIDRA_CACHE_DIR / f"{date.today().isoformat()}-{url_hash}.json"
+
+            if cache_path.exists():
+                logger.info("using_cached_response", url=url, path=str(cache_path))
+                return orjson.loads(cache_path.read_bytes())
+
+            data = func(url)
+
+            cache_path.write_bytes(orjson.dumps(data))
+
+            return data
+
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+@disk_cache(ttl_days=1)
+def fetch_sidra_json(url: str) -> List[Dict[str, str]]:
+    """
+    Baixar resposta JSON da API SIDRA (com cache em disco e em memória).
+
+    Args:
+        url: URL completa da consulta SIDRA
+
+    Returns:
+        Lista de linhas retornadas pela API (primeira linha é header)
+    """
+    response = get_session().get(url, timeout=60)
+    response.raise_for_status()
+
+    return orjson.loads(response.content)
+
+
+def _safe_float(valor: str) -> float:
+    """Converter valor SIDRA (vírgula decimal) para float; inválido vira 0.0."""
+    try:
+        return float(valor.replace(",", "."))
+    except (ValueError, TypeError, AttributeError):
+        return 0.0
+
+
+def _safe_int(valor: str) -> int:
+    """Converter valor SIDRA para int; inválido (ex.: "...") vira 0."""
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+def get_municipios_area_sidra() -> Dict[str, float]:
+    """
+    Buscar área territorial de todos os municípios via API SIDRA.
+
+    Tabela 1301: Área territorial oficial (km²).
+    Variável 615: Área total das unidades territoriais.
+
+    Returns:
+        Dict[cod_ibge, area_km2]
+    """
+    logger.info("fetching_area_from_sidra", url=SIDRA_AREA_URL)
+
+    try:
+        data = fetch_sidra_json(SIDRA_AREA_URL)
+
+        # Parse da resposta SIDRA (primeira linha é header)
+        # Estrutura: [{"D1C": "4200051", "D1N": "Abdon Batista (SC)", "V": "235.6", "D2C": "615", ...}]
+        # Filtra variável 615 (área territorial) e municípios SC (7 dígitos, prefixo 42)
+        # Prefixo SC é checado primeiro: rejeita ~95% das linhas com um único lookup
+        area_map = {
+            cod: round(_safe_float(row.get("V", "0")), 3)
+            for row in data[1:]
+            if (cod := row.get("D1C"))
+            and cod.startswith("42")
+            and len(cod) == 7
+            and row.get("D2C") == "615"
+        }
+
+        logger.info(
+            "area_fetched",
+            total_municipios=len(area_map),
+        )
+
+        return area_map
+
+    except Exception as e:
+        logger.error(
+            "failed_to_fetch_area_sidra",
+            error=str(e),
+        )
+        raise
+
+
+def get_municipios_data_sidra() -> Dict[str, Dict[str, any]]:
+    """
+    Buscar população 2022 de todos os municípios via API SIDRA.
+
+    Tabela 4709: População residente (Censo 2022).
+
+    Returns:
+        Dict[cod_ibge, {"populacao": int, "nome": str}]
+    """
+    logger.info("fetching_from_sidra", url=SIDRA_POPULACAO_URL)
+
+    try:
+        data = fetch_sidra_json(SIDRA_POPULACAO_URL)
+
+        # Parse da resposta SIDRA (primeira linha é header)
+        # Estrutura: [{"NC": "6", "NN": "Município", "MC": "45", "MN": "Pessoas", "V": "500000", "D1C": "4200051", "D1N": "Florianópolis (SC)", ...}]
+        # Filtra municípios SC (7 dígitos, prefixo 42) e remove " (SC)" do nome
+        municipios_data = {
+            cod: {
+                "populacao": _safe_int(row.get("V", "0")),
+                "nome": row.get("D1N", "").replace(" (SC)", "").strip(),
+            }
+            for row in data[1:]
+            if (cod := row.get("D1C"))
+            and cod.startswith("42")
+            and len(cod) == 7
+        }
+
+        logger.info(
+            "sidra_data_fetched",
+            total_municipios=len(municipios_data),
+        )
+
+        return municipios_data
+
+    except Exception as e:
+        logger.error(
+            "failed_to_fetch_sidra",
+            error=str(e),
+        )
+        raise
+
+
+def fetch_sidra_populacao_e_area() -> Tuple[Dict[str, Dict[str, any]], Dict[str, float]]:
+    """
+    Buscar população e área em paralelo (duas requisições SIDRA independentes).
+
+    Returns:
+        Tupla (get_municipios_data_sidra(), get_municipios_area_sidra())
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futuro_pop = executor.submit(get_municipios_data_sidra)
+        futuro_area = executor.submit(get_municipios_area_sidra)
+
+        return futuro_pop.result(), futuro_area.result()
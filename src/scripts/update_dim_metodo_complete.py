@@ -23,6 +23,8 @@ Repositório: matheusoption-bit/construction-data-pipeline
 Data: 2025-11-14
 """
 
+import gzip
+import io
 import os
 import sys
 import time
@@ -30,12 +32,15 @@ import argparse
 from typing import List, Dict, Any, Optional
 import argparse
 from datetime import datetime
+from itertools import islice
 from typing import List, Dict, Any, Optional
 import csv
 
 import pandas as pd
 import gspread
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 import structlog
 
 # Configurar logger estruturado
@@ -65,6 +70,7 @@ CREDENTIALS_PATH = "config/google_credentials.json"
 DATA_CRIACAO = "2025-11-14"
 DATA_ATUALIZACAO = "2025-11-14"
 VALIDADO_POR = "matheusoption-bit"
+BACKUP_BUFFER_SIZE = 1 << 20  # 1 MiB de buffer para escrita dos backups
 
 # URLs de referência oficiais
 CBIC_BASE_URL = "https://cbic.org.br/wp-content/uploads/2024/08/Estudo_Metodos_Construtivos_CBIC_2024.pdf"
@@ -72,6 +78,11 @@ SINAPI_BASE_URL = "https://www.caixa.gov.br/Downloads/sinapi-metodologia/Livro_S
 ABNT_BASE_URL = "https://www.abntcatalogo.com.br/norma.aspx?ID=86008"
 INCC_BASE_URL = "https://portalibre.fgv.br/incc"
 
+# Separadores e banners do relatório (pré-computados uma única vez)
+SEP = "═" * 70
+BANNER = f"{SEP}\n🏗️  ATUALIZAR dim_metodo - 10 MÉTODOS × 26 COLUNAS\n{SEP}"
+BANNER_SUCESSO = f"{SEP}\n✅ dim_metodo ATUALIZADA COM SUCESSO!\n{SEP}"
+
 # Header completo da nova estrutura (26 colunas)
 HEADER_DIM_METODO = [
     # 1. IDENTIFICAÇÃO (2 colunas)
@@ -1646,8 +1657,13 @@ def connect_sheets() -> gspread.Spreadsheet:
             ],
         )
         
-        # Autorizar cliente
-        client = gspread.authorize(creds)
+        # Sessão autenticada com pool de conexões (keep-alive entre chamadas)
+        authed_session = AuthorizedSession(creds)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        authed_session.mount("https://", adapter)
+        
+        # Autorizar cliente reutilizando a sessão
+        client = gspread.authorize(creds, session=authed_session)
         
         # Abrir planilha
         spreadsheet = client.open_by_key(SPREADSHEET_ID)
@@ -1675,7 +1691,7 @@ def create_backup(sheet: gspread.Worksheet) -> str:
     """
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"dim_metodo_backup_{timestamp}.csv"
+        backup_filename = f"dim_metodo_backup_{timestamp}.csv.gz"
         backup_path = os.path.join("backups", backup_filename)
         
         logger.info("criando_backup", arquivo=backup_path)
@@ -1687,9 +1703,11 @@ def create_backup(sheet: gspread.Worksheet) -> str:
             logger.warning("aba_vazia", aba="dim_metodo")
             return backup_path
         
-        # Salvar no CSV
+        # Salvar no CSV comprimido, linha a linha através de buffer de 1 MiB
         os.makedirs("backups", exist_ok=True)
-        with open(backup_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(backup_path, 'wb', buffering=BACKUP_BUFFER_SIZE) as raw, \
+                gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1) as gz, \
+                io.TextIOWrapper(gz, encoding='utf-8', newline='') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerows(all_values)
         
@@ -2220,14 +2238,11 @@ def main(skip_cbic: bool = False, dry_run: bool = False, verbose: bool = False)
         )
     
     # LOG CABEÇALHO PRINCIPAL
-    logger.info("═" * 70)
-    logger.info("🏗️  ATUALIZAR dim_metodo - 10 MÉTODOS × 26 COLUNAS")
-    logger.info("═" * 70)
+    logger.info(BANNER)
     logger.info("iniciando_processo_principal", 
                skip_cbic=skip_cbic, 
                dry_run=dry_run, 
-               verbose=verbose,
-               timestamp=datetime.now().isoformat())
+               verbose=verbose)
     
     backup_path = "N/A"
     
@@ -2314,9 +2329,7 @@ def main(skip_cbic: bool = False, dry_run: bool = False, verbose: bool = False)
         
         # 9. RELATÓRIO FINAL COMPLETO
         logger.info("")
-        logger.info("═" * 70)
-        logger.info("✅ dim_metodo ATUALIZADA COM SUCESSO!")
-        logger.info("═" * 70)
+        logger.info(BANNER_SUCESSO)
         logger.info("")
         logger.info("📊 MÉTODOS CONSTRUTIVOS:")
         logger.info(f"   • Total: {len(df)} métodos")
@@ -2351,14 +2364,13 @@ def main(skip_cbic: bool = False, dry_run: bool = False, verbose: bool = False)
         
         # Warnings finais
         if cbic_warnings:
-            logger.info(f"⚠️  CBIC Warnings: {len(cbic_warnings)} detectados")
-            for warning in cbic_warnings[:3]:  # Mostrar apenas os 3 primeiros
-                logger.info(f"   - {warning}")
-            if len(cbic_warnings) > 3:
-                logger.info(f"   - ... e mais {len(cbic_warnings) - 3} warnings")
+            # Evento único com prévia dos 3 primeiros warnings
+            logger.info("cbic_warnings",
+                       count=len(cbic_warnings),
+                       preview=list(islice(cbic_warnings, 3)))
         
         logger.info("🎯 STATUS: PRONTO PARA APRESENTAÇÃO SEXTA-FEIRA!")
-        logger.info("═" * 70)
+        logger.info(SEP)
         
         return 0
         
@@ -2,6 +2,8 @@
 Update missing areas for Pescaria Brava and Balneário Rincão
 Dados oficiais: https://cidades.ibge.gov.br/
 """
+import sys
+
 import gspread
 from google.oauth2.service_account import Credentials
 import structlog
@@ -40,8 +42,9 @@ def update_missing_areas():
     # Buscar todos os registros
     records = worksheet.get_all_records()
     
-    # Preparar updates
+    # Preparar updates (mensagens acumuladas e escritas de uma vez)
     updates = []
+    out_lines = []
     for idx, record in enumerate(records, start=2):  # Linha 2 = primeira linha de dados
         cod_ibge = str(record.get("cod_ibge", ""))
         nome = record.get("nome_municipio", "")
@@ -52,7 +55,9 @@ def update_missing_areas():
                 "range": f"G{idx}",  # Coluna G = area_km2
                 "values": [[area]]
             })
-            print(f"   ✓ {nome} ({cod_ibge}): {area} km²")
+            out_lines.append(f"   ✓ {nome} ({cod_ibge}): {area} km²\n")
+    
+    sys.stdout.write("".join(out_lines))
     
     if updates:
         print(f"\n💾 Aplicando {len(updates)} atualizações...")
@@ -8,180 +8,35 @@ Data: 2025-11-13
 """
 
 import argparse
-import os
 import sys
-import time
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 import gspread
-import requests
+import numpy as np
+import pandas as pd
 import structlog
-from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
 from tqdm import tqdm
 
+from src.scripts._sheets_common import (
+    apply_updates,
+    coalesce_row_updates,
+    connect_sheets,
+    fetch_sidra_populacao_e_area,
+    get_dim_geo_rows,
+    get_session,
+    get_worksheet,
+    load_dim_geo_snapshot,
+    save_dim_geo_snapshot,
+)
+
 # Configurar encoding para Windows
 if sys.platform == "win32":
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-# Configurar logger estruturado
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        structlog.processors.JSONRenderer(),
-    ]
-)
 logger = structlog.get_logger()
 
-# Carregar variáveis de ambiente
-load_dotenv()
-
-# API SIDRA (mais estável que agregados)
-SIDRA_POPULACAO_URL = "https://apisidra.ibge.gov.br/values/t/4709/n6/all/v/93/p/2022"
-SIDRA_AREA_URL = "https://apisidra.ibge.gov.br/values/t/1301/n6/all/v/615/p/last%201"
-
-
-def get_municipios_area_sidra() -> Dict[str, float]:
-    """
-    Buscar área territorial de todos os municípios via API SIDRA.
-    
-    Tabela 1301: Área territorial oficial (km²).
-    Variável 615: Área total das unidades territoriais.
-    
-    Returns:
-        Dict[cod_ibge, area_km2]
-    """
-    logger.info("fetching_area_from_sidra", url=SIDRA_AREA_URL)
-    
-    try:
-        response = requests.get(SIDRA_AREA_URL, timeout=60)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        area_map = {}
-        
-        # Parse da resposta SIDRA
-        # Estrutura: [{"D1C": "4200051", "D1N": "Abdon Batista (SC)", "V": "235.6", "D2C": "615", ...}]
-        
-        for i, row in enumerate(data):
-            # Skip primeira linha (header)
-            if i == 0:
-                continue
-            
-            # Dados estão em D1C (código município) e V (valor)
-            cod_ibge = str(row.get("D1C", ""))
-            valor_str = str(row.get("V", "0"))
-            variavel_cod = str(row.get("D2C", ""))
-            
-            # Filtrar apenas variável 615 (área territorial)
-            if variavel_cod != "615":
-                continue
-            
-            # Filtrar apenas SC (código começa com 42)
-            if not cod_ibge or not cod_ibge.startswith("42"):
-                continue
-            
-            # Validar código IBGE (7 dígitos)
-            if len(cod_ibge) != 7:
-                continue
-            
-            # Converter área (usar vírgula como separador decimal)
-            try:
-                area = float(valor_str.replace(",", "."))
-                area_map[cod_ibge] = round(area, 3)
-            except (ValueError, TypeError):
-                area_map[cod_ibge] = 0.0
-        
-        logger.info(
-            "area_fetched",
-            total_municipios=len(area_map),
-        )
-        
-        return area_map
-        
-    except Exception as e:
-        logger.error(
-            "failed_to_fetch_area_sidra",
-            error=str(e),
-        )
-        raise
-
-
-def get_municipios_data_sidra() -> Dict[str, Dict[str, any]]:
-    """
-    Buscar população 2022 de todos os municípios via API SIDRA.
-    
-    Tabela 4709: População residente (Censo 2022).
-    
-    Returns:
-        Dict[cod_ibge, {"populacao": int, "nome": str}]
-    """
-    logger.info("fetching_from_sidra", url=SIDRA_POPULACAO_URL)
-    
-    try:
-        response = requests.get(SIDRA_POPULACAO_URL, timeout=60)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        municipios_data = {}
-        
-        # Parse da resposta SIDRA
-        # Estrutura: [{"NC": "6", "NN": "Município", "MC": "45", "MN": "Pessoas", "V": "500000", "D1C": "4200051", "D1N": "Florianópolis (SC)", ...}]
-        # Primeira linha é header
-        
-        for i, row in enumerate(data):
-            # Skip primeira linha (header)
-            if i == 0:
-                continue
-            
-            # Dados estão em D1C (código município) e V (valor)
-            cod_ibge = str(row.get("D1C", ""))
-            valor_str = str(row.get("V", "0"))
-            nome_completo = str(row.get("D1N", ""))
-            
-            # Filtrar apenas SC (código começa com 42)
-            if not cod_ibge or not cod_ibge.startswith("42"):
-                continue
-            
-            # Validar código IBGE (7 dígitos)
-            if len(cod_ibge) != 7:
-                continue
-            
-            # Remover " (SC)" do nome
-            nome = nome_completo.replace(" (SC)", "").strip()
-            
-            # Converter população
-            try:
-                populacao = int(valor_str)
-            except (ValueError, TypeError):
-                populacao = 0
-            
-            municipios_data[cod_ibge] = {
-                "populacao": populacao,
-                "nome": nome,
-            }
-        
-        logger.info(
-            "sidra_data_fetched",
-            total_municipios=len(municipios_data),
-        )
-        
-        return municipios_data
-        
-    except Exception as e:
-        logger.error(
-            "failed_to_fetch_sidra",
-            error=str(e),
-        )
-        raise
-
 
 def get_municipio_area_ibge(cod_ibge: str) -> float:
     """
@@ -196,7 +51,7 @@ def get_municipio_area_ibge(cod_ibge: str) -> float:
     url = f"https://servicodados.ibge.gov.br/api/v1/localidades/municipios/{cod_ibge}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -218,203 +73,157 @@ def get_municipio_area_ibge(cod_ibge: str) -> float:
         return 0.0
 
 
-def connect_sheets() -> gspread.Spreadsheet:
+def _column_updates(
+    col: int,
+    mask: pd.Series,
+    valores: pd.Series,
+) -> List[Dict[str, Any]]:
     """
-    Conectar ao Google Sheets usando service account.
-
+    Montar escritas de uma coluna agrupando linhas alteradas consecutivas.
+    
+    Args:
+        col: Coluna (1-based) na planilha
+        mask: Linhas (0-based, sem header) que devem ser escritas
+        valores: Valores novos, alinhados com `mask`
+        
     Returns:
-        Objeto da planilha conectada
-
-    Raises:
-        ValueError: Se credenciais não configuradas
-        gspread.exceptions.APIError: Se falhar ao conectar
+        Lista de {"range", "values"} (vazia se nada mudou)
     """
-    creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS_PATH")
-    sheet_id = os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
-
-    if not creds_path or not sheet_id:
-        raise ValueError(
-            "Variáveis GOOGLE_SHEETS_CREDENTIALS_PATH e GOOGLE_SHEETS_SPREADSHEET_ID "
-            "devem estar definidas no arquivo .env"
-        )
-
-    logger.info("connecting_to_sheets", credentials_path=creds_path)
-
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive.file",
-    ]
-
-    credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
-    client = gspread.authorize(credentials)
-
-    spreadsheet = client.open_by_key(sheet_id)
-
-    logger.info("sheets_connected", spreadsheet_title=spreadsheet.title)
-
-    return spreadsheet
+    valores_py = valores.astype(object).tolist()
+    
+    return coalesce_row_updates(
+        # +2 porque: +1 para header, +1 para 1-indexed
+        {int(i) + 2: [valores_py[i]] for i in np.flatnonzero(mask.to_numpy(dtype=bool))},
+        first_col=col,
+    )
 
 
 def update_municipios_data(
-    spreadsheet: gspread.Spreadsheet,
+    spreadsheet: Optional[gspread.Spreadsheet],
     dry_run: bool = False,
     verbose: bool = False,
+    use_cache: bool = False,
 ) -> Dict[str, int]:
     """
     Atualizar população e área em dim_geo.
     
+    Após cada leitura bem-sucedida do Sheets, salva um snapshot local de
+    dim_geo (já com as atualizações aplicadas) para dry-runs futuros.
+    
     Args:
-        spreadsheet: Planilha conectada
+        spreadsheet: Planilha conectada (None apenas em dry-run com snapshot)
         dry_run: Se True, não faz alterações
         verbose: Se True, mostra detalhes
+        use_cache: Se True e dry_run, lê dim_geo do snapshot local
         
     Returns:
         Dict com estatísticas da atualização
     """
-    worksheet = spreadsheet.worksheet("dim_geo")
+    usar_snapshot = use_cache and dry_run
+    header, rows, col_index = get_dim_geo_rows(spreadsheet, use_cache=usar_snapshot)
     
-    logger.info("fetching_dim_geo_data")
+    idx_cod_ibge = col_index["cod_ibge"]
+    idx_nome = col_index["nome_municipio"]
+    idx_pop = col_index["populacao_2022"]
+    idx_area = col_index["area_km2"]
     
-    # Pegar todos os dados
-    all_data = worksheet.get_all_values()
+    print(f"\n📊 Encontrados {len(rows)} municípios em dim_geo")
     
-    if not all_data:
-        logger.error("empty_worksheet")
-        raise ValueError("Worksheet dim_geo está vazia")
+    # Buscar dados do SIDRA (população e área em paralelo)
+    print("\n🔄 Buscando população (SIDRA/Censo 2022) e área territorial (SIDRA/Tabela 1301)...")
+    municipios_sidra, area_sidra = fetch_sidra_populacao_e_area()
     
-    # Header na primeira linha
-    header = all_data[0]
-    rows = all_data[1:]
+    print(f"   ✓ {len(municipios_sidra)} municípios SC com dados de população")
+    print(f"   ✓ {len(area_sidra)} municípios SC com dados de área")
     
-    # Identificar índices das colunas
-    try:
-        idx_cod_ibge = header.index("cod_ibge")
-        idx_nome = header.index("nome_municipio")
-        idx_pop = header.index("populacao_2022")
-        idx_area = header.index("area_km2")
-    except ValueError as e:
-        logger.error("missing_column", error=str(e))
-        raise ValueError(f"Coluna não encontrada: {e}")
+    # Comparação vetorizada entre dim_geo e SIDRA
+    df = pd.DataFrame(rows, columns=header)
     
-    print(f"\n📊 Encontrados {len(rows)} municípios em dim_geo")
+    # Lookup por hash do cod_ibge; só as linhas com dados no SIDRA são comparadas
+    tem_dados = df.iloc[:, idx_cod_ibge].isin(municipios_sidra.keys())
+    com_dados = df.loc[tem_dados]
+    cod_ibge = com_dados.iloc[:, idx_cod_ibge]
     
-    # Buscar dados do SIDRA
-    print("\n🔄 Buscando dados de população (SIDRA/Censo 2022)...")
-    municipios_sidra = get_municipios_data_sidra()
+    pop_sidra = cod_ibge.map(
+        lambda cod: municipios_sidra[cod]["populacao"]
+    ).astype("Int64").reindex(df.index)
     
-    print(f"   ✓ {len(municipios_sidra)} municípios SC com dados de população")
+    # População: vazia, "0" ou diferente do SIDRA
+    pop_atual = com_dados.iloc[:, idx_pop]
+    mask_pop = (pop_atual != pop_sidra[tem_dados].astype(str)).reindex(
+        df.index, fill_value=False
+    )
     
-    print("\n🔄 Buscando dados de área territorial (SIDRA/Tabela 1301)...")
-    area_sidra = get_municipios_area_sidra()
-    
-    print(f"   ✓ {len(area_sidra)} municípios SC com dados de área")
+    # Área: só atualiza se zerada (pode ser "", "0", "0.0", "0,0", etc.)
+    area_atual = pd.to_numeric(
+        com_dados.iloc[:, idx_area].str.strip().str.replace(",", ".", regex=False),
+        errors="coerce",
+    ).fillna(0.0)
+    area_nova = cod_ibge.map(area_sidra).fillna(0.0).reindex(df.index, fill_value=0.0)
+    mask_area_zerada = (area_atual == 0.0).reindex(df.index, fill_value=False)
+    mask_area = mask_area_zerada & (area_nova > 0)
     
     # Estatísticas
     stats = {
         "total": len(rows),
-        "atualizados_pop": 0,
-        "atualizados_area": 0,
-        "sem_dados": 0,
+        "atualizados_pop": int(mask_pop.sum()),
+        "atualizados_area": int(mask_area.sum()),
+        "sem_dados": int((~tem_dados).sum()),
     }
     
-    # Preparar atualizações em batch
-    updates = []
+    if verbose:
+        for nome in df.loc[~tem_dados].iloc[:, idx_nome]:
+            print(f"   ⚠ {nome}: sem dados no SIDRA")
     
     print("\n🔄 Processando atualizações...")
     
-    for i, row in enumerate(tqdm(rows, desc="   Verificando")):
-        cod_ibge = row[idx_cod_ibge]
-        nome = row[idx_nome]
-        pop_atual = row[idx_pop]
-        area_atual = row[idx_area]
-        
-        # Dados do SIDRA
-        dados_sidra = municipios_sidra.get(cod_ibge)
-        
-        if not dados_sidra:
-            stats["sem_dados"] += 1
-            if verbose:
-                print(f"   ⚠ {nome}: sem dados no SIDRA")
-            continue
-        
-        # Preparar atualização (índice + 2 porque: +1 para header, +1 para 1-indexed)
-        row_num = i + 2
-        
-        # Verificar se precisa atualizar população
-        populacao = dados_sidra["populacao"]
-        precisa_atualizar_pop = (
-            not pop_atual or 
-            pop_atual == "0" or 
-            str(pop_atual) != str(populacao)
-        )
-        
-        if precisa_atualizar_pop:
-            updates.append({
-                "range": f"F{row_num}",  # populacao_2022 (coluna F)
-                "values": [[populacao]],
-            })
-            stats["atualizados_pop"] += 1
-        
-        # Verificar se precisa atualizar área
-        try:
-            # Normalizar área (pode ser "0", "0.0", "0,0", etc.)
-            area_str = area_atual.strip().replace(",", ".") if area_atual else "0"
-            area_valor = float(area_str) if area_str else 0.0
-        except (ValueError, AttributeError):
-            area_valor = 0.0
-        
-        precisa_atualizar_area = (area_valor == 0.0)
-        
-        if precisa_atualizar_area:
-            # Buscar área no mapa do SIDRA
-            area = area_sidra.get(cod_ibge, 0.0)
-            
-            if area > 0:
-                updates.append({
-                    "range": f"G{row_num}",  # area_km2 (coluna G)
-                    "values": [[area]],
-                })
-                stats["atualizados_area"] += 1
-        
-        if verbose and (precisa_atualizar_pop or precisa_atualizar_area):
+    if verbose:
+        alteradas = df.loc[mask_pop | mask_area].index
+        for i in tqdm(
+            alteradas,
+            desc="   Verificando",
+            mininterval=1.0,
+            miniters=max(1, len(alteradas) // 20),
+            disable=not sys.stdout.isatty(),
+        ):
             status = []
-            if precisa_atualizar_pop:
-                status.append(f"pop={populacao:,}")
-            if precisa_atualizar_area:
-                area = area_sidra.get(cod_ibge, 0.0)
-                if area > 0:
-                    status.append(f"área={area} km²")
-            
-            if status:
-                print(f"   ✓ {nome}: {', '.join(status)}")
+            if mask_pop[i]:
+                status.append(f"pop={pop_sidra[i]:,}")
+            if mask_area[i]:
+                status.append(f"área={area_nova[i]} km²")
+            print(f"   ✓ {df.iat[i, idx_nome]}: {', '.join(status)}")
+    
+    # Um range por sequência contínua de linhas alteradas em cada coluna
+    updates = (
+        _column_updates(idx_pop + 1, mask_pop, pop_sidra)
+        + _column_updates(idx_area + 1, mask_area, area_nova)
+    )
+    total_celulas = stats["atualizados_pop"] + stats["atualizados_area"]
     
-    # Aplicar atualizações em batch
+    # Aplicar atualizações
     if updates and not dry_run:
-        logger.info("applying_updates", count=len(updates))
-        
-        print(f"\n💾 Aplicando {len(updates)} atualizações no Google Sheets...")
+        logger.info("applying_updates", count=total_celulas, ranges=len(updates))
         
-        # Batch update (100 por vez)
-        batch_size = 100
+        print(f"\n💾 Aplicando {total_celulas} atualizações no Google Sheets...")
         
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i + batch_size]
-            worksheet.batch_update(batch)
-            
-            if verbose:
-                print(f"   ✓ Batch {i // batch_size + 1}/{(len(updates) + batch_size - 1) // batch_size}")
-            
-            time.sleep(1)  # Rate limit
+        apply_updates(get_worksheet(spreadsheet, "dim_geo"), updates)
         
-        logger.info("updates_applied", count=len(updates))
+        logger.info("updates_applied", count=total_celulas)
         print("   ✅ Atualizações concluídas!")
+        
+        # Refletir no snapshot o que foi escrito na planilha
+        df.iloc[:, idx_pop] = df.iloc[:, idx_pop].mask(mask_pop, pop_sidra.astype(str))
+        df.iloc[:, idx_area] = df.iloc[:, idx_area].mask(mask_area, area_nova.astype(str))
     
     elif dry_run:
-        print(f"\n🔍 DRY RUN: {len(updates)} atualizações seriam aplicadas")
+        print(f"\n🔍 DRY RUN: {total_celulas} atualizações seriam aplicadas")
     
     else:
         print("\n✅ Nenhuma atualização necessária")
     
+    if not usar_snapshot:
+        save_dim_geo_snapshot([header] + df.values.tolist())
+    
     return stats
 
 
@@ -433,6 +242,16 @@ def main():
         action="store_true",
         help="Mostrar detalhes de cada município",
     )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Em --dry-run, ler dim_geo do snapshot local (válido por 1 dia)",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignorar o snapshot local e reler dim_geo do Google Sheets",
+    )
 
     args = parser.parse_args()
 
@@ -441,16 +260,24 @@ def main():
     print("═" * 63)
 
     try:
-        # Conectar ao Google Sheets
-        print("\n🔍 Conectando ao Google Sheets...")
-        spreadsheet = connect_sheets()
-        print("   ✅ Conectado à planilha")
+        use_cache = args.use_cache and not args.refresh_cache
+
+        if args.dry_run and use_cache and load_dim_geo_snapshot() is not None:
+            # Snapshot válido: dry-run não precisa do Google Sheets
+            print("\n📦 Usando snapshot local de dim_geo")
+            spreadsheet = None
+        else:
+            # Conectar ao Google Sheets
+            print("\n🔍 Conectando ao Google Sheets...")
+            spreadsheet = connect_sheets()
+            print("   ✅ Conectado à planilha")
 
         # Atualizar dados
         stats = update_municipios_data(
             spreadsheet,
             dry_run=args.dry_run,
             verbose=args.verbose,
+            use_cache=use_cache,
         )
 
         # Resumo
@@ -1,139 +1,31 @@
 """
 Script para atualizar população 2022 e área dos municípios em dim_geo.
 
-Busca dados via API IBGE alternativa (mais estável) e atualiza Google Sheets.
+Busca dados em lote via API IBGE Sidra (uma requisição por tabela) e
+atualiza Google Sheets.
 
 Autor: Sistema de ETL - Construction Data Pipeline
 Data: 2025-11-13
 """
 
 import argparse
-import os
 import sys
-import time
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
 import gspread
-import requests
 import structlog
-from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
 from tqdm import tqdm
 
-# Configurar logger estruturado
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        structlog.processors.JSONRenderer(),
-    ]
+from src.scripts._sheets_common import (
+    apply_updates,
+    coalesce_row_updates,
+    connect_sheets,
+    fetch_sidra_populacao_e_area,
+    get_dim_geo_rows,
+    get_worksheet,
 )
-logger = structlog.get_logger()
-
-# Carregar variáveis de ambiente
-load_dotenv()
-
-
-def get_municipio_data_ibge(cod_ibge: str) -> Dict[str, any]:
-    """
-    Buscar dados completos de um município via API IBGE.
-    
-    Usa endpoint individual que é mais estável que agregados.
-    
-    Args:
-        cod_ibge: Código IBGE do município (7 dígitos)
-        
-    Returns:
-        Dict com populacao_2022 e area_km2
-    """
-    # Endpoint mais estável: detalhes do município
-    url = f"https://servicodados.ibge.gov.br/api/v1/localidades/municipios/{cod_ibge}"
-    
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Extrair área territorial
-        area_km2 = float(data.get("area", {}).get("territorial", 0))
-        
-        # Para população, usar estimativa 2022 do endpoint de projeções
-        pop_url = f"https://servicodados.ibge.gov.br/api/v3/agregados/6579/periodos/2022/variaveis/9324?localidades=N6[{cod_ibge}]"
-        
-        pop_response = requests.get(pop_url, timeout=10)
-        populacao = 0
-        
-        if pop_response.status_code == 200:
-            pop_data = pop_response.json()
-            
-            if pop_data and len(pop_data) > 0:
-                resultados = pop_data[0].get("resultados", [])
-                
-                if resultados:
-                    series = resultados[0].get("series", [])
-                    
-                    if series:
-                        valor_pop = series[0].get("serie", {}).get("2022", "0")
-                        
-                        # Remover pontos de milhar
-                        valor_pop = valor_pop.replace(".", "")
-                        populacao = int(valor_pop) if valor_pop.isdigit() else 0
-        
-        return {
-            "populacao_2022": populacao,
-            "area_km2": round(area_km2, 3),
-        }
-        
-    except Exception as e:
-        logger.warning(
-            "failed_to_fetch_municipio_data",
-            cod_ibge=cod_ibge,
-            error=str(e),
-        )
-        return {
-            "populacao_2022": 0,
-            "area_km2": 0.0,
-        }
-
 
-def connect_sheets() -> gspread.Spreadsheet:
-    """
-    Conectar ao Google Sheets usando service account.
-
-    Returns:
-        Objeto da planilha conectada
-
-    Raises:
-        ValueError: Se credenciais não configuradas
-        gspread.exceptions.APIError: Se falhar ao conectar
-    """
-    creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS_PATH")
-    sheet_id = os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
-
-    if not creds_path or not sheet_id:
-        raise ValueError(
-            "Variáveis GOOGLE_SHEETS_CREDENTIALS_PATH e GOOGLE_SHEETS_SPREADSHEET_ID "
-            "devem estar definidas no arquivo .env"
-        )
-
-    logger.info("connecting_to_sheets", credentials_path=creds_path)
-
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive.file",
-    ]
-
-    credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
-    client = gspread.authorize(credentials)
-
-    spreadsheet = client.open_by_key(sheet_id)
-
-    logger.info("sheets_connected", spreadsheet_title=spreadsheet.title)
-
-    return spreadsheet
+logger = structlog.get_logger()
 
 
 def update_populacao_dim_geo(
@@ -152,30 +44,13 @@ def update_populacao_dim_geo(
     Returns:
         Dict com estatísticas da atualização
     """
-    worksheet = spreadsheet.worksheet("dim_geo")
-    
-    logger.info("fetching_dim_geo_data")
-    
-    # Pegar todos os dados
-    all_data = worksheet.get_all_values()
-    
-    if not all_data:
-        logger.error("empty_worksheet")
-        raise ValueError("Worksheet dim_geo está vazia")
+    worksheet = get_worksheet(spreadsheet, "dim_geo")
+    header, rows, col_index = get_dim_geo_rows(spreadsheet)
     
-    # Header na primeira linha
-    header = all_data[0]
-    rows = all_data[1:]
-    
-    # Identificar índices das colunas
-    try:
-        idx_cod_ibge = header.index("cod_ibge")
-        idx_nome = header.index("nome_municipio")
-        idx_pop = header.index("populacao_2022")
-        idx_area = header.index("area_km2")
-    except ValueError as e:
-        logger.error("missing_column", error=str(e))
-        raise ValueError(f"Coluna não encontrada: {e}")
+    idx_cod_ibge = col_index["cod_ibge"]
+    idx_nome = col_index["nome_municipio"]
+    idx_pop = col_index["populacao_2022"]
+    idx_area = col_index["area_km2"]
     
     print(f"\n📊 Encontrados {len(rows)} municípios em dim_geo")
     
@@ -187,12 +62,29 @@ def update_populacao_dim_geo(
         "erros": 0,
     }
     
-    # Preparar atualizações em batch
-    updates = []
+    # Valores por linha no intervalo de colunas população..área
+    primeira_col = min(idx_pop, idx_area)
+    ultima_col = max(idx_pop, idx_area)
+    row_values = {}
     
-    print("\n🔄 Buscando dados na API IBGE...")
+    print("\n🔄 Buscando dados na API IBGE (SIDRA)...")
+    
+    # Duas requisições em lote (em paralelo) substituem as chamadas por município
+    municipios_sidra, area_map = fetch_sidra_populacao_e_area()
+    pop_map: Dict[str, int] = {
+        cod: dados["populacao"] for cod, dados in municipios_sidra.items()
+    }
     
-    for i, row in enumerate(tqdm(rows, desc="   Processando")):
+    # Barra só em modo verbose e em terminal interativo (não em CI/cron)
+    progresso = tqdm(
+        rows,
+        desc="   Processando",
+        mininterval=1.0,
+        miniters=max(1, len(rows) // 20),
+        disable=not verbose or not sys.stdout.isatty(),
+    )
+    
+    for i, row in enumerate(progresso):
         cod_ibge = row[idx_cod_ibge]
         nome = row[idx_nome]
         pop_atual = row[idx_pop]
@@ -212,8 +104,10 @@ def update_populacao_dim_geo(
                 print(f"   ✓ {nome}: já tem dados")
             continue
         
-        # Buscar dados na API
-        data = get_municipio_data_ibge(cod_ibge)
+        data = {
+            "populacao_2022": pop_map.get(cod_ibge, 0),
+            "area_km2": area_map.get(cod_ibge, 0.0),
+        }
         
         if data["populacao_2022"] > 0:
             stats["com_populacao"] += 1
@@ -227,24 +121,20 @@ def update_populacao_dim_geo(
         # Preparar atualização (índice + 2 porque: +1 para header, +1 para 1-indexed)
         row_num = i + 2
         
-        # Atualizar células
-        updates.append({
-            "range": f"E{row_num}",  # populacao_2022 (coluna F)
-            "values": [[data["populacao_2022"]]],
-        })
-        
-        updates.append({
-            "range": f"G{row_num}",  # area_km2 (coluna G)
-            "values": [[data["area_km2"]]],
-        })
+        # População e área em um único range; colunas intermediárias
+        # (se houver) mantêm o valor atual
+        valores = row[primeira_col:ultima_col + 1]
+        valores[idx_pop - primeira_col] = data["populacao_2022"]
+        valores[idx_area - primeira_col] = data["area_km2"]
+        row_values[row_num] = valores
         
         stats["atualizados"] += 1
         
         if verbose:
             print(f"   ✓ {nome}: pop={data['populacao_2022']:,}, área={data['area_km2']} km²")
-        
-        # Rate limit: 60 requests/minute
-        time.sleep(0.1)
+    
+    # Linhas consecutivas viram um único range retangular
+    updates = coalesce_row_updates(row_values, first_col=primeira_col + 1)
     
     # Aplicar atualizações em batch
     if updates and not dry_run:
@@ -252,15 +142,14 @@ def update_populacao_dim_geo(
         
         print(f"\n💾 Aplicando {len(updates)} atualizações...")
         
-        # Batch update (100 por vez para não estourar limites)
-        batch_size = 100
-        
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i + batch_size]
-            worksheet.batch_update(batch)
-            
-            if verbose:
-                print(f"   ✓ Batch {i // batch_size + 1}/{(len(updates) + batch_size - 1) // batch_size}")
+        # USER_ENTERED reinterpreta valores exibidos preservados como os originais
+        apply_updates(
+            worksheet,
+            updates,
+            batch_size=500,
+            value_input_option="USER_ENTERED",
+            verbose=verbose,
+        )
         
         logger.info("updates_applied", count=len(updates))
     
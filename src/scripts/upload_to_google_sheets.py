@@ -8,6 +8,7 @@ Uso:
     python -m src.scripts.upload_to_google_sheets
     python -m src.scripts.upload_to_google_sheets --file custom.md --tab-name nova_aba
     python -m src.scripts.upload_to_google_sheets --dry-run
+    python -m src.scripts.upload_to_google_sheets --format parquet
 
 Requisitos:
     - Arquivo .env com GOOGLE_SHEETS_CREDENTIALS_PATH e GOOGLE_SHEETS_SPREADSHEET_ID
@@ -18,20 +19,41 @@ Requisitos:
 import sys
 import argparse
 import time
+from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import pandas as pd
 import gspread
-from gspread_dataframe import set_with_dataframe
+from gspread.utils import rowcol_to_a1
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import os
 import structlog
 
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Configurar logger
 logger = structlog.get_logger(__name__)
 
+# Formatos de entrada suportados por load_dataframe
+INPUT_FORMATS = ("auto", "parquet", "feather", "tsv")
+
+# Linhas por chamada values.update em upload_dataframe_to_sheet
+WRITE_CHUNK_ROWS = 50_000
+
+# Formato numérico aplicado a cada coluna, se presente no DataFrame
+FORMAT_RULES = {
+    "valor": {"type": "NUMBER", "pattern": "#,##0.00"},
+    "data_referencia": {"type": "DATE", "pattern": "yyyy-mm-dd"},
+}
+
 
 def authenticate_gspread(credentials_path: str) -> gspread.Client:
     """
@@ -67,8 +89,14 @@ def authenticate_gspread(credentials_path: str) -> gspread.Client:
             scopes=scopes
         )
         
-        # Autenticar
-        client = gspread.authorize(credentials)
+        # Sessão autenticada com pool de conexões (keep-alive entre chamadas);
+        # o token OAuth é obtido uma vez e só renovado quando expirar
+        authed_session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        authed_session.mount("https://", adapter)
+        
+        # Autenticar reutilizando a sessão
+        client = gspread.authorize(credentials, session=authed_session)
         
         print("  ✅ Autenticação bem-sucedida!\n")
         logger.info("google_sheets_authenticated", credentials_path=credentials_path)
@@ -80,6 +108,53 @@ def authenticate_gspread(credentials_path: str) -> gspread.Client:
         raise ValueError(f"Falha na autenticação: {str(e)}")
 
 
+def _iso(value):
+    """Converte date/datetime (inclui pd.Timestamp) em texto ISO; demais valores passam."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _dates_to_iso(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte colunas de data/timestamp em texto ISO para o JSON da API.
+    
+    Parquet/Feather e o TSV lido com engine="pyarrow" trazem datas como
+    datetime64 ou objetos date/Timestamp, que o encoder JSON do gspread
+    não serializa. Datas sem hora viram "YYYY-MM-DD" (USER_ENTERED as
+    interpreta como data); nulos continuam nulos.
+    
+    Args:
+        df: DataFrame a enviar
+        
+    Returns:
+        DataFrame com as colunas de data convertidas (o original não muda)
+    """
+    converted = {}
+    
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            valid = series.dropna()
+            only_dates = (valid == valid.dt.normalize()).all()
+            fmt = "%Y-%m-%d" if only_dates else "%Y-%m-%d %H:%M:%S"
+            converted[col] = series.dt.strftime(fmt)
+        elif series.dtype == object:
+            has_dates = series.map(lambda v: isinstance(v, date)).any()
+            if has_dates:
+                converted[col] = series.map(_iso)
+    
+    if not converted:
+        return df
+    
+    df = df.copy()
+    for col, values in converted.items():
+        df[col] = values
+    return df
+
+
 def upload_dataframe_to_sheet(
     df: pd.DataFrame,
     client: gspread.Client,
@@ -147,54 +222,80 @@ def upload_dataframe_to_sheet(
                 "time_elapsed": 0.0
             }
         
-        # Limpar aba completamente
-        print(f"  🧹 Limpando aba '{sheet_name}'...")
-        worksheet.clear()
+        start_time = time.time()
+        n_rows = len(df) + 1  # +1 para o header
+        n_cols = len(df.columns)
+        
+        # Redimensionar + limpar + formatar em uma única chamada batch_update
+        print(f"  🧹 Limpando e redimensionando aba '{sheet_name}'...")
+        batch_requests = [
+            {
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": worksheet.id,
+                        "gridProperties": {"rowCount": n_rows, "columnCount": n_cols},
+                    },
+                    "fields": "gridProperties(rowCount,columnCount)",
+                }
+            },
+            {
+                "updateCells": {
+                    "range": {"sheetId": worksheet.id},
+                    "fields": "userEnteredValue",
+                }
+            },
+        ]
+        
+        # Formatar colunas conforme FORMAT_RULES (ex.: "valor" com 2 casas decimais)
+        col_idx = {name: i for i, name in enumerate(df.columns)}  # 0-based (GridRange)
+        formatted = {col: rule for col, rule in FORMAT_RULES.items() if col in col_idx}
+        
+        for col, rule in formatted.items():
+            batch_requests.append({
+                "repeatCell": {
+                    "range": {
+                        "sheetId": worksheet.id,
+                        "startRowIndex": 1,
+                        "endRowIndex": n_rows,
+                        "startColumnIndex": col_idx[col],
+                        "endColumnIndex": col_idx[col] + 1,
+                    },
+                    "cell": {"userEnteredFormat": {"numberFormat": rule}},
+                    "fields": "userEnteredFormat.numberFormat",
+                }
+            })
+        
+        spreadsheet.batch_update({"requests": batch_requests})
         logger.info("worksheet_cleared", sheet_name=sheet_name)
+        for col, rule in formatted.items():
+            logger.info("column_formatted", column=col, pattern=rule["pattern"])
         
-        # Fazer upload
-        start_time = time.time()
+        # Fazer upload (header + dados) em blocos de WRITE_CHUNK_ROWS linhas:
+        # só um bloco convertido para lista Python por vez
         print(f"  📤 Enviando {len(df):,} linhas...")
         
-        # Converter DataFrame para formato adequado
-        # Substituir NaN por string vazia para evitar problemas
-        df_upload = df.fillna("")
-        
-        # Fazer upload do DataFrame
-        set_with_dataframe(
-            worksheet,
-            df_upload,
-            include_index=False,
-            include_column_header=True,
-            resize=True
-        )
+        # Datas (Parquet/Feather/pyarrow) viram texto ISO serializável em JSON
+        df = _dates_to_iso(df)
+        
+        for start in range(0, len(df), WRITE_CHUNK_ROWS):
+            block = df.iloc[start:start + WRITE_CHUNK_ROWS]
+            
+            # Substituir NaN por string vazia para evitar problemas
+            values = block.astype(object).where(block.notna(), "").values.tolist()
+            
+            # Header vai junto com o primeiro bloco
+            first_row = start + 2  # +1 header, +1 porque Sheets é 1-indexed
+            if start == 0:
+                values.insert(0, df.columns.tolist())
+                first_row = 1
+            
+            data_range = f"{rowcol_to_a1(first_row, 1)}:{rowcol_to_a1(first_row + len(values) - 1, n_cols)}"
+            worksheet.update(values, data_range, value_input_option="USER_ENTERED")
         
         elapsed = time.time() - start_time
         
         print(f"  ✅ Upload concluído em {elapsed:.2f}s\n")
         
-        # Formatar coluna "valor" como número com 2 casas decimais
-        print("  🎨 Formatando coluna 'valor'...")
-        try:
-            # Encontrar índice da coluna "valor"
-            valor_col_idx = list(df.columns).index("valor") + 1  # +1 porque Sheets é 1-indexed
-            
-            # Formatar coluna inteira
-            worksheet.format(
-                f"{chr(64 + valor_col_idx)}2:{chr(64 + valor_col_idx)}{len(df) + 1}",
-                {
-                    "numberFormat": {
-                        "type": "NUMBER",
-                        "pattern": "#,##0.00"
-                    }
-                }
-            )
-            print(f"  ✅ Coluna 'valor' formatada\n")
-            logger.info("column_formatted", column="valor", pattern="#,##0.00")
-        except Exception as e:
-            print(f"  ⚠️  Não foi possível formatar coluna 'valor': {str(e)}\n")
-            logger.warning("column_format_failed", column="valor", error=str(e))
-        
         logger.info("upload_completed",
                    sheet_name=sheet_name,
                    rows=len(df),
@@ -219,12 +320,47 @@ def upload_dataframe_to_sheet(
         raise
 
 
-def load_dataframe(file_path: str) -> pd.DataFrame:
+def _resolve_input(file_path: str, file_format: str) -> Tuple[Path, str]:
+    """
+    Resolve o arquivo e o formato efetivos de leitura.
+    
+    No modo "auto", prefere um .parquet/.feather com o mesmo nome ao lado do
+    TSV (leitura colunar, sem parsing de texto) e cai para o TSV se ausente
+    ou se o pyarrow não estiver instalado.
+    
+    Args:
+        file_path: Caminho informado na CLI
+        file_format: Um de INPUT_FORMATS
+        
+    Returns:
+        Tupla (caminho, formato)
+    """
+    path = Path(file_path)
+    
+    if file_format != "auto":
+        return path, file_format
+    
+    suffix = path.suffix.lstrip(".")
+    if suffix in ("parquet", "feather"):
+        return path, suffix
+    
+    if PYARROW_AVAILABLE:
+        for fmt in ("parquet", "feather"):
+            candidate = path.with_suffix(f".{fmt}")
+            if candidate.exists():
+                return candidate, fmt
+    
+    return path, "tsv"
+
+
+def load_dataframe(file_path: str, file_format: str = "auto") -> pd.DataFrame:
     """
-    Carrega DataFrame do arquivo TSV.
+    Carrega DataFrame do arquivo Parquet, Feather ou TSV.
     
     Args:
         file_path: Caminho para o arquivo
+        file_format: Formato de leitura (ver INPUT_FORMATS); "auto" prefere
+            Parquet/Feather ao lado do TSV
         
     Returns:
         DataFrame carregado
@@ -233,29 +369,39 @@ def load_dataframe(file_path: str) -> pd.DataFrame:
         FileNotFoundError: Se arquivo não existe
         ValueError: Se arquivo está vazio ou malformado
     """
-    print(f"📊 Carregando dados de {file_path}...")
+    path, file_format = _resolve_input(file_path, file_format)
     
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    print(f"📊 Carregando dados de {path} ({file_format})...")
+    
+    if not path.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
     
     try:
-        df = pd.read_csv(file_path, sep="\t")
+        if file_format == "parquet":
+            df = pd.read_parquet(path, engine="pyarrow")
+        elif file_format == "feather":
+            df = pd.read_feather(path)
+        elif PYARROW_AVAILABLE:
+            df = pd.read_csv(path, sep="\t", engine="pyarrow")
+        else:
+            df = pd.read_csv(path, sep="\t")
         
         if df.empty:
-            raise ValueError(f"Arquivo está vazio: {file_path}")
+            raise ValueError(f"Arquivo está vazio: {path}")
         
         print(f"  ✅ {len(df):,} linhas carregadas")
         print(f"  ✅ {len(df.columns)} colunas: {list(df.columns)}\n")
         
         logger.info("dataframe_loaded",
-                   file_path=file_path,
+                   file_path=str(path),
+                   file_format=file_format,
                    rows=len(df),
                    cols=len(df.columns))
         
         return df
         
     except Exception as e:
-        logger.error("dataframe_load_failed", file_path=file_path, error=str(e))
+        logger.error("dataframe_load_failed", file_path=str(path), error=str(e))
         raise ValueError(f"Erro ao carregar arquivo: {str(e)}")
 
 
@@ -272,6 +418,7 @@ Exemplos de uso:
   python -m src.scripts.upload_to_google_sheets --file custom.md
   python -m src.scripts.upload_to_google_sheets --tab-name nova_aba
   python -m src.scripts.upload_to_google_sheets --dry-run
+  python -m src.scripts.upload_to_google_sheets --format parquet
 
 Configuração:
   Crie arquivo .env na raiz do projeto com:
@@ -287,6 +434,13 @@ Configuração:
         help="Caminho do arquivo a ser enviado (default: docs/fact_cub_detalhado_CORRIGIDO_V3.md)"
     )
     
+    parser.add_argument(
+        "--format",
+        choices=INPUT_FORMATS,
+        default="auto",
+        help="Formato do arquivo (default: auto - usa .parquet/.feather ao lado do arquivo, se existir)"
+    )
+    
     parser.add_argument(
         "--sheet-id",
         type=str,
@@ -337,7 +491,7 @@ Configuração:
             print("🔍 MODO DRY RUN - Nenhuma modificação será feita\n")
         
         # 1. Carregar dados
-        df = load_dataframe(args.file)
+        df = load_dataframe(args.file, args.format)
         
         # 2. Autenticar
         client = authenticate_gspread(credentials_path)
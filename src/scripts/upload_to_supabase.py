@@ -9,7 +9,7 @@ para o banco PostgreSQL do Supabase.
 FUNCIONALIDADES:
 - Lê CSVs da pasta production_ready
 - Converte NaN para None (compatível com PostgreSQL)
-- Faz Upsert em lotes (chunks) de 1000 registros
+- Lê os CSVs em streaming e faz Upsert em lotes (chunks) de 1000 registros
 - Tratamento de erros por arquivo (continua se um falhar)
 - Logging detalhado de progresso
 
@@ -31,13 +31,24 @@ Versão: 1.0
 import os
 import sys
 import argparse
-import pandas as pd
 import numpy as np
+import orjson
+import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import logging
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Configuração de logging
 logging.basicConfig(
@@ -47,6 +58,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Buffer de log por thread: cada tabela processada em paralelo acumula suas
+# mensagens e as emite em bloco ao terminar, sem intercalar com as demais
+_log_buffer = threading.local()
+
+
+class _ThreadBufferFilter(logging.Filter):
+    """Desvia registros para o buffer da thread atual, se houver um ativo."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        records = getattr(_log_buffer, 'records', None)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+
+logger.addFilter(_ThreadBufferFilter())
+
 # Diretórios
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "production_ready"
@@ -62,9 +91,22 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 # Tamanho do lote para upload
 CHUNK_SIZE = 1000
 
+# Requisições de upsert simultâneas por tabela
+UPLOAD_WORKERS = 8
+
+# Chunks já convertidos aguardando envio (leitura do CSV em paralelo ao upload)
+PREFETCH_CHUNKS = 4
+
+# Tabelas processadas em paralelo por run()
+TABLE_WORKERS = 4
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAPEAMENTO: CSV → TABELA SUPABASE
 # ═══════════════════════════════════════════════════════════════════════════════
+# "dtypes" (opcional) fixa o tipo das colunas na leitura do CSV: evita a
+# inferência a cada chunk e mantém o mesmo tipo em todos os chunks (ex.:
+# chaves/códigos sempre texto). Datas ficam como texto ISO, aceito direto
+# pelas colunas DATE do PostgreSQL.
 
 TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
     # FACTS (tabelas de fatos)
@@ -72,12 +114,20 @@ TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
         "csv_file": "fact_cub.csv",
         "primary_key": "id",
         "upsert_columns": ["data_referencia", "uf", "tipo_cub", "regime_tributario"],
+        "dtypes": {
+            "data_referencia": "string", "uf": "string", "tipo_cub": "string",
+            "regime_tributario": "string", "valor_m2": "Float64", "fonte": "string"
+        },
         "description": "Custo Unitário Básico consolidado"
     },
     "fact_macroeconomia": {
         "csv_file": "fact_macroeconomia.csv",
         "primary_key": "id",
         "upsert_columns": ["data_referencia", "indicador"],
+        "dtypes": {
+            "data_referencia": "string", "indicador": "string", "valor": "Float64",
+            "unidade": "string", "variacao_mes": "Float64", "fonte": "string"
+        },
         "description": "Indicadores macroeconômicos verticalizados"
     },
     
@@ -86,12 +136,17 @@ TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
         "csv_file": "dim_taxas_municipais.csv",
         "primary_key": "id",
         "upsert_columns": ["cidade", "uf"],
+        "dtypes": {"cidade": "string", "uf": "string", "data_atualizacao": "string"},
         "description": "Taxas ISS, ITBI, Alvarás por município"
     },
     "dim_metodos_construtivos": {
         "csv_file": "dim_metodos_construtivos.csv",
         "primary_key": "id",
         "upsert_columns": ["id"],
+        "dtypes": {
+            "id": "string", "uf": "string", "fator_custo": "Float64",
+            "fator_prazo": "Float64", "data_atualizacao": "string"
+        },
         "description": "Métodos construtivos com fatores regionais"
     },
     "dim_topografia": {
@@ -104,6 +159,10 @@ TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
         "csv_file": "dim_localidade.csv",
         "primary_key": "id",
         "upsert_columns": ["id"],
+        "dtypes": {
+            "id": "string", "tipo": "string", "codigo_ibge": "string", "sigla": "string",
+            "uf_pai": "string", "populacao": "Int64"
+        },
         "description": "UFs e Cidades do Brasil"
     },
     "dim_cenarios_construcao": {
@@ -146,12 +205,14 @@ TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
         "csv_file": "dim_fatores_regionais_uf.csv",
         "primary_key": "id",
         "upsert_columns": ["uf"],
+        "dtypes": {"uf": "string", "data_referencia": "string"},
         "description": "Fatores regionais por UF"
     },
     "dim_taxas_cartoriais": {
         "csv_file": "dim_taxas_cartoriais.csv",
         "primary_key": "id",
         "upsert_columns": ["uf"],
+        "dtypes": {"uf": "string", "data_atualizacao": "string"},
         "description": "Taxas cartoriais estaduais"
     },
     "dim_series_bcb": {
@@ -163,6 +224,29 @@ TABLE_MAPPING: Dict[str, Dict[str, Any]] = {
 }
 
 
+def _json_default(obj: Any) -> Any:
+    """Serializa para orjson tipos fora do JSON nativo (ex.: pd.Timestamp)."""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """Indica se a exceção é um HTTP 429 (rate limit) do PostgREST."""
+    return str(getattr(exc, 'code', '')) == '429'
+
+
+def _is_row_error(exc: BaseException) -> bool:
+    """
+    Indica se o erro do PostgREST é causado pelos dados de alguma linha.
+    
+    Apenas SQLSTATE das classes 22 (dado inválido) e 23 (violação de
+    restrição) são isoláveis por bisseção; erros de rede, autenticação,
+    schema ou quota falhariam igualmente em qualquer subconjunto do chunk.
+    """
+    return str(getattr(exc, 'code', '')).startswith(('22', '23'))
+
+
 class SupabaseUploader:
     """Classe para upload de dados para o Supabase."""
     
@@ -182,10 +266,16 @@ class SupabaseUploader:
             'registros_enviados': 0,
             'erros': []
         }
+        self._lock = threading.Lock()
         
         if not dry_run:
             self._setup_client()
     
+    def _add_enviados(self, count: int):
+        """Soma registros enviados (thread-safe: tabelas rodam em paralelo)."""
+        with self._lock:
+            self.stats['registros_enviados'] += count
+    
     def _setup_client(self):
         """Configura o cliente Supabase."""
         if not SUPABASE_URL or not SUPABASE_KEY:
@@ -212,38 +302,216 @@ class SupabaseUploader:
         """
         Limpa o DataFrame para compatibilidade com Supabase.
         
-        - Converte NaN para None
+        - Converte NaN/NaT/pd.NA/None para None
         - Converte tipos numpy para tipos Python nativos
-        - Remove colunas completamente vazias
+        
+        Operações vetorizadas (sem apply por célula); o resultado já pode
+        ir direto para to_dict(orient='records'), sem varredura extra.
         """
-        # Substituir NaN por None
-        df = df.replace({np.nan: None})
-        
-        # Converter tipos numpy para Python nativo
-        for col in df.columns:
-            # Converter numpy int/float para Python int/float
-            if df[col].dtype in ['int64', 'int32']:
-                df[col] = df[col].apply(lambda x: int(x) if pd.notna(x) and x is not None else None)
-            elif df[col].dtype in ['float64', 'float32']:
-                df[col] = df[col].apply(lambda x: float(x) if pd.notna(x) and x is not None else None)
-        
-        return df
+        # Colunas inteiras em dtype nullable: serializam como int Python
+        int_cols = df.select_dtypes(include=['int64', 'int32']).columns
+        if len(int_cols):
+            df = df.astype({col: 'Int64' for col in int_cols})
+        
+        # Substituir NaN/NA por None em uma única passada
+        return df.astype(object).mask(df.isna(), None)
     
     def _df_to_records(self, df: pd.DataFrame) -> List[Dict]:
-        """Converte DataFrame para lista de dicionários."""
-        # Limpar o DataFrame
-        df = self._clean_dataframe(df)
+        """
+        Converte DataFrame para lista de dicionários.
+        
+        Com pyarrow, a conversão é colunar (Table.to_pylist), já mapeando
+        NaN/NA para None e tipos numpy para Python, sem _clean_dataframe.
+        """
+        if PYARROW_AVAILABLE:
+            return pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+        return self._clean_dataframe(df).to_dict(orient='records')
+    
+    @retry(
+        retry=retry_if_exception(_is_rate_limited),
+        wait=wait_exponential(multiplier=1, max=30),
+        stop=stop_after_attempt(5),
+        reraise=True,
+    )
+    def _upsert_chunk(self, table_name: str, chunk: List[Dict], on_conflict: str) -> None:
+        """
+        Envia um chunk via upsert, recuando exponencialmente apenas em HTTP 429.
+        
+        O corpo é serializado com orjson (em vez do json da stdlib usado pelo
+        postgrest-py) e pedido com return=minimal, sem eco das linhas.
+        """
+        from postgrest.exceptions import APIError
+        from postgrest.types import ReturnMethod
+        
+        request = self.client.table(table_name).upsert(
+            chunk,
+            on_conflict=on_conflict,
+            returning=ReturnMethod.minimal
+        ).request
+        
+        headers = request.headers.copy()
+        headers['Content-Type'] = 'application/json'
+        
+        response = request.session.request(
+            request.http_method,
+            str(request.path),
+            content=orjson.dumps(request.json, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY),
+            params=request.params,
+            headers=headers,
+            auth=request.auth,
+        )
+        
+        if not response.is_success:
+            try:
+                error = dict(orjson.loads(response.content))
+            except (orjson.JSONDecodeError, TypeError, ValueError):
+                error = {'message': response.text}
+            error['code'] = error.get('code') or str(response.status_code)
+            raise APIError(error)
+    
+    def _upsert_with_bisect(self, table_name: str, rows: List[Dict], on_conflict: str) -> int:
+        """
+        Envia `rows` via upsert; em erro de dados, divide ao meio e tenta cada metade.
+        
+        Um registro inválido em um chunk de N custa ~2·log2(N) requisições
+        extras, em vez de N inserções individuais.
+        
+        Returns:
+            Quantidade de registros enviados com sucesso
+            
+        Raises:
+            Exception: Erros que não são de linha (ver _is_row_error), que
+                abortam a tabela em vez de continuar a bisseção
+        """
+        try:
+            self._upsert_chunk(table_name, rows, on_conflict)
+            return len(rows)
+        except Exception as e:
+            if not _is_row_error(e):
+                raise
+            if len(rows) == 1:
+                logger.debug(f"      Registro falhou: {e}")
+                self.stats['erros'].append(f"{table_name}: registro rejeitado {rows[0]}: {e}")
+                return 0
+        
+        mid = len(rows) // 2
+        return (
+            self._upsert_with_bisect(table_name, rows[:mid], on_conflict)
+            + self._upsert_with_bisect(table_name, rows[mid:], on_conflict)
+        )
+    
+    @staticmethod
+    def _count_rows(csv_path: Path) -> int:
+        """Conta registros do CSV (linhas menos o header) sem parseá-lo."""
+        with open(csv_path, 'rb') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    
+    @staticmethod
+    def _duplicated_keys(
+        csv_path: Path,
+        upsert_cols: List[str],
+        dtypes: Optional[Dict[str, str]]
+    ) -> Optional[np.ndarray]:
+        """
+        Marca as linhas cuja chave de upsert se repete mais adiante no CSV.
+        
+        Lê apenas as colunas da chave, para que o upload em streaming possa
+        descartar as duplicatas (keep='last'). Duplicatas no mesmo lote fazem
+        o PostgreSQL rejeitar o upsert ("ON CONFLICT DO UPDATE command cannot
+        affect row a second time"); entre lotes paralelos, a ordem de escrita
+        não seria determinística.
+        
+        Returns:
+            Array booleano por linha (True = descartar), ou None se o CSV
+            não tiver todas as colunas da chave
+        """
+        keys = pd.read_csv(
+            csv_path,
+            usecols=lambda col: col in upsert_cols,
+            dtype=dtypes
+        )
+        if set(keys.columns) != set(upsert_cols):
+            return None
+        return keys.duplicated(keep='last').to_numpy()
+    
+    def _prefetch_records(
+        self,
+        reader: Iterator[pd.DataFrame],
+        duplicated: Optional[np.ndarray]
+    ) -> Iterator[List[Dict]]:
+        """
+        Lê e converte os chunks do CSV em uma thread produtora.
+        
+        Enquanto a thread da tabela trata resultados (incluindo bisseções),
+        os próximos chunks já vão sendo parseados; a fila limita a
+        PREFETCH_CHUNKS chunks prontos em memória.
+        
+        Args:
+            reader: Iterador de chunks de pd.read_csv(chunksize=...)
+            duplicated: Máscara de linhas a descartar (ou None)
+            
+        Yields:
+            Registros de cada chunk não vazio
+        """
+        ready: queue.Queue = queue.Queue(maxsize=PREFETCH_CHUNKS)
+        done = object()
+        
+        def produce():
+            try:
+                for chunk_df in reader:
+                    if duplicated is not None:
+                        chunk_df = chunk_df[~duplicated[chunk_df.index]]
+                        if chunk_df.empty:
+                            continue
+                    ready.put(self._df_to_records(chunk_df))
+            except Exception as e:
+                ready.put(e)
+            finally:
+                ready.put(done)
         
-        # Converter para records
-        records = df.to_dict(orient='records')
+        threading.Thread(target=produce, daemon=True).start()
         
-        # Garantir que valores None estejam corretos
-        for record in records:
-            for key, value in record.items():
-                if pd.isna(value) or value != value:  # NaN check
-                    record[key] = None
+        while (item := ready.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def _handle_chunk_result(
+        self,
+        table_name: str,
+        future: Future,
+        chunk_num: int,
+        chunk: List[Dict],
+        total_chunks: int,
+        on_conflict: str
+    ):
+        """
+        Contabiliza um chunk enviado; se falhou por dados, bisseciona para isolar os erros.
         
-        return records
+        Raises:
+            Exception: Erros que não são de linha, propagados para abortar a tabela
+        """
+        try:
+            future.result()
+            logger.info(f"   ✓ Chunk {chunk_num}/{total_chunks}: {len(chunk)} registros enviados")
+            self._add_enviados(len(chunk))
+            
+        except Exception as e:
+            logger.error(f"   ❌ Erro no chunk {chunk_num}: {e}")
+            if not _is_row_error(e):
+                raise
+            # Bissecionar o chunk para isolar os registros problemáticos
+            if len(chunk) > 1:
+                logger.info("   🔄 Bissecionando chunk para isolar registros com erro...")
+                mid = len(chunk) // 2
+                success_count = (
+                    self._upsert_with_bisect(table_name, chunk[:mid], on_conflict)
+                    + self._upsert_with_bisect(table_name, chunk[mid:], on_conflict)
+                )
+                logger.info(f"   ✓ {success_count}/{len(chunk)} registros enviados após bisseção")
+                self._add_enviados(success_count)
+            else:
+                self.stats['erros'].append(f"{table_name}: registro rejeitado {chunk[0]}: {e}")
     
     def upload_table(self, table_name: str, config: Dict) -> bool:
         """
@@ -270,19 +538,37 @@ class SupabaseUploader:
             return False
         
         try:
-            # Ler CSV
-            df = pd.read_csv(csv_path)
-            total_records = len(df)
+            # Contar linhas sem materializar o CSV (apenas para log/progresso)
+            total_records = self._count_rows(csv_path)
             logger.info(f"   Registros: {total_records:,}")
             
             if total_records == 0:
                 logger.warning(f"   ⚠️ Arquivo vazio, pulando...")
                 return True
             
-            # Converter para records
-            records = self._df_to_records(df)
+            # Linhas com chave de upsert repetida (mantém a última ocorrência)
+            duplicated = self._duplicated_keys(csv_path, upsert_cols, config.get('dtypes'))
+            n_dup = 0
+            if duplicated is not None and duplicated.any():
+                n_dup = int(duplicated.sum())
+                logger.info(
+                    f"   🧹 Duplicatas por {upsert_cols} removidas: {n_dup:,} "
+                    f"({total_records:,} → {total_records - n_dup:,})"
+                )
+                total_records -= n_dup
+            else:
+                duplicated = None
+            
+            # Ler CSV em streaming: memória limitada a O(CHUNK_SIZE)
+            reader = pd.read_csv(
+                csv_path,
+                chunksize=CHUNK_SIZE,
+                dtype=config.get('dtypes'),
+                dtype_backend="numpy_nullable"
+            )
             
             if self.dry_run:
+                records = self._df_to_records(next(reader))
                 logger.info(f"   🔄 [DRY-RUN] Simulando upload de {total_records:,} registros")
                 logger.info(f"   🔄 [DRY-RUN] Upsert columns: {upsert_cols}")
                 # Mostrar amostra
@@ -290,43 +576,33 @@ class SupabaseUploader:
                     logger.info(f"   🔄 [DRY-RUN] Amostra do primeiro registro:")
                     for k, v in list(records[0].items())[:5]:
                         logger.info(f"      {k}: {v}")
-                self.stats['registros_enviados'] += total_records
+                self._add_enviados(total_records)
                 return True
             
-            # Upload em chunks
-            total_chunks = (total_records + CHUNK_SIZE - 1) // CHUNK_SIZE
+            # Upload em chunks, com até UPLOAD_WORKERS requisições simultâneas
+            # (total estimado pelos chunks lidos do CSV, antes da deduplicação)
+            total_chunks = (total_records + n_dup + CHUNK_SIZE - 1) // CHUNK_SIZE
+            on_conflict = ','.join(upsert_cols)
             
-            for i in range(0, total_records, CHUNK_SIZE):
-                chunk = records[i:i + CHUNK_SIZE]
-                chunk_num = (i // CHUNK_SIZE) + 1
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                pending = {}
                 
-                try:
-                    # Usar upsert com on_conflict
-                    response = self.client.table(table_name).upsert(
-                        chunk,
-                        on_conflict=','.join(upsert_cols)
-                    ).execute()
-                    
-                    logger.info(f"   ✓ Chunk {chunk_num}/{total_chunks}: {len(chunk)} registros enviados")
-                    self.stats['registros_enviados'] += len(chunk)
+                for chunk_num, chunk in enumerate(self._prefetch_records(reader, duplicated), 1):
+                    future = executor.submit(self._upsert_chunk, table_name, chunk, on_conflict)
+                    pending[future] = (chunk_num, chunk)
                     
-                except Exception as e:
-                    logger.error(f"   ❌ Erro no chunk {chunk_num}: {e}")
-                    # Tentar inserir registro por registro para identificar o problema
-                    if len(chunk) > 1:
-                        logger.info(f"   🔄 Tentando inserção individual...")
-                        success_count = 0
-                        for record in chunk:
-                            try:
-                                self.client.table(table_name).upsert(
-                                    [record],
-                                    on_conflict=','.join(upsert_cols)
-                                ).execute()
-                                success_count += 1
-                            except Exception as e2:
-                                logger.debug(f"      Registro falhou: {e2}")
-                        logger.info(f"   ✓ {success_count}/{len(chunk)} registros individuais enviados")
-                        self.stats['registros_enviados'] += success_count
+                    # Limitar chunks em memória aguardando envio
+                    if len(pending) >= 2 * UPLOAD_WORKERS:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._handle_chunk_result(
+                                table_name, future, *pending.pop(future), total_chunks, on_conflict
+                            )
+                
+                for future in as_completed(pending):
+                    self._handle_chunk_result(
+                        table_name, future, *pending[future], total_chunks, on_conflict
+                    )
             
             logger.info(f"   ✅ Upload concluído: {table_name}")
             return True
@@ -336,6 +612,22 @@ class SupabaseUploader:
             self.stats['erros'].append(f"{table_name}: {e}")
             return False
     
+    def _upload_table_buffered(self, table_name: str, config: Dict) -> bool:
+        """
+        Executa upload_table acumulando o log da tabela e emitindo-o em bloco.
+        
+        Returns:
+            Resultado de upload_table
+        """
+        _log_buffer.records = []
+        try:
+            return self.upload_table(table_name, config)
+        finally:
+            records, _log_buffer.records = _log_buffer.records, None
+            with self._lock:
+                for record in records:
+                    logger.handle(record)
+    
     def run(self, specific_table: Optional[str] = None):
         """
         Executa o upload de todas as tabelas ou de uma específica.
@@ -363,16 +655,20 @@ class SupabaseUploader:
                 return
             tables_to_process = {specific_table: TABLE_MAPPING[specific_table]}
         
-        # Processar cada tabela
-        for table_name, config in tables_to_process.items():
-            self.stats['tabelas_processadas'] += 1
-            
-            success = self.upload_table(table_name, config)
+        # Processar tabelas em paralelo (cada uma é limitada por rede)
+        self.stats['tabelas_processadas'] += len(tables_to_process)
+        
+        with ThreadPoolExecutor(max_workers=min(TABLE_WORKERS, len(tables_to_process))) as executor:
+            results = executor.map(
+                lambda item: self._upload_table_buffered(*item),
+                tables_to_process.items()
+            )
             
-            if success:
-                self.stats['tabelas_sucesso'] += 1
-            else:
-                self.stats['tabelas_erro'] += 1
+            for success in results:
+                if success:
+                    self.stats['tabelas_sucesso'] += 1
+                else:
+                    self.stats['tabelas_erro'] += 1
         
         # Resumo
         self._print_summary()
@@ -12,6 +12,7 @@ Data: 2025-11-13
 
 import os
 import sys
+import pandas as pd
 from dotenv import load_dotenv
 import gspread
 from google.oauth2.service_account import Credentials
@@ -26,6 +27,18 @@ if sys.platform == "win32":
 load_dotenv()
 
 
+def parse_area(area: pd.Series) -> pd.Series:
+    """
+    Converte a coluna de área em float (vazio/texto inválido → NaN).
+    
+    Com UNFORMATTED_VALUE a maioria das células chega como número; as
+    salvas como texto podem ter vírgula decimal ("10,5"). A coluna passa
+    inteira por astype(str), o que também cobre colunas só numéricas.
+    """
+    normalizada = area.astype(str).str.replace(",", ".", regex=False)
+    return pd.to_numeric(normalizada, errors="coerce")
+
+
 def main():
     print("═" * 70)
     print("🔍 VERIFICAÇÃO DE DADOS - dim_geo")
@@ -48,43 +61,44 @@ def main():
     
     print("   ✅ Conectado!\n")
     
-    # Buscar dados
-    all_data = worksheet.get_all_values()
+    # Buscar só as colunas A:G (cod_ibge … area_km2) com valores não
+    # formatados: números chegam como int/float, sem parsing de locale
+    all_data = worksheet.get(
+        "A:G",
+        value_render_option=gspread.utils.ValueRenderOption.unformatted,
+        major_dimension="ROWS",
+        pad_values=True,
+    )
     header = all_data[0]
     rows = all_data[1:]
     
-    # Índices
-    idx_cod_ibge = header.index("cod_ibge")
-    idx_nome = header.index("nome_municipio")
-    idx_pop = header.index("populacao_2022")
-    idx_area = header.index("area_km2")
+    # DataFrame único para as análises vetorizadas
+    df = pd.DataFrame(rows, columns=header)
+    area = df["area_km2"]
+    pop = df["populacao_2022"]
     
     print(f"📊 Total de municípios: {len(rows)}\n")
     
-    # Estatísticas
-    sem_area = []
-    sem_populacao = []
-    area_zero = []
-    pop_zero = []
-    
-    # Analisar
-    for row in rows:
-        cod_ibge = row[idx_cod_ibge]
-        nome = row[idx_nome]
-        pop = row[idx_pop]
-        area = row[idx_area]
-        
-        # Verificar área
-        if not area or area.strip() == "":
-            sem_area.append((cod_ibge, nome))
-        elif area in ("0", "0.0", "0.000"):
-            area_zero.append((cod_ibge, nome))
-        
-        # Verificar população
-        if not pop or pop.strip() == "":
-            sem_populacao.append((cod_ibge, nome))
-        elif pop == "0":
-            pop_zero.append((cod_ibge, nome))
+    # Valores numéricos (vazio/texto inválido → NaN)
+    pop_num = pd.to_numeric(pop, errors="coerce")
+    area_num = parse_area(area)
+    
+    # Máscaras de validação
+    sem_area_mask = area.astype(str).str.strip().eq("")
+    area_zero_mask = area_num.eq(0)
+    sem_pop_mask = pop.astype(str).str.strip().eq("")
+    pop_zero_mask = pop_num.eq(0)
+    
+    def municipios(mask):
+        return list(zip(df.loc[mask, "cod_ibge"], df.loc[mask, "nome_municipio"]))
+    
+    sem_area = municipios(sem_area_mask)
+    area_zero = municipios(area_zero_mask)
+    sem_populacao = municipios(sem_pop_mask)
+    pop_zero = municipios(pop_zero_mask)
+    
+    df["pop_f"] = pop_num.fillna(0)
+    df["area_f"] = area_num.fillna(0.0)
     
     # Relatório
     print("━" * 70)
@@ -125,46 +139,20 @@ def main():
     print("\n" + "━" * 70)
     print("\n📊 ESTATÍSTICAS GERAIS:\n")
     
-    # Calcular totais
-    populacao_total = 0
-    area_total = 0.0
-    
-    for row in rows:
-        try:
-            pop = int(row[idx_pop]) if row[idx_pop] else 0
-            populacao_total += pop
-        except ValueError:
-            pass
-        
-        try:
-            area = float(row[idx_area].replace(",", ".")) if row[idx_area] else 0.0
-            area_total += area
-        except ValueError:
-            pass
+    # Calcular totais (vazio/inválido contam como 0)
+    populacao_total = int(df["pop_f"].astype("int64").sum())
+    area_total = float(df["area_f"].sum())
     
     print(f"   População total SC (Censo 2022): {populacao_total:,} habitantes")
     print(f"   Área total SC: {area_total:,.2f} km²")
     
     # Maiores municípios
     print("\n🏆 TOP 5 MUNICÍPIOS POR POPULAÇÃO:")
-    rows_com_pop = [(row[idx_nome], int(row[idx_pop]) if row[idx_pop] else 0) for row in rows]
-    rows_com_pop.sort(key=lambda x: x[1], reverse=True)
-    
-    for i, (nome, pop) in enumerate(rows_com_pop[:5], 1):
-        print(f"   {i}. {nome}: {pop:,} hab")
+    for i, (nome, pop) in enumerate(df.nlargest(5, "pop_f")[["nome_municipio", "pop_f"]].itertuples(index=False), 1):
+        print(f"   {i}. {nome}: {int(pop):,} hab")
     
     print("\n🏆 TOP 5 MUNICÍPIOS POR ÁREA:")
-    rows_com_area = []
-    for row in rows:
-        try:
-            area = float(row[idx_area].replace(",", ".")) if row[idx_area] else 0.0
-            rows_com_area.append((row[idx_nome], area))
-        except ValueError:
-            rows_com_area.append((row[idx_nome], 0.0))
-    
-    rows_com_area.sort(key=lambda x: x[1], reverse=True)
-    
-    for i, (nome, area) in enumerate(rows_com_area[:5], 1):
+    for i, (nome, area) in enumerate(df.nlargest(5, "area_f")[["nome_municipio", "area_f"]].itertuples(index=False), 1):
         print(f"   {i}. {nome}: {area:,.2f} km²")
     
     # Conclusão
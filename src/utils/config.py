@@ -4,34 +4,61 @@ Módulo de configuração da aplicação.
 Carrega e valida variáveis de ambiente necessárias para o funcionamento
 do pipeline de dados. Usa python-dotenv para carregar arquivo .env.
 
+A configuração é lida uma única vez, na primeira chamada a get_config(),
+e fica congelada para o resto do processo (importar o módulo não tem
+efeitos colaterais).
+
 Exemplo de uso:
-    >>> from src.utils.config import Config
+    >>> from src.utils.config import get_config
     >>> 
     >>> # Acessar configurações
-    >>> print(Config.SPREADSHEET_ID)
-    >>> print(Config.CREDENTIALS_PATH)
-    >>> print(Config.LOG_LEVEL)
+    >>> config = get_config()
+    >>> print(config.SPREADSHEET_ID)
+    >>> print(config.CREDENTIALS_PATH)
+    >>> print(config.LOG_LEVEL)
     >>> 
-    >>> # Verificar se configuração está válida
-    >>> Config.validate()
+    >>> # Aliases do módulo também carregam sob demanda
+    >>> from src.utils import config
+    >>> print(config.TZ)
 """
 
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 
 
-@dataclass
+def _load_env() -> None:
+    """
+    Carrega variáveis de ambiente do arquivo .env.
+    
+    Procura arquivo .env no diretório raiz do projeto.
+    Se não encontrar, usa variáveis de ambiente do sistema.
+    """
+    # Procurar arquivo .env no diretório raiz do projeto
+    # Assumindo estrutura: projeto/src/utils/config.py
+    current_file = Path(__file__)
+    project_root = current_file.parent.parent.parent
+    env_path = project_root / ".env"
+    
+    if env_path.exists():
+        load_dotenv(env_path)
+        print(f"✓ Arquivo .env carregado: {env_path}")
+    else:
+        print(f"⚠ Arquivo .env não encontrado em: {env_path}")
+        print("  Usando variáveis de ambiente do sistema")
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """
     Configuração centralizada da aplicação.
     
-    Carrega variáveis de ambiente do arquivo .env e valida configurações
-    obrigatórias. Fornece acesso tipado às configurações via propriedades
-    de classe.
+    Snapshot imutável das variáveis de ambiente, criado uma única vez por
+    get_config(). Use get_config() em vez de instanciar diretamente.
     
     Variáveis obrigatórias:
         - GOOGLE_SPREADSHEET_ID: ID da planilha Google Sheets
@@ -41,78 +68,36 @@ class Config:
         - TZ: Timezone (padrão: America/Sao_Paulo)
         - LOG_LEVEL: Nível de log (padrão: INFO)
     
-    Raises:
-        ValueError: Se variáveis obrigatórias não estiverem configuradas
-    
     Example:
-        >>> from src.utils.config import Config
-        >>> print(f"Usando planilha: {Config.SPREADSHEET_ID}")
+        >>> from src.utils.config import get_config
+        >>> print(f"Usando planilha: {get_config().SPREADSHEET_ID}")
     """
     
-    # Propriedades de classe (carregadas automaticamente)
-    SPREADSHEET_ID: str = None
-    CREDENTIALS_PATH: str = None
+    SPREADSHEET_ID: Optional[str] = None
+    CREDENTIALS_PATH: Optional[str] = None
     TZ: str = "America/Sao_Paulo"
     LOG_LEVEL: str = "INFO"
     
-    _initialized: bool = False
-    _env_loaded: bool = False
-    
-    @classmethod
-    def _load_env(cls) -> None:
-        """
-        Carrega variáveis de ambiente do arquivo .env.
-        
-        Procura arquivo .env no diretório raiz do projeto.
-        Se não encontrar, usa variáveis de ambiente do sistema.
-        """
-        if cls._env_loaded:
-            return
-        
-        # Procurar arquivo .env no diretório raiz do projeto
-        # Assumindo estrutura: projeto/src/utils/config.py
-        current_file = Path(__file__)
-        project_root = current_file.parent.parent.parent
-        env_path = project_root / ".env"
-        
-        if env_path.exists():
-            load_dotenv(env_path)
-            print(f"✓ Arquivo .env carregado: {env_path}")
-        else:
-            print(f"⚠ Arquivo .env não encontrado em: {env_path}")
-            print("  Usando variáveis de ambiente do sistema")
-        
-        cls._env_loaded = True
-    
     @classmethod
-    def _initialize(cls) -> None:
+    def from_env(cls) -> "Config":
         """
-        Inicializa a configuração carregando e validando variáveis.
+        Cria a configuração a partir do .env e das variáveis de ambiente.
         
-        Raises:
-            ValueError: Se variáveis obrigatórias estiverem ausentes
+        Returns:
+            Config com os valores atuais do ambiente
         """
-        if cls._initialized:
-            return
-        
-        # Carregar .env
-        cls._load_env()
-        
-        # Carregar variáveis obrigatórias
-        cls.SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
-        cls.CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS_PATH")
-        
-        # Carregar variáveis opcionais com padrões
-        cls.TZ = os.getenv("TZ", "America/Sao_Paulo")
-        cls.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-        
-        # Validar configuração
-        cls.validate()
-        
-        cls._initialized = True
+        _load_env()
+        
+        return cls(
+            # Variáveis obrigatórias
+            SPREADSHEET_ID=os.getenv("GOOGLE_SPREADSHEET_ID"),
+            CREDENTIALS_PATH=os.getenv("GOOGLE_CREDENTIALS_PATH"),
+            # Variáveis opcionais com padrões
+            TZ=os.getenv("TZ", "America/Sao_Paulo"),
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO").upper(),
+        )
     
-    @classmethod
-    def validate(cls) -> None:
+    def validate(self) -> None:
         """
         Valida que todas as variáveis obrigatórias estão configuradas.
         
@@ -121,29 +106,29 @@ class Config:
         """
         errors = []
         
-        if not cls.SPREADSHEET_ID:
+        if not self.SPREADSHEET_ID:
             errors.append(
                 "GOOGLE_SPREADSHEET_ID não configurado. "
                 "Defina no arquivo .env ou como variável de ambiente."
             )
         
-        if not cls.CREDENTIALS_PATH:
+        if not self.CREDENTIALS_PATH:
             errors.append(
                 "GOOGLE_CREDENTIALS_PATH não configurado. "
                 "Defina no arquivo .env ou como variável de ambiente."
             )
         
         # Validar que arquivo de credenciais existe
-        if cls.CREDENTIALS_PATH and not os.path.exists(cls.CREDENTIALS_PATH):
+        if self.CREDENTIALS_PATH and not os.path.exists(self.CREDENTIALS_PATH):
             errors.append(
-                f"Arquivo de credenciais não encontrado: {cls.CREDENTIALS_PATH}"
+                f"Arquivo de credenciais não encontrado: {self.CREDENTIALS_PATH}"
             )
         
         # Validar LOG_LEVEL
         valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if cls.LOG_LEVEL not in valid_log_levels:
+        if self.LOG_LEVEL not in valid_log_levels:
             errors.append(
-                f"LOG_LEVEL inválido: {cls.LOG_LEVEL}. "
+                f"LOG_LEVEL inválido: {self.LOG_LEVEL}. "
                 f"Valores válidos: {', '.join(valid_log_levels)}"
             )
         
@@ -153,8 +138,7 @@ class Config:
             )
             raise ValueError(error_msg)
     
-    @classmethod
-    def get_all(cls) -> dict:
+    def get_all(self) -> dict:
         """
         Retorna todas as configurações como dicionário.
         
@@ -162,32 +146,22 @@ class Config:
             Dicionário com todas as configurações
         
         Example:
-            >>> from src.utils.config import Config
-            >>> config_dict = Config.get_all()
+            >>> from src.utils.config import get_config
+            >>> config_dict = get_config().get_all()
             >>> print(config_dict)
         """
-        cls._initialize()
-        
-        return {
-            "SPREADSHEET_ID": cls.SPREADSHEET_ID,
-            "CREDENTIALS_PATH": cls.CREDENTIALS_PATH,
-            "TZ": cls.TZ,
-            "LOG_LEVEL": cls.LOG_LEVEL,
-        }
+        return asdict(self)
     
-    @classmethod
-    def print_config(cls) -> None:
+    def print_config(self) -> None:
         """
         Imprime configurações de forma legível (ocultando informações sensíveis).
         
         Example:
-            >>> from src.utils.config import Config
-            >>> Config.print_config()
+            >>> from src.utils.config import get_config
+            >>> get_config().print_config()
         """
-        cls._initialize()
-        
         # Ocultar parte do SPREADSHEET_ID
-        spreadsheet_id_masked = cls.SPREADSHEET_ID
+        spreadsheet_id_masked = self.SPREADSHEET_ID
         if spreadsheet_id_masked and len(spreadsheet_id_masked) > 8:
             spreadsheet_id_masked = (
                 spreadsheet_id_masked[:4] + 
@@ -199,29 +173,43 @@ class Config:
         print("CONFIGURAÇÃO DA APLICAÇÃO")
         print("=" * 50)
         print(f"Spreadsheet ID:     {spreadsheet_id_masked}")
-        print(f"Credentials Path:   {cls.CREDENTIALS_PATH}")
-        print(f"Timezone:           {cls.TZ}")
-        print(f"Log Level:          {cls.LOG_LEVEL}")
+        print(f"Credentials Path:   {self.CREDENTIALS_PATH}")
+        print(f"Timezone:           {self.TZ}")
+        print(f"Log Level:          {self.LOG_LEVEL}")
         print("=" * 50 + "\n")
+
+
+@functools.cache
+def get_config() -> Config:
+    """
+    Retorna a configuração do processo, carregando e validando na 1ª chamada.
     
-    @classmethod
-    def reload(cls) -> None:
-        """
-        Recarrega configurações do ambiente.
-        
-        Útil para testes ou quando variáveis de ambiente mudam.
-        """
-        cls._initialized = False
-        cls._env_loaded = False
-        cls._initialize()
+    Returns:
+        Config congelada (mesma instância nas chamadas seguintes)
+    
+    Raises:
+        ValueError: Se variáveis obrigatórias estiverem ausentes
+    """
+    config = Config.from_env()
+    config.validate()
+    return config
 
 
-# Inicializar automaticamente ao importar o módulo
-Config._initialize()
+def reload_config() -> Config:
+    """
+    Recarrega configurações do ambiente.
+    
+    Útil para testes ou quando variáveis de ambiente mudam.
+    
+    Returns:
+        Nova Config lida do ambiente
+    """
+    get_config.cache_clear()
+    return get_config()
 
 
-# Aliases para conveniência
-SPREADSHEET_ID = Config.SPREADSHEET_ID
-CREDENTIALS_PATH = Config.CREDENTIALS_PATH
-TZ = Config.TZ
-LOG_LEVEL = Config.LOG_LEVEL
+def __getattr__(name: str):
+    """Aliases do módulo (SPREADSHEET_ID, TZ, ...) resolvidos sob demanda."""
+    if name in Config.__dataclass_fields__:
+        return getattr(get_config(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
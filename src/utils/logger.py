@@ -4,6 +4,9 @@ Módulo de configuração de logging estruturado.
 Fornece utilitários para configurar structlog com formatação JSON,
 decorators para logging automático de execução, e configuração padronizada.
 
+A renderização JSON e a escrita no stream acontecem numa thread de fundo
+(QueueHandler + QueueListener); quem loga só monta o event dict e enfileira.
+
 Exemplo de uso:
     >>> from src.utils.logger import setup_logger, log_execution
     >>> 
@@ -20,38 +23,109 @@ Exemplo de uso:
     >>> resultado = processar_dados([1, 2, 3])
 """
 
+import atexit
 import functools
+import logging
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Callable, Optional
 
 import structlog
 
 
-def setup_logger(
-    name: str,
-    level: str = "INFO"
-) -> structlog.BoundLogger:
+# Listener único do processo (renderiza e escreve os logs em background)
+_queue_listener: Optional[QueueListener] = None
+
+# Handler de fila compartilhado pelos namespaces configurados em setup_logger
+_queue_handler: Optional[QueueHandler] = None
+
+
+class _EventDictQueueHandler(QueueHandler):
     """
-    Configura e retorna um logger structlog com processadores padronizados.
+    QueueHandler que enfileira o registro sem formatá-lo.
     
-    Configura structlog com:
-    - Timestamps em formato ISO 8601
-    - Nível de log adicionado automaticamente
-    - Renderização JSON para produção
-    - Context wrapping para adicionar metadados
+    O QueueHandler padrão formata a mensagem na thread de quem loga; aqui o
+    event dict do structlog segue intacto para o ProcessorFormatter do
+    listener.
+    """
     
-    Args:
-        name: Nome do logger (geralmente __name__ do módulo)
-        level: Nível de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _get_queue_handler() -> QueueHandler:
+    """
+    Retorna o handler de fila, criando fila, handler JSON e listener.
+    
+    Idempotente: só a primeira chamada cria a fila e o listener (parado
+    automaticamente no encerramento do processo).
     
     Returns:
-        Logger structlog configurado e pronto para uso
+        QueueHandler a ser anexado aos loggers do projeto
+    """
+    global _queue_listener, _queue_handler
     
-    Example:
-        >>> logger = setup_logger(__name__)
-        >>> logger.info("evento_teste", user_id=123, action="login")
+    if _queue_handler is not None:
+        return _queue_handler
+    
+    # Handler real: renderiza JSON e escreve em stderr, fora do caminho crítico.
+    # foreign_pre_chain completa registros do stdlib (fora do structlog) com
+    # nível, timestamp e nome do logger
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            foreign_pre_chain=[
+                structlog.stdlib.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.stdlib.add_logger_name,
+            ],
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.JSONRenderer(),
+            ],
+        )
+    )
+    
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _EventDictQueueHandler(log_queue)
+    
+    _queue_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _queue_listener.start()
+    atexit.register(_queue_listener.stop)
+    
+    return _queue_handler
+
+
+def _attach_namespace(name: str, level: str) -> None:
+    """
+    Conecta o namespace do logger (ex.: "src" para "src.jobs.daily_bcb") à fila.
+    
+    O logger raiz e os de bibliotecas de terceiros não são tocados. O nível
+    é aplicado a cada chamada; propagate=False evita linhas duplicadas se a
+    aplicação também configurar o logger raiz.
+    
+    Args:
+        name: Nome do logger pedido em setup_logger
+        level: Nível de log do namespace
+    """
+    handler = _get_queue_handler()
+    namespace = logging.getLogger(name.split(".", 1)[0])
+    
+    if handler not in namespace.handlers:
+        namespace.addHandler(handler)
+        namespace.propagate = False
+    namespace.setLevel(level.upper())
+
+
+@functools.cache
+def _configure_structlog() -> None:
+    """
+    Configura os processadores do structlog (executa só na 1ª chamada).
+    
+    structlog.configure troca o estado global da biblioteca; repetir a
+    configuração a cada setup_logger seria trabalho desperdiçado.
     """
-    # Configurar processadores do structlog
     structlog.configure(
         processors=[
             # Adicionar log level
@@ -64,8 +138,9 @@ def setup_logger(
             structlog.processors.format_exc_info,
             # Adicionar nome do logger
             structlog.stdlib.add_logger_name,
-            # Renderizar como JSON (ideal para produção)
-            structlog.processors.JSONRenderer()
+            # Entregar o event dict ao stdlib; o JSON é renderizado pelo
+            # ProcessorFormatter do QueueListener
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         # Wrapper factory
         wrapper_class=structlog.stdlib.BoundLogger,
@@ -76,6 +151,38 @@ def setup_logger(
         # Cache logger instances
         cache_logger_on_first_use=True,
     )
+
+
+@functools.lru_cache(maxsize=None)
+def setup_logger(
+    name: str,
+    level: str = "INFO"
+) -> structlog.BoundLogger:
+    """
+    Configura e retorna um logger structlog com processadores padronizados.
+    
+    Configura structlog com:
+    - Timestamps em formato ISO 8601
+    - Nível de log adicionado automaticamente
+    - Renderização JSON para produção (em thread de fundo)
+    - Context wrapping para adicionar metadados
+    
+    Args:
+        name: Nome do logger (geralmente __name__ do módulo)
+        level: Nível de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    
+    Returns:
+        Logger structlog configurado e pronto para uso (mesma instância
+        para chamadas repetidas com o mesmo nome)
+    
+    Example:
+        >>> logger = setup_logger(__name__)
+        >>> logger.info("evento_teste", user_id=123, action="login")
+    """
+    # Pipeline do structlog configurado uma única vez por processo
+    _configure_structlog()
+    
+    _attach_namespace(name, level)
     
     # Criar e retornar logger
     logger = structlog.get_logger(name)
@@ -83,6 +190,24 @@ def setup_logger(
     return logger
 
 
+def _short_repr(value: Any) -> str:
+    """
+    repr() de um argumento, truncado em 100 caracteres.
+    
+    Calculado na hora da chamada (não na thread do QueueListener), para que
+    o log reflita os argumentos antes de a função modificá-los.
+    """
+    try:
+        value_str = repr(value)
+    except Exception:
+        return "<not-representable>"
+    
+    # Limitar tamanho de cada argumento
+    if len(value_str) > 100:
+        value_str = value_str[:97] + "..."
+    return value_str
+
+
 def log_execution(logger: structlog.BoundLogger) -> Callable:
     """
     Decorator para logging automático de execução de funções.
@@ -113,28 +238,22 @@ def log_execution(logger: structlog.BoundLogger) -> Callable:
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            func_name = func.__name__
-            module_name = func.__module__
+            info_enabled = logger.isEnabledFor(logging.INFO)
+            
+            # Nada será logado: chamar a função direto
+            if not info_enabled and not logger.isEnabledFor(logging.ERROR):
+                return func(*args, **kwargs)
             
             # Preparar contexto de log
             log_context = {
-                "function": func_name,
-                "module": module_name,
+                "function": func.__name__,
+                "module": func.__module__,
             }
             
-            # Adicionar args se houver (limitado para não poluir logs)
+            # Adicionar args se houver (limitado para não poluir logs);
+            # repr() calculado agora, antes de a função poder mutá-los
             if args:
-                # Converter args para formato loggable (limitar tamanho)
-                args_repr = []
-                for i, arg in enumerate(args[:5]):  # Limitar a 5 primeiros args
-                    try:
-                        arg_str = repr(arg)
-                        # Limitar tamanho de cada argumento
-                        if len(arg_str) > 100:
-                            arg_str = arg_str[:97] + "..."
-                        args_repr.append(arg_str)
-                    except Exception:
-                        args_repr.append("<not-representable>")
+                args_repr = [_short_repr(arg) for arg in args[:5]]  # Limitar a 5 primeiros args
                 
                 if len(args) > 5:
                     args_repr.append(f"... +{len(args) - 5} more")
@@ -143,15 +262,10 @@ def log_execution(logger: structlog.BoundLogger) -> Callable:
             
             # Adicionar kwargs se houver (limitado)
             if kwargs:
-                kwargs_repr = {}
-                for key, value in list(kwargs.items())[:10]:  # Limitar a 10 kwargs
-                    try:
-                        value_str = repr(value)
-                        if len(value_str) > 100:
-                            value_str = value_str[:97] + "..."
-                        kwargs_repr[key] = value_str
-                    except Exception:
-                        kwargs_repr[key] = "<not-representable>"
+                kwargs_repr = {
+                    key: _short_repr(value)
+                    for key, value in list(kwargs.items())[:10]  # Limitar a 10 kwargs
+                }
                 
                 if len(kwargs) > 10:
                     kwargs_repr["__more__"] = f"{len(kwargs) - 10} more kwargs"
@@ -159,38 +273,34 @@ def log_execution(logger: structlog.BoundLogger) -> Callable:
                 log_context["kwargs"] = kwargs_repr
             
             # Log de início
-            logger.info(
-                "function_execution_started",
-                **log_context
-            )
+            if info_enabled:
+                logger.info(
+                    "function_execution_started",
+                    **log_context
+                )
             
-            # Medir tempo de execução
-            start_time = time.time()
+            # Medir tempo de execução (relógio monotônico)
+            start_ns = time.perf_counter_ns()
             
             try:
                 # Executar função
                 result = func(*args, **kwargs)
                 
-                # Calcular tempo de execução
-                execution_time = time.time() - start_time
-                
                 # Log de sucesso
-                logger.info(
-                    "function_execution_completed",
-                    execution_time_seconds=round(execution_time, 3),
-                    **log_context
-                )
+                if info_enabled:
+                    logger.info(
+                        "function_execution_completed",
+                        execution_time_seconds=round((time.perf_counter_ns() - start_ns) / 1e9, 3),
+                        **log_context
+                    )
                 
                 return result
             
             except Exception as e:
-                # Calcular tempo até a exceção
-                execution_time = time.time() - start_time
-                
                 # Log de erro com contexto completo
                 logger.error(
                     "function_execution_failed",
-                    execution_time_seconds=round(execution_time, 3),
+                    execution_time_seconds=round((time.perf_counter_ns() - start_ns) / 1e9, 3),
                     error_type=type(e).__name__,
                     error_message=str(e),
                     exc_info=True,  # Inclui stack trace
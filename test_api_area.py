@@ -1,16 +1,29 @@
+import orjson
 import requests
-import json
 
 print('=== Teste: API SIDRA - Tabela de Área Territorial ===\n')
 
 # Tabela 1301: Área territorial oficial (km²)
 # Testando com poucos municípios SC
-url = 'https://apisidra.ibge.gov.br/values/t/1301/n6/4200051,4205407/v/all/p/last%201'
+codigos = ['4200051', '4205407']
 
-print(f'URL: {url}\n')
+# A SIDRA aceita vários municípios na mesma URL (n6/cod1,cod2,...):
+# uma requisição por grupo, com grupos que cabem no limite de ~8 KB da URL
+CODIGOS_POR_REQUISICAO = 300
+URL_BASE = 'https://apisidra.ibge.gov.br/values/t/1301/n6/{codigos}/v/all/p/last%201'
 
-r = requests.get(url, timeout=30)
-data = r.json()
+session = requests.Session()
+data = []
+
+for inicio in range(0, len(codigos), CODIGOS_POR_REQUISICAO):
+    url = URL_BASE.format(codigos=','.join(codigos[inicio:inicio + CODIGOS_POR_REQUISICAO]))
+    print(f'URL: {url}\n')
+
+    r = session.get(url, timeout=30)
+    resposta = orjson.loads(r.content)
+
+    # Cada resposta traz a própria linha de header: manter só a primeira
+    data.extend(resposta if not data else resposta[1:])
 
 print(f'Total de registros: {len(data)}\n')
 
@@ -18,16 +31,16 @@ if data:
     print('Estrutura (primeiras 3 linhas):')
     for i, row in enumerate(data[:3]):
         print(f'{i}: {row}')
-    
+
     # Parsear dados
     print('\n\nDados parseados:')
     for i, row in enumerate(data):
         if i == 0:  # skip header
             continue
-        
+
         cod = row.get('D1C', '')
         nome = row.get('D1N', '')
         valor = row.get('V', '')
-        
+
         if cod and cod.startswith('42'):
             print(f'{nome}: {valor} km²')
@@ -0,0 +1,107 @@
+"""
+Fixtures compartilhadas pelos testes.
+
+Fornece um servidor HTTP local que imita a API SGS do BCB, para testes de
+integração que passam pela pilha HTTP real (requests.Session, sockets,
+keep-alive, headers) em vez de mocks.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+
+class FakeBCBServer:
+    """
+    Servidor SGS falso: respostas enfileiradas por série.
+    
+    Attributes:
+        base_url: URL base para BCBClient(base_url=...)
+        requests: Caminhos requisitados, na ordem de chegada
+        connections: Endereços (host, porta) de cliente distintos vistos
+    """
+    
+    def __init__(self):
+        self._responses: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+        self.requests: List[str] = []
+        self.connections = set()
+        
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                with server._lock:
+                    server.requests.append(path)
+                    server.connections.add(self.client_address)
+                    queue = server._responses.get(path) or [(404, {}, [])]
+                    status, headers, payload = queue.pop(0) if len(queue) > 1 else queue[0]
+                
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True
+        )
+        self.base_url = (
+            f"http://127.0.0.1:{self._httpd.server_port}/dados/serie/bcdata.sgs"
+        )
+    
+    def expect_series(
+        self,
+        series_id: int,
+        payload: Any,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Enfileira uma resposta para a série; a última se repete.
+        
+        Args:
+            series_id: Código da série no SGS
+            payload: Corpo JSON da resposta
+            status: Status HTTP
+            headers: Headers extras (ex.: {"Retry-After": "0"})
+        """
+        path = f"/dados/serie/bcdata.sgs.{series_id}/dados"
+        with self._lock:
+            self._responses.setdefault(path, []).append((status, headers or {}, payload))
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def bcb_server():
+    """
+    Servidor HTTP local imitando a API SGS do BCB.
+    
+    Yields:
+        FakeBCBServer em execução (encerrado ao fim do teste)
+    """
+    server = FakeBCBServer()
+    server.start()
+    yield server
+    server.stop()
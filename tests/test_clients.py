@@ -71,7 +71,7 @@ class TestBCBClient:
         - Conversão de formato de data
         - Conversão de valores decimais
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             # Configurar mock
             mock_response = Mock()
             mock_response.status_code = 200
@@ -102,7 +102,7 @@ class TestBCBClient:
         - Parâmetros dataInicial e dataFinal são passados corretamente
         - Formato de data brasileiro (DD/MM/YYYY) é usado
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_bcb_response
@@ -135,7 +135,7 @@ class TestBCBClient:
         - Valores com vírgula são convertidos para float corretamente
         - Precisão decimal é mantida
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_bcb_response_with_comma
@@ -152,6 +152,28 @@ class TestBCBClient:
             # Verificar tipo
             assert isinstance(result[0]["value"], float)
     
+    def test_bcb_fetch_series_parses_raw_content(self, bcb_client, mock_bcb_response):
+        """
+        Testa decodificação do corpo bruto da resposta (orjson, se instalado).
+        
+        Verifica:
+        - Bytes de response.content são decodificados corretamente
+        - Resultado é igual ao obtido via response.json()
+        """
+        import json
+        
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.content = json.dumps(mock_bcb_response).encode()
+            mock_response.json.return_value = mock_bcb_response
+            mock_get.return_value = mock_response
+            
+            result = bcb_client.fetch_series(432)
+            
+            assert len(result) == 5
+            assert result[0] == {"date": "2023-01-01", "value": 13.75}
+    
     def test_bcb_fetch_series_timeout(self, bcb_client):
         """
         Testa comportamento quando ocorre timeout na requisição.
@@ -160,7 +182,7 @@ class TestBCBClient:
         - Exceção Timeout é levantada após tentativas de retry
         - Retry é executado o número correto de vezes
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             # Configurar mock para lançar Timeout
             import requests
             mock_get.side_effect = requests.exceptions.Timeout("Connection timeout")
@@ -180,7 +202,7 @@ class TestBCBClient:
         - Erro 4xx não faz retry
         - HTTPError é levantado imediatamente
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             import requests
             
             # Configurar mock para erro 404
@@ -206,14 +228,18 @@ class TestBCBClient:
         Verifica:
         - Erro 5xx faz retry
         - HTTPError é levantado após tentativas esgotadas
+        - Espera segue backoff exponencial com jitter (sem Retry-After)
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get, \
+                patch('src.clients.bcb.time.sleep') as mock_sleep, \
+                patch('src.clients.bcb.random.uniform', return_value=1.5) as mock_uniform:
             import requests
             
             # Configurar mock para erro 503
             mock_response = Mock()
             mock_response.status_code = 503
             mock_response.text = "Service Unavailable"
+            mock_response.headers = {}
             mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
                 "503 Server Error"
             )
@@ -221,10 +247,45 @@ class TestBCBClient:
             
             # Executar e verificar exceção
             with pytest.raises(requests.exceptions.HTTPError):
-                bcb_client.fetch_series(432)
+                BCBClient(max_retries=4, retry_delay=1, max_backoff=3).fetch_series(432)
             
-            # Verificar que houve retry (max_retries=2)
-            assert mock_get.call_count == 2
+            # Verificar que houve retry (max_retries=4)
+            assert mock_get.call_count == 4
+            
+            # Delays: min(3, 1 * 2**n) * 1.5 → 1.5, 3.0, 4.5
+            mock_uniform.assert_called_with(0.5, 1.5)
+            assert [c.args[0] for c in mock_sleep.call_args_list] == [1.5, 3.0, 4.5]
+    
+    def test_bcb_fetch_series_honors_retry_after(self, bcb_client, mock_bcb_response):
+        """
+        Testa uso do header Retry-After em respostas 429.
+        
+        Verifica:
+        - 429 faz retry (rate limit)
+        - Espera é a indicada pelo servidor, não o backoff padrão
+        """
+        with patch('src.clients.bcb.requests.Session.get') as mock_get, \
+                patch('src.clients.bcb.time.sleep') as mock_sleep:
+            import requests
+            
+            throttled = Mock()
+            throttled.status_code = 429
+            throttled.text = "Too Many Requests"
+            throttled.headers = {"Retry-After": "0.2"}
+            throttled.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                "429 Client Error"
+            )
+            
+            ok = Mock()
+            ok.status_code = 200
+            ok.json.return_value = mock_bcb_response
+            
+            mock_get.side_effect = [throttled, ok]
+            
+            result = bcb_client.fetch_series(432)
+            
+            assert len(result) == 5
+            mock_sleep.assert_called_once_with(0.2)
     
     def test_bcb_fetch_series_empty_response(self, bcb_client):
         """
@@ -234,7 +295,7 @@ class TestBCBClient:
         - Lista vazia é retornada
         - Não levanta exceção
         """
-        with patch('src.clients.bcb.requests.get') as mock_get:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = []
@@ -253,10 +314,10 @@ class TestBCBClient:
         Verifica:
         - Todas as séries são buscadas
         - Resultados são retornados em dicionário correto
-        - Pausa entre requisições é respeitada (implícito no mock)
+        - Sem pausas fixas entre séries enquanto dentro do rate limit
         """
-        with patch('src.clients.bcb.requests.get') as mock_get, \
-             patch('src.clients.bcb.time.sleep') as mock_sleep:
+        with patch('src.clients.bcb.requests.Session.get') as mock_get, \
+             patch('src.clients._ratelimit.time.sleep') as mock_sleep:
             
             mock_response = Mock()
             mock_response.status_code = 200
@@ -286,9 +347,8 @@ class TestBCBClient:
             # Verificar que API foi chamada 3 vezes
             assert mock_get.call_count == 3
             
-            # Verificar que sleep foi chamado 2 vezes (n-1 pausas)
-            assert mock_sleep.call_count == 2
-            mock_sleep.assert_called_with(1)  # Pausa de 1 segundo
+            # Verificar que não houve pausa (3 requisições cabem no token bucket)
+            mock_sleep.assert_not_called()
     
     def test_bcb_fetch_multiple_series_partial_failure(self, bcb_client):
         """
@@ -299,7 +359,7 @@ class TestBCBClient:
         - Falha em uma série não impede processamento das demais
         - Erros são logados mas não impedem execução
         """
-        with patch('src.clients.bcb.requests.get') as mock_get, \
+        with patch('src.clients.bcb.requests.Session.get') as mock_get, \
              patch('src.clients.bcb.time.sleep'):
             
             # Configurar mock para falhar na segunda série
@@ -337,6 +397,79 @@ class TestBCBClient:
             assert len(result["selic"]) == 1
             assert len(result["igpm"]) == 1
     
+    def test_bcb_fetch_multiple_series_async_without_aiohttp(
+        self,
+        mock_bcb_response
+    ):
+        """
+        Testa modo assíncrono quando aiohttp não está instalado.
+        
+        Verifica:
+        - Cliente cai para a busca sequencial com requests
+        - Todas as séries são retornadas
+        """
+        client = BCBClient(max_retries=2, retry_delay=0.1, use_async=True)
+        
+        with patch('src.clients.bcb.AIOHTTP_AVAILABLE', False), \
+             patch('src.clients.bcb.requests.Session.get') as mock_get, \
+             patch('src.clients.bcb.time.sleep'):
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_bcb_response
+            mock_get.return_value = mock_response
+            
+            result = client.fetch_multiple_series({"selic": 432, "ipca": 433})
+            
+            assert list(result.keys()) == ["selic", "ipca"]
+            assert mock_get.call_count == 2
+    
+    def test_bcb_fetch_series_uses_cache(self, tmp_path, mock_bcb_response):
+        """
+        Testa cache em disco de séries já buscadas.
+        
+        Verifica:
+        - Segunda busca da mesma janela não chama a API
+        - Dados do cache são iguais aos da primeira busca
+        """
+        from src.clients._cache import FileCache
+        
+        client = BCBClient(max_retries=2, cache=FileCache(tmp_path))
+        
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_bcb_response
+            mock_get.return_value = mock_response
+            
+            first = client.fetch_series(432, "01/01/2023", "31/05/2023")
+            second = client.fetch_series(432, "01/01/2023", "31/05/2023")
+            
+            assert mock_get.call_count == 1
+            assert second == first
+    
+    def test_bcb_fetch_series_does_not_cache_empty(self, tmp_path):
+        """
+        Testa que resposta vazia não é gravada no cache.
+        
+        Verifica:
+        - Janela histórica vazia é buscada de novo na chamada seguinte
+        """
+        from src.clients._cache import FileCache
+        
+        client = BCBClient(max_retries=2, cache=FileCache(tmp_path))
+        
+        with patch('src.clients.bcb.requests.Session.get') as mock_get:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = []
+            mock_get.return_value = mock_response
+            
+            assert client.fetch_series(432, "01/01/2020", "31/05/2020") == []
+            assert client.fetch_series(432, "01/01/2020", "31/05/2020") == []
+            
+            assert mock_get.call_count == 2
+    
     def test_bcb_client_initialization(self):
         """
         Testa inicialização do cliente BCB com parâmetros customizados.
@@ -366,6 +499,30 @@ class TestBCBClient:
         assert default_client.max_retries == 3
         assert default_client.retry_delay == 1
     
+    def test_bcb_client_reuses_session(self, mock_bcb_response):
+        """
+        Testa reaproveitamento da sessão HTTP entre séries.
+        
+        Verifica:
+        - Todas as requisições passam pela mesma sessão
+        - Sessão é fechada ao sair do bloco with
+        """
+        with patch('src.clients.bcb.requests.Session.get') as mock_get, \
+                patch('src.clients.bcb.requests.Session.close') as mock_close, \
+                patch('src.clients.bcb.time.sleep'):
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_bcb_response
+            mock_get.return_value = mock_response
+            
+            with BCBClient() as client:
+                session = client.session
+                client.fetch_multiple_series({"selic": 432, "ipca": 433})
+                assert client.session is session
+            
+            assert mock_get.call_count == 2
+            mock_close.assert_called_once()
+    
     def test_bcb_process_series_data_invalid_date(self, bcb_client):
         """
         Testa processamento de dados com data inválida.
@@ -409,3 +566,87 @@ class TestBCBClient:
         assert len(result) == 2
         assert result[0]["value"] == 10.0
         assert result[1]["value"] == 30.0
+
+
+class TestTokenBucket:
+    """Testes para o rate limiter usado pelos clientes."""
+    
+    def test_token_bucket_waits_only_when_exhausted(self):
+        """
+        Testa espera do token bucket.
+        
+        Verifica:
+        - Requisições dentro da rajada não esperam
+        - Excedente espera o tempo de reposição de um token
+        """
+        from src.clients._ratelimit import TokenBucket
+        
+        with patch('src.clients._ratelimit.time.monotonic', return_value=100.0), \
+                patch('src.clients._ratelimit.time.sleep') as mock_sleep:
+            limiter = TokenBucket(rate=4, capacity=2)
+            
+            limiter.acquire()
+            limiter.acquire()
+            mock_sleep.assert_not_called()
+            
+            # Terceira requisição no mesmo instante: espera 1/4 s
+            limiter.acquire()
+            mock_sleep.assert_called_once_with(0.25)
+
+
+@pytest.mark.integration
+class TestBCBClientIntegration:
+    """Testes do BCBClient contra servidor HTTP local (pilha HTTP real)."""
+    
+    def test_fetch_series_over_http(self, bcb_server, mock_bcb_response):
+        """
+        Testa busca de série passando por sockets e requests.Session reais.
+        
+        Verifica:
+        - URL e parâmetros chegam ao servidor
+        - Corpo JSON é decodificado e processado
+        """
+        bcb_server.expect_series(432, mock_bcb_response)
+        
+        with BCBClient(base_url=bcb_server.base_url, timeout=5) as client:
+            result = client.fetch_series(432, "01/01/2023", "31/05/2023")
+        
+        assert bcb_server.requests == ["/dados/serie/bcdata.sgs.432/dados"]
+        assert len(result) == 5
+        assert result[0] == {"date": "2023-01-01", "value": 13.75}
+    
+    def test_retry_after_over_http(self, bcb_server, mock_bcb_response):
+        """
+        Testa retry com header Retry-After real em resposta 503.
+        
+        Verifica:
+        - 503 é repetido e a segunda resposta (200) é usada
+        - Espera segue o Retry-After do servidor
+        """
+        bcb_server.expect_series(433, {"erro": "indisponível"}, status=503, headers={"Retry-After": "0"})
+        bcb_server.expect_series(433, mock_bcb_response)
+        
+        with patch('src.clients.bcb.time.sleep') as mock_sleep, \
+                BCBClient(base_url=bcb_server.base_url, timeout=5, max_retries=3) as client:
+            result = client.fetch_series(433, "01/01/2023", "31/05/2023")
+        
+        assert len(bcb_server.requests) == 2
+        mock_sleep.assert_called_once_with(0.0)
+        assert len(result) == 5
+    
+    def test_keep_alive_across_series(self, bcb_server, mock_bcb_response):
+        """
+        Testa reaproveitamento de conexão entre séries buscadas em sequência.
+        
+        Verifica:
+        - Várias séries usam uma única conexão TCP (keep-alive)
+        """
+        for series_id in (432, 433, 189):
+            bcb_server.expect_series(series_id, mock_bcb_response)
+        
+        with BCBClient(base_url=bcb_server.base_url, timeout=5) as client:
+            for series_id in (432, 433, 189):
+                client.fetch_series(series_id, "01/01/2023", "31/05/2023")
+        
+        assert len(bcb_server.requests) == 3
+        assert len(bcb_server.connections) == 1
@@ -0,0 +1,74 @@
+"""
+Testes unitários para src.utils.logger.
+
+Testa:
+- Decorator log_execution()
+- Configuração do namespace em setup_logger()
+"""
+
+import json
+import logging
+import unittest
+
+from structlog.testing import capture_logs
+
+from src.utils import logger as logger_module
+from src.utils.logger import log_execution, setup_logger
+
+
+class TestLogExecution(unittest.TestCase):
+    """Testes para o decorator log_execution()."""
+    
+    def test_args_logged_before_mutation(self):
+        """Argumentos devem ser logados como estavam na chamada."""
+        logger = setup_logger("src.tests.logger")
+        
+        @log_execution(logger)
+        def anexar(items):
+            items.append(99)
+            return len(items)
+        
+        with capture_logs() as logs:
+            anexar([1, 2])
+        
+        started = next(e for e in logs if e["event"] == "function_execution_started")
+        self.assertEqual(started["args"], ["[1, 2]"])
+
+
+class TestSetupLogger(unittest.TestCase):
+    """Testes para a configuração de handlers em setup_logger()."""
+    
+    def test_root_logger_untouched(self):
+        """Só o namespace do projeto recebe o handler de fila."""
+        setup_logger("src.tests.namespace")
+        
+        handler = logger_module._queue_handler
+        self.assertIn(handler, logging.getLogger("src").handlers)
+        self.assertNotIn(handler, logging.getLogger().handlers)
+    
+    def test_level_applied_on_later_calls(self):
+        """O nível pedido vale mesmo depois da primeira configuração."""
+        setup_logger("src.tests.level_a", level="INFO")
+        setup_logger("src.tests.level_b", level="WARNING")
+        
+        self.assertEqual(logging.getLogger("src").level, logging.WARNING)
+        setup_logger("src.tests.level_c", level="INFO")
+    
+    def test_stdlib_record_gets_level_and_timestamp(self):
+        """Registros do stdlib (fora do structlog) saem com nível e timestamp."""
+        setup_logger("src.tests.foreign")
+        stream_handler = logger_module._queue_listener.handlers[0]
+        record = logging.LogRecord(
+            "src.tests.foreign", logging.INFO, __file__, 1, "mensagem_stdlib", None, None
+        )
+        
+        rendered = json.loads(stream_handler.format(record))
+        
+        self.assertEqual(rendered["event"], "mensagem_stdlib")
+        self.assertEqual(rendered["level"], "info")
+        self.assertEqual(rendered["logger"], "src.tests.foreign")
+        self.assertIn("timestamp", rendered)
+
+
+if __name__ == '__main__':
+    unittest.main()
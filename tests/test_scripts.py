@@ -0,0 +1,74 @@
+"""
+Testes unitários para funções auxiliares dos scripts em src/scripts.
+
+Testa:
+- parse_area() de verificar_dim_geo
+- upload_dataframe_to_sheet() com colunas de data
+"""
+
+import json
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.scripts.upload_to_google_sheets import upload_dataframe_to_sheet
+from src.scripts.verificar_dim_geo import parse_area
+
+
+class TestParseArea(unittest.TestCase):
+    """Testes para parse_area()."""
+    
+    def test_all_numeric_column(self):
+        """Coluna totalmente numérica (float64) não deve usar o acessor .str."""
+        area = pd.Series([10.5, 0.0, 1523.25])
+        
+        result = parse_area(area)
+        
+        self.assertEqual(result.tolist(), [10.5, 0.0, 1523.25])
+    
+    def test_mixed_numbers_and_comma_text(self):
+        """Texto com vírgula decimal vira float; vazio e inválido viram NaN."""
+        area = pd.Series([10.5, "20,75", "", "abc", 3])
+        
+        result = parse_area(area)
+        
+        self.assertEqual(result.iloc[0], 10.5)
+        self.assertEqual(result.iloc[1], 20.75)
+        self.assertTrue(pd.isna(result.iloc[2]))
+        self.assertTrue(pd.isna(result.iloc[3]))
+        self.assertEqual(result.iloc[4], 3)
+
+
+class TestUploadDataframeToSheet(unittest.TestCase):
+    """Testes para upload_dataframe_to_sheet()."""
+    
+    def _upload(self, df):
+        client = MagicMock()
+        worksheet = client.open_by_key.return_value.worksheet.return_value
+        worksheet.id = 0
+        
+        upload_dataframe_to_sheet(df, client, "spreadsheet_id", "fact_cub")
+        
+        return worksheet.update.call_args[0][0]
+    
+    def test_datetime_columns_are_json_serializable(self):
+        """Colunas datetime64 e de objetos date devem chegar como texto ISO."""
+        df = pd.DataFrame({
+            "data_referencia": pd.to_datetime(["2024-01-01", None]),
+            "created_at": pd.to_datetime(["2024-01-01 10:30:00", "2024-02-01 08:00:00"]),
+            "data_inicio": [date(2024, 9, 1), None],
+            "valor": [1.5, 2.0],
+        })
+        
+        values = self._upload(df)
+        
+        json.dumps(values)  # não deve lançar TypeError
+        self.assertEqual(values[0], ["data_referencia", "created_at", "data_inicio", "valor"])
+        self.assertEqual(values[1], ["2024-01-01", "2024-01-01 10:30:00", "2024-09-01", 1.5])
+        self.assertEqual(values[2], ["", "2024-02-01 08:00:00", "", 2.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
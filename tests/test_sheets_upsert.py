@@ -27,6 +27,7 @@ class TestReadFactSeries(unittest.TestCase):
     def setUp(self):
         """Configuração antes de cada teste."""
         self.loader = SheetsLoader()
+        self.loader.invalidate_cache()
         # Mock da conexão do Google Sheets
         self.loader._get_spreadsheet = MagicMock()
         self.loader._get_client = MagicMock()
@@ -82,6 +83,28 @@ class TestReadFactSeries(unittest.TestCase):
         # Verificar
         self.assertIsInstance(result, pd.DataFrame)
         self.assertEqual(len(result), 0)
+    
+    @patch.object(SheetsLoader, 'read_sheet')
+    def test_read_fact_series_cached(self, mock_read_sheet):
+        """Deve ler a aba uma única vez até o cache ser invalidado."""
+        mock_read_sheet.return_value = [
+            ["id_fato", "valor"],
+            ["ipca_2023-01-01", "100.5"],
+        ]
+        
+        # Executar duas leituras
+        first = self.loader.read_fact_series()
+        first.loc[0, 'valor'] = 0.0  # Alterar a cópia não afeta o cache
+        second = self.loader.read_fact_series()
+        
+        # Verificar
+        self.assertEqual(mock_read_sheet.call_count, 1)
+        self.assertEqual(second.iloc[0]['valor'], 100.5)
+        
+        # Após invalidar, volta a ler a aba
+        self.loader.invalidate_cache()
+        self.loader.read_fact_series()
+        self.assertEqual(mock_read_sheet.call_count, 2)
 
 
 class TestDeduplicateFactSeries(unittest.TestCase):
@@ -113,6 +136,21 @@ class TestDeduplicateFactSeries(unittest.TestCase):
         ipca_row = df_clean[df_clean['id_fato'] == 'ipca_2023-01-01'].iloc[0]
         self.assertEqual(ipca_row['valor'], 101.0)
     
+    def test_deduplicate_same_created_at_keeps_last(self):
+        """Deve manter a última linha de entrada quando created_at empata."""
+        df = pd.DataFrame({
+            'id_fato': ['ipca_2023-01-01'] * 20,
+            'valor': [float(i) for i in range(20)],
+            'created_at': ['2023-01-01 10:00:00'] * 20
+        })
+        
+        # Executar
+        df_clean, removed = self.loader.deduplicate_fact_series(df)
+        
+        # Verificar
+        self.assertEqual(removed, 19)
+        self.assertEqual(df_clean.iloc[0]['valor'], 19.0)
+    
     def test_deduplicate_no_duplicates(self):
         """Deve retornar DataFrame inalterado quando não há duplicatas."""
         df = pd.DataFrame({
@@ -164,6 +202,7 @@ class TestWriteFactSeriesUpsert(unittest.TestCase):
     def setUp(self):
         """Configuração antes de cada teste."""
         self.loader = SheetsLoader()
+        self.loader.invalidate_cache()
         # Mock da conexão do Google Sheets
         self.mock_worksheet = MagicMock()
         self.mock_spreadsheet = MagicMock()
@@ -226,13 +265,15 @@ class TestWriteFactSeriesUpsert(unittest.TestCase):
         # Executar
         self.loader.write_fact_series('ipca', df, 'exec_002')
         
-        # Verificar que worksheet.update foi chamado
-        self.mock_worksheet.update.assert_called_once()
-        call_args = self.mock_worksheet.update.call_args
-        written_data = call_args[0][1]
+        # Verificar escrita incremental (sem reescrever a aba)
+        self.mock_worksheet.clear.assert_not_called()
+        self.mock_worksheet.update.assert_not_called()
+        self.mock_worksheet.batch_update.assert_not_called()
+        self.mock_worksheet.append_rows.assert_called_once()
         
-        # Deve ter 3 linhas de dados (1 existente + 2 novos) + 1 header = 4 linhas
-        self.assertEqual(len(written_data), 4)
+        # Apenas os 2 novos registros são acrescentados
+        appended = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual([row[0] for row in appended], ['ipca_2023-02-01', 'ipca_2023-03-01'])
     
     @patch.object(SheetsLoader, 'read_fact_series')
     @patch.object(SheetsLoader, 'create_sheet_if_not_exists')
@@ -260,13 +301,21 @@ class TestWriteFactSeriesUpsert(unittest.TestCase):
         # Executar
         self.loader.write_fact_series('ipca', df, 'exec_003')
         
-        # Verificar que worksheet.update foi chamado
-        self.mock_worksheet.update.assert_called_once()
-        call_args = self.mock_worksheet.update.call_args
-        written_data = call_args[0][1]
-        
-        # Deve ter 3 linhas (1 antigo + 1 atualizado + 1 novo) + 1 header = 4 linhas
-        self.assertEqual(len(written_data), 4)
+        # Verificar escrita incremental (sem reescrever a aba)
+        self.mock_worksheet.clear.assert_not_called()
+        self.mock_worksheet.update.assert_not_called()
+        
+        # 2023-02-01 (linha 3 da aba) é atualizado in-place
+        self.mock_worksheet.batch_update.assert_called_once()
+        payload = self.mock_worksheet.batch_update.call_args[0][0]
+        self.assertEqual(len(payload), 1)
+        self.assertEqual(payload[0]['range'], 'A3:H3')
+        self.assertEqual(payload[0]['values'][0][0], 'ipca_2023-02-01')
+        self.assertEqual(payload[0]['values'][0][3], 102.5)
+        
+        # 2023-03-01 é acrescentado ao final
+        appended = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual([row[0] for row in appended], ['ipca_2023-03-01'])
     
     def test_write_fact_series_missing_columns(self):
         """Deve levantar ValueError se colunas obrigatórias faltarem."""
@@ -293,6 +342,7 @@ class TestUpsertIntegration(unittest.TestCase):
     def setUp(self):
         """Configuração antes de cada teste."""
         self.loader = SheetsLoader()
+        self.loader.invalidate_cache()
         # Mock completo do Google Sheets
         self.mock_worksheet = MagicMock()
         self.mock_spreadsheet = MagicMock()
@@ -326,13 +376,16 @@ class TestUpsertIntegration(unittest.TestCase):
         # Executar
         self.loader.write_fact_series('ipca', df, 'exec_005')
         
-        # Verificar que worksheet.update foi chamado
-        self.mock_worksheet.update.assert_called_once()
-        call_args = self.mock_worksheet.update.call_args
-        written_data = call_args[0][1]
+        # Verificar escrita incremental (sem reescrever a aba)
+        self.mock_worksheet.clear.assert_not_called()
+        self.mock_worksheet.update.assert_not_called()
         
-        # Deve ter 3 linhas (1 IPCA antigo + 1 IPCA novo + 1 SELIC antigo) + 1 header
-        self.assertEqual(len(written_data), 4)
+        # IPCA e SELIC existentes ficam intactos; só o IPCA novo é acrescentado
+        self.mock_worksheet.batch_update.assert_not_called()
+        self.mock_worksheet.append_rows.assert_called_once()
+        appended = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual(len(appended), 1)
+        self.assertEqual(appended[0][:2], ['ipca_2023-02-01', 'ipca'])
 
 
 if __name__ == '__main__':
@@ -2,19 +2,157 @@
 """
 Script completo para fazer upload da Fase 2 preservando todas as abas existentes
 """
-import pandas as pd
 import gspread
 from google.oauth2.service_account import Credentials
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from openpyxl.utils import get_column_letter
+
+from upload_fase2_to_sheets import (
+    call_with_backoff,
+    dataframe_to_values,
+    find_latest_file as find_latest,
+    read_csv_cached,
+)
+
+# Bloco fixo do dashboard da Fase 2 (entre a data de atualização e o total de abas)
+DASHBOARD_FASE2_RESUMO = (
+    ('',),
+    ('RESUMO EXECUTIVO:',),
+    ('',),
+    ('Estados Analisados:', '27'),
+    ('Métodos Construtivos:', '10'),
+    ('Total de Linhas (dim_metodo):', '270'),
+    ('',),
+    ('DISCREPÂNCIAS IDENTIFICADAS:',),
+    ('Estados com revisão necessária:', '19'),
+    ('Estados com ajuste leve:', '0'),
+    ('Estados mantidos:', '2'),
+    ('Estados sem dados CBIC:', '6'),
+    ('',),
+    ('TOP 5 MAIORES AJUSTES:',),
+    ('1. Amazonas (AM):', '+69.0%'),
+    ('2. Mato Grosso (MT):', '+52.3%'),
+    ('3. Santa Catarina (SC):', '+35.7%'),
+    ('4. Espírito Santo (ES):', '+35.5%'),
+    ('5. Goiás (GO):', '+29.0%'),
+    ('',),
+    ('ANÁLISE POR REGIÃO:',),
+    ('Centro-Oeste:', 'Média +18.3%, 4 discrepâncias'),
+    ('Nordeste:', 'Média +2.6%, 6 discrepâncias'),
+    ('Norte:', 'Média +33.1%, 3 discrepâncias'),
+    ('Sudeste:', 'Média +15.9%, 3 discrepâncias'),
+    ('Sul:', 'Média +25.8%, 3 discrepâncias'),
+    ('',),
+    ('ARQUIVOS GERADOS:',),
+    ('✅ dim_metodo_fase2', 'Fatores empíricos aplicados'),
+    ('✅ comparacao_fatores', 'Análise teórico vs empírico'),
+    ('✅ fatores_empiricos', 'Fatores por UF'),
+    ('',),
+    ('NOVAS ABAS CBIC (13):',),
+    ('✅ cub_on_global', 'CUB Global Oneroso'),
+    ('✅ cub_on_global_uf', 'CUB por UF'),
+    ('✅ cub_des_global', 'CUB Desonerado'),
+    ('✅ pib_brasil_serie', 'PIB Brasil'),
+    ('✅ pib_construcao_civil', 'PIB Construção'),
+    ('✅ inv_construcao_civil', 'Investimento Construção'),
+    ('✅ inv_infraestrutura', 'Investimento Infraestrutura'),
+    ('✅ pib_part_construcao', 'Participação no PIB'),
+    ('✅ mat_cimento_consumo', 'Consumo Cimento'),
+    ('✅ mat_cimento_producao', 'Produção Cimento'),
+    ('✅ ind_ipca_consumidor', 'IPCA'),
+    ('✅ ind_taxa_selic', 'Taxa SELIC'),
+    ('✅ ind_taxa_desemprego', 'Taxa Desemprego'),
+    ('',),
+)
+
 def find_latest_file(pattern):
     """Encontra o arquivo mais recente que corresponde ao padrão"""
-    files = list(Path('configs').glob(pattern))
-    if not files:
+    latest = find_latest(pattern)
+    if latest is None:
         raise FileNotFoundError(f"Nenhum arquivo encontrado com padrão: {pattern}")
-    return max(files, key=lambda x: x.stat().st_mtime)
+    return Path(latest)
+
+def sobras_fora_do_bloco(aba_name, worksheet, n_linhas, n_colunas):
+    """
+    Intervalos da grade fora do bloco A1:{n_colunas}{n_linhas} que será escrito.
+    
+    Os dados sobrescrevem o bloco no lugar; só o que sobrar de um upload
+    anterior (linhas abaixo e colunas à direita) precisa ser limpo.
+    """
+    sobras = []
+    if worksheet.row_count > n_linhas:
+        sobras.append(f"'{aba_name}'!{n_linhas + 1}:{worksheet.row_count}")
+    if worksheet.col_count > n_colunas:
+        sobras.append(
+            f"'{aba_name}'!{get_column_letter(n_colunas + 1)}:"
+            f"{get_column_letter(worksheet.col_count)}"
+        )
+    return sobras
+
+def upload_one(config, spreadsheet, ws_by_title):
+    """
+    Prepara uma aba da Fase 2: carrega o CSV e cria/ajusta a aba de destino.
+    
+    Executada em paralelo para os arquivos; não escreve dados (o envio é
+    feito num único values.batchUpdate por upload_fase2_completo). Abas
+    criadas são registradas em ws_by_title (título → Worksheet).
+    
+    Returns:
+        Dict com 'dados' (entrada do batchUpdate), 'sobras' (intervalos de
+        uma aba existente a limpar após a escrita) e 'mensagens' (linhas de
+        progresso a imprimir)
+    """
+    mensagens = []
+    
+    # Carregar CSV
+    mensagens.append(f"📁 Carregando: {config['file'].name}")
+    df = read_csv_cached(config['file'])
+    mensagens.append(f"✅ Dados carregados: {len(df)} linhas × {len(df.columns)} colunas")
+    
+    # Criar ou atualizar aba
+    aba_name = config['aba']
+    sobras = []
+    
+    if aba_name in ws_by_title:
+        mensagens.append(f"🔄 Aba '{aba_name}' já existe - atualizando...")
+        worksheet = ws_by_title[aba_name]
+        
+        # Garantir grade suficiente (escrita fora da grade falha no batch inteiro)
+        if worksheet.row_count < len(df) + 1 or worksheet.col_count < len(df.columns):
+            call_with_backoff(
+                worksheet.resize,
+                rows=max(worksheet.row_count, len(df) + 1),
+                cols=max(worksheet.col_count, len(df.columns))
+            )
+        
+        sobras = sobras_fora_do_bloco(aba_name, worksheet, len(df) + 1, len(df.columns))
+    else:
+        mensagens.append(f"➕ Criando nova aba '{aba_name}'...")
+        ws_by_title[aba_name] = call_with_backoff(
+            spreadsheet.add_worksheet,
+            title=aba_name,
+            rows=len(df) + 1,
+            cols=len(df.columns)
+        )
+    
+    # Preparar dados: números seguem nativos (payload menor que células
+    # str entre aspas); NaN vira ''
+    all_data = dataframe_to_values(df)
+    
+    mensagens.append(f"✅ Preparado: '{aba_name}' ({len(all_data)} linhas)")
+    
+    return {
+        'dados': {
+            'range': f"'{aba_name}'!A1:{get_column_letter(len(df.columns))}{len(df) + 1}",
+            'majorDimension': 'ROWS',
+            'values': all_data
+        },
+        'sobras': sobras,
+        'mensagens': mensagens
+    }
 
 def upload_fase2_completo():
     """Faz upload completo da Fase 2 preservando abas existentes"""
@@ -39,8 +177,10 @@ def upload_fase2_completo():
         print(f"✅ Conectado: {spreadsheet.title}")
         
         # Listar abas existentes
-        existing_worksheets = {ws.title for ws in spreadsheet.worksheets()}
-        print(f"📋 Abas existentes: {len(existing_worksheets)}")
+        # Metadados das abas lidos uma única vez (evita spreadsheet.worksheet(nome))
+        ws_by_title = {ws.title: ws for ws in spreadsheet.worksheets()}
+        n_abas_existentes = len(ws_by_title)
+        print(f"📋 Abas existentes: {n_abas_existentes}")
         
         # Arquivos para upload
         arquivos = [
@@ -65,128 +205,80 @@ def upload_fase2_completo():
         print(f"📤 Arquivos para upload: {len(arquivos)}")
         print()
         
-        for idx, config in enumerate(arquivos, 1):
+        # Todas as abas são escritas no lugar numa única chamada
+        # values.batchUpdate; depois, uma única values.batchClear remove só
+        # as sobras de uploads anteriores fora dos novos blocos
+        sobras_para_limpar = []
+        dados_para_enviar = []
+        
+        # Preparar as abas em paralelo (CSV + criação/ajuste da aba são
+        # independentes entre arquivos); mensagens impressas na ordem original
+        with ThreadPoolExecutor(max_workers=len(arquivos)) as executor:
+            preparados = list(executor.map(
+                lambda config: upload_one(config, spreadsheet, ws_by_title),
+                arquivos
+            ))
+        
+        for idx, (config, preparado) in enumerate(zip(arquivos, preparados), 1):
             print(f"{'='*70}")
             print(f"📊 [{idx}/{len(arquivos)}] {config['descricao']}")
             print(f"{'='*70}")
-            
-            # Carregar CSV
-            print(f"📁 Carregando: {config['file'].name}")
-            df = pd.read_csv(config['file'])
-            df = df.fillna('')  # Limpar NaN
-            print(f"✅ Dados carregados: {len(df)} linhas × {len(df.columns)} colunas")
-            
-            # Criar ou atualizar aba
-            aba_name = config['aba']
-            
-            if aba_name in existing_worksheets:
-                print(f"🔄 Aba '{aba_name}' já existe - atualizando...")
-                worksheet = spreadsheet.worksheet(aba_name)
-                worksheet.clear()
-            else:
-                print(f"➕ Criando nova aba '{aba_name}'...")
-                worksheet = spreadsheet.add_worksheet(
-                    title=aba_name,
-                    rows=max(1000, len(df) + 100),
-                    cols=max(26, len(df.columns) + 2)
-                )
-            
-            # Preparar dados
-            all_data = [df.columns.tolist()] + df.values.tolist()
-            
-            # Upload em lotes
-            print(f"📤 Fazendo upload de {len(all_data)} linhas...")
-            batch_size = 100
-            
-            for i in range(0, len(all_data), batch_size):
-                batch = all_data[i:i+batch_size]
-                end_idx = min(i+batch_size, len(all_data))
-                print(f"   📦 Lote {i//batch_size + 1}: linhas {i+1}-{end_idx}")
-                
-                # Converter para lista de listas (evitar problemas de serialização)
-                batch_clean = [[str(cell) if pd.notna(cell) else '' for cell in row] for row in batch]
-                
-                worksheet.update(
-                    values=batch_clean,
-                    range_name=f'A{i+1}:Z{end_idx}',
-                    value_input_option='RAW'
-                )
-                time.sleep(1)  # Rate limiting
-            
-            print(f"✅ Upload concluído: '{aba_name}'")
+            for linha in preparado['mensagens']:
+                print(linha)
             print()
+            
+            sobras_para_limpar.extend(preparado['sobras'])
+            dados_para_enviar.append(preparado['dados'])
         
         # Dashboard/Resumo
         print(f"{'='*70}")
         print("📊 CRIANDO ABA DE DASHBOARD")
         print(f"{'='*70}")
         
-        # Criar dashboard com resumo executivo
+        # Criar dashboard com resumo executivo (parte fixa em DASHBOARD_FASE2_RESUMO)
         dashboard_data = [
             ['DASHBOARD - FASE 2: INTEGRAÇÃO CBIC EMPÍRICA'],
             [''],
             ['Data da Atualização:', datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-            [''],
-            ['RESUMO EXECUTIVO:'],
-            [''],
-            ['Estados Analisados:', '27'],
-            ['Métodos Construtivos:', '10'],
-            ['Total de Linhas (dim_metodo):', '270'],
-            [''],
-            ['DISCREPÂNCIAS IDENTIFICADAS:'],
-            ['Estados com revisão necessária:', '19'],
-            ['Estados com ajuste leve:', '0'],
-            ['Estados mantidos:', '2'],
-            ['Estados sem dados CBIC:', '6'],
-            [''],
-            ['TOP 5 MAIORES AJUSTES:'],
-            ['1. Amazonas (AM):', '+69.0%'],
-            ['2. Mato Grosso (MT):', '+52.3%'],
-            ['3. Santa Catarina (SC):', '+35.7%'],
-            ['4. Espírito Santo (ES):', '+35.5%'],
-            ['5. Goiás (GO):', '+29.0%'],
-            [''],
-            ['ANÁLISE POR REGIÃO:'],
-            ['Centro-Oeste:', 'Média +18.3%, 4 discrepâncias'],
-            ['Nordeste:', 'Média +2.6%, 6 discrepâncias'],
-            ['Norte:', 'Média +33.1%, 3 discrepâncias'],
-            ['Sudeste:', 'Média +15.9%, 3 discrepâncias'],
-            ['Sul:', 'Média +25.8%, 3 discrepâncias'],
-            [''],
-            ['ARQUIVOS GERADOS:'],
-            ['✅ dim_metodo_fase2', 'Fatores empíricos aplicados'],
-            ['✅ comparacao_fatores', 'Análise teórico vs empírico'],
-            ['✅ fatores_empiricos', 'Fatores por UF'],
-            [''],
-            ['NOVAS ABAS CBIC (13):'],
-            ['✅ cub_on_global', 'CUB Global Oneroso'],
-            ['✅ cub_on_global_uf', 'CUB por UF'],
-            ['✅ cub_des_global', 'CUB Desonerado'],
-            ['✅ pib_brasil_serie', 'PIB Brasil'],
-            ['✅ pib_construcao_civil', 'PIB Construção'],
-            ['✅ inv_construcao_civil', 'Investimento Construção'],
-            ['✅ inv_infraestrutura', 'Investimento Infraestrutura'],
-            ['✅ pib_part_construcao', 'Participação no PIB'],
-            ['✅ mat_cimento_consumo', 'Consumo Cimento'],
-            ['✅ mat_cimento_producao', 'Produção Cimento'],
-            ['✅ ind_ipca_consumidor', 'IPCA'],
-            ['✅ ind_taxa_selic', 'Taxa SELIC'],
-            ['✅ ind_taxa_desemprego', 'Taxa Desemprego'],
-            [''],
-            ['TOTAL DE ABAS:', str(len(existing_worksheets) + len(arquivos) + 1)],
+            *DASHBOARD_FASE2_RESUMO,
+            ['TOTAL DE ABAS:', str(n_abas_existentes + len(arquivos) + 1)],
             [''],
             ['STATUS:', '🟢 SISTEMA COMPLETO E OPERACIONAL']
         ]
         
+        # Linhas completadas até a coluna B: a escrita no lugar precisa
+        # sobrescrever também a coluna B das linhas de um só valor
+        dashboard_data = [list(linha) + [''] * (2 - len(linha)) for linha in dashboard_data]
+        
         # Criar ou atualizar dashboard
-        if 'dashboard_fase2' in existing_worksheets:
-            worksheet = spreadsheet.worksheet('dashboard_fase2')
-            worksheet.clear()
+        if 'dashboard_fase2' in ws_by_title:
+            sobras_para_limpar.extend(sobras_fora_do_bloco(
+                'dashboard_fase2', ws_by_title['dashboard_fase2'], len(dashboard_data), 2
+            ))
         else:
-            worksheet = spreadsheet.add_worksheet(title='dashboard_fase2', rows=100, cols=10)
+            ws_by_title['dashboard_fase2'] = call_with_backoff(
+                spreadsheet.add_worksheet, title='dashboard_fase2', rows=100, cols=10
+            )
+        
+        dados_para_enviar.append({
+            'range': f"'dashboard_fase2'!A1:B{len(dashboard_data)}",
+            'majorDimension': 'ROWS',
+            'values': dashboard_data
+        })
+        
+        total_linhas = sum(len(item['values']) for item in dados_para_enviar)
+        print(f"📤 Enviando {len(dados_para_enviar)} abas ({total_linhas} linhas) em uma requisição...")
+        call_with_backoff(spreadsheet.values_batch_update, {
+            'valueInputOption': 'RAW',
+            'data': dados_para_enviar
+        })
+        
+        # Limpar o que sobrou de uploads anteriores (2 requisições no total)
+        if sobras_para_limpar:
+            print(f"🗑️ Limpando {len(sobras_para_limpar)} intervalos remanescentes...")
+            call_with_backoff(spreadsheet.values_batch_clear, body={'ranges': sobras_para_limpar})
         
-        worksheet.update(values=dashboard_data, range_name='A1:B100', value_input_option='RAW')
-        print("✅ Dashboard criado com sucesso!")
+        print("✅ Abas e dashboard atualizados com sucesso!")
         
         # Relatório final
         print()
@@ -194,7 +286,7 @@ def upload_fase2_completo():
         print("🎉 UPLOAD FASE 2 CONCLUÍDO COM SUCESSO!")
         print("=" * 70)
         print(f"📊 Total de abas atualizadas/criadas: {len(arquivos) + 1}")
-        print(f"📋 Total de abas na planilha: {len(spreadsheet.worksheets())}")
+        print(f"📋 Total de abas na planilha: {len(ws_by_title)}")
         print(f"🔗 Planilha: https://docs.google.com/spreadsheets/d/{spreadsheet_id}")
         print("=" * 70)
         
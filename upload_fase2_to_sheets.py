@@ -16,18 +16,133 @@ Autor: matheusoption-bit
 Data: 2025-11-14
 """
 
+import fnmatch
 import os
+import random
 import sys
+import time
 import pandas as pd
 import gspread
 from google.oauth2.service_account import Credentials
-from datetime import datetime
-from typing import Dict, List, Any
+from openpyxl.utils import get_column_letter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+try:
+    import pyarrow  # noqa: F401  (habilita engine='pyarrow' no read_csv)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Constantes
 SPREADSHEET_ID = "11-KC18ShMKXZOSbWvHcLHJwz3oDjexGQLb26xm2Wq4w"
 CREDENTIALS_PATH = "config/google_credentials.json"
 
+def call_with_backoff(fn, *args, max_attempts: int = 5, **kwargs):
+    """
+    Executa uma chamada à API do Sheets, recuando exponencialmente em HTTP 429.
+    
+    Substitui pausas fixas entre requisições: só espera quando a cota
+    estoura, com delay min(60, 2**tentativa + jitter).
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            status = getattr(e.response, 'status_code', None)
+            if status != 429 or attempt == max_attempts - 1:
+                raise
+            delay = min(60, 2 ** attempt + random.random())
+            print(f"⏳ Cota da API excedida (429) - nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+
+def dataframe_to_values(data: pd.DataFrame) -> List[List[Any]]:
+    """
+    Converte um DataFrame em linhas (cabeçalho + dados) para values.update RAW.
+    
+    Números e booleanos seguem como tipos nativos do JSON (sem aspas e sem o
+    str() por célula); NaN vira ''. Uma única matriz object é alocada e
+    mascarada no lugar, sem DataFrames intermediários.
+    """
+    valores = data.to_numpy(dtype=object)
+    valores[pd.isna(valores)] = ''
+    return [data.columns.astype(str).tolist()] + valores.tolist()
+
+def find_latest_file(pattern: str, directory: str = "configs") -> Optional[str]:
+    """
+    Retorna o arquivo mais recente (por mtime) de directory que casa com pattern.
+    
+    Uma única passada com os.scandir: o tipo vem da listagem do diretório e
+    só os arquivos que casam com o padrão recebem um stat().
+    """
+    latest, latest_mtime = None, -1.0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest, latest_mtime = entry.path, mtime
+    return latest
+
+def _data_iso(valor):
+    """date/datetime → texto ISO (como no CSV); demais valores (NaN) passam."""
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=' ')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+def read_csv_fast(path) -> pd.DataFrame:
+    """Lê um CSV com o parser multithread do pyarrow, se instalado (senão, engine C)."""
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(path)
+    
+    df = pd.read_csv(path, engine='pyarrow')
+    # O pyarrow infere datas ISO (date/datetime); voltam a texto como no
+    # engine C. Só colunas de data são convertidas e nulos seguem NaN
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            df[col] = serie.dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif serie.dtype == object:
+            validos = serie.dropna()
+            if len(validos) and validos.map(lambda v: isinstance(v, date)).all():
+                df[col] = serie.map(_data_iso)
+    return df
+
+def read_csv_cached(path) -> pd.DataFrame:
+    """
+    Lê um CSV pela cópia Parquet ao lado dele (<nome>.parquet), se houver pyarrow.
+    
+    O CSV continua sendo o arquivo de referência (legível): a cópia é
+    regravada sempre que estiver mais antiga que ele ou ilegível.
+    """
+    if not PYARROW_AVAILABLE:
+        return read_csv_fast(path)
+    
+    csv_path = Path(path)
+    parquet_path = csv_path.with_suffix('.parquet')
+    
+    try:
+        if parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return pd.read_parquet(parquet_path)
+    except Exception:
+        pass  # sem cópia, desatualizada ou corrompida: relê o CSV
+    
+    df = read_csv_fast(csv_path)
+    
+    tmp_path = parquet_path.with_suffix('.parquet.tmp')
+    try:
+        df.to_parquet(tmp_path, compression='zstd', index=False)
+        os.replace(tmp_path, parquet_path)
+    except Exception as e:
+        print(f"⚠️ Não foi possível gravar {parquet_path.name}: {e}")
+        tmp_path.unlink(missing_ok=True)
+    
+    return df
+
 def setup_google_sheets():
     """Configura conexão com Google Sheets."""
     print("🔗 Conectando ao Google Sheets...")
@@ -44,29 +159,50 @@ def setup_google_sheets():
     print("✅ Conexão estabelecida com sucesso")
     return spreadsheet
 
-def create_or_update_worksheet(spreadsheet, sheet_name: str, data: pd.DataFrame):
-    """Cria ou atualiza uma aba no Google Sheets."""
+def create_or_update_worksheet(
+    spreadsheet,
+    sheet_name: str,
+    data: pd.DataFrame,
+    ws_by_title: Dict[str, gspread.Worksheet]
+):
+    """
+    Cria ou atualiza uma aba no Google Sheets.
+    
+    ws_by_title (título → Worksheet, lido uma vez de spreadsheet.worksheets())
+    evita uma consulta de metadados por aba e recebe as abas criadas.
+    """
     print(f"📝 Processando aba: {sheet_name}")
     
-    try:
-        # Tenta acessar aba existente
-        worksheet = spreadsheet.worksheet(sheet_name)
-        worksheet.clear()
-        print(f"🔄 Aba '{sheet_name}' limpa")
-    except gspread.WorksheetNotFound:
+    # Grade do tamanho exato dos dados (como resize=True do gspread_dataframe):
+    # toda célula é sobrescrita, então não há sobra a limpar
+    n_linhas = len(data) + 1
+    n_colunas = len(data.columns)
+    ultima_coluna = get_column_letter(n_colunas)
+    
+    worksheet = ws_by_title.get(sheet_name)
+    if worksheet is None:
         # Cria nova aba
-        worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=30)
+        worksheet = call_with_backoff(
+            spreadsheet.add_worksheet, title=sheet_name, rows=n_linhas, cols=n_colunas
+        )
+        ws_by_title[sheet_name] = worksheet
         print(f"➕ Nova aba '{sheet_name}' criada")
+    elif (worksheet.row_count, worksheet.col_count) != (n_linhas, n_colunas):
+        # Aumenta ou apara a grade (linhas/colunas antigas saem junto)
+        call_with_backoff(worksheet.resize, rows=n_linhas, cols=n_colunas)
+        print(f"📐 Aba '{sheet_name}' redimensionada para {n_linhas}×{n_colunas}")
     
-    # Converte DataFrame para lista de listas
-    headers = data.columns.tolist()
-    values = [headers] + data.fillna('').astype(str).values.tolist()
-    
-    # Upload dos dados
-    worksheet.update(values=values, range_name="A1")
+    # Upload dos dados: values.update RAW no intervalo exato, sobrescrevendo
+    # o conteúdo anterior no lugar (sem clear() antes)
+    call_with_backoff(
+        spreadsheet.values_update,
+        f"'{sheet_name}'!A1:{ultima_coluna}{n_linhas}",
+        params={'valueInputOption': 'RAW'},
+        body={'majorDimension': 'ROWS', 'values': dataframe_to_values(data)}
+    )
     
     # Formatação básica
-    worksheet.format("A1:Z1", {
+    call_with_backoff(worksheet.format, f"A1:{ultima_coluna}1", {
         "backgroundColor": {"red": 0.2, "green": 0.4, "blue": 0.8},
         "textFormat": {"foregroundColor": {"red": 1, "green": 1, "blue": 1}, "bold": True}
     })
@@ -74,68 +210,63 @@ def create_or_update_worksheet(spreadsheet, sheet_name: str, data: pd.DataFrame)
     print(f"✅ Aba '{sheet_name}' atualizada: {len(data)} linhas")
     return worksheet
 
+# Cor de fundo da coluna de recomendação, por valor
+RECOMENDACAO_CORES = {
+    "REVISAO_NECESSARIA": {"red": 1, "green": 0.6, "blue": 0.6},
+    "AJUSTE_LEVE": {"red": 1, "green": 1, "blue": 0.6},
+    "MANTER_ATUAL": {"red": 0.6, "green": 1, "blue": 0.6},
+}
+
 def format_comparacao_sheet(worksheet, data: pd.DataFrame):
     """Aplica formatação especial na aba de comparação."""
     print("🎨 Aplicando formatação especial na comparação...")
     
-    # Encontra colunas relevantes
-    discrepancia_col = None
-    diferenca_col = None
-    recomendacao_col = None
+    # Encontra colunas relevantes (nomes exatos do relatório de comparação)
+    col_map = {col.lower(): get_column_letter(i) for i, col in enumerate(data.columns, 1)}
+    discrepancia_col = col_map.get('discrepancia_significativa')
+    recomendacao_col = col_map.get('recomendacao')
     
-    for i, col in enumerate(data.columns, 1):
-        col_letter = chr(64 + i) if i <= 26 else f"A{chr(64 + i - 26)}"
-        if 'discrepancia_significativa' in col.lower():
-            discrepancia_col = col_letter
-        elif 'diferenca_percentual' in col.lower():
-            diferenca_col = col_letter
-        elif 'recomendacao' in col.lower():
-            recomendacao_col = col_letter
+    # Todos os formatos vão em um único batch_format (um spreadsheets.batchUpdate)
+    formats = []
     
     # Formatação condicional para discrepâncias
     if discrepancia_col:
+        formats.append({
+            "range": f"{discrepancia_col}2:{discrepancia_col}{len(data)+1}",
+            "format": {"backgroundColor": {"red": 1, "green": 0.8, "blue": 0.8}}
+        })
+    
+    # Formatação para recomendações: linhas consecutivas com a mesma cor
+    # viram um único intervalo
+    if recomendacao_col and 'recomendacao' in data.columns:
+        inicio = None
+        cor_atual = None
+        for i, recomendacao in enumerate(list(data['recomendacao']) + [None], 2):
+            cor = RECOMENDACAO_CORES.get(recomendacao)
+            if cor is cor_atual:
+                continue
+            if cor_atual is not None:
+                formats.append({
+                    "range": f"{recomendacao_col}{inicio}:{recomendacao_col}{i-1}",
+                    "format": {"backgroundColor": cor_atual}
+                })
+            inicio = i
+            cor_atual = cor
+    
+    if formats:
         try:
-            worksheet.format(f"{discrepancia_col}2:{discrepancia_col}{len(data)+1}", {
-                "backgroundColor": {"red": 1, "green": 0.8, "blue": 0.8}
-            })
-        except:
-            pass
-    
-    # Formatação para recomendações
-    if recomendacao_col:
-        try:
-            for i, row in enumerate(data.itertuples(), 2):
-                if hasattr(row, 'recomendacao'):
-                    if row.recomendacao == "REVISAO_NECESSARIA":
-                        worksheet.format(f"{recomendacao_col}{i}", {
-                            "backgroundColor": {"red": 1, "green": 0.6, "blue": 0.6}
-                        })
-                    elif row.recomendacao == "AJUSTE_LEVE":
-                        worksheet.format(f"{recomendacao_col}{i}", {
-                            "backgroundColor": {"red": 1, "green": 1, "blue": 0.6}
-                        })
-                    elif row.recomendacao == "MANTER_ATUAL":
-                        worksheet.format(f"{recomendacao_col}{i}", {
-                            "backgroundColor": {"red": 0.6, "green": 1, "blue": 0.6}
-                        })
+            call_with_backoff(worksheet.batch_format, formats)
         except Exception as e:
             print(f"⚠️ Erro na formatação condicional: {e}")
 
-def create_dashboard_data() -> pd.DataFrame:
-    """Cria dados para dashboard de insights."""
+def create_dashboard_data(comparacao: pd.DataFrame) -> pd.DataFrame:
+    """Cria dados para dashboard de insights a partir do relatório de comparação."""
     print("📊 Criando dados do dashboard...")
     
-    # Lê arquivo de comparação mais recente
-    import glob
-    comparacao_files = glob.glob("configs/relatorio_comparacao_fatores_*.csv")
-    
-    if not comparacao_files:
+    if comparacao.empty:
         print("⚠️  Arquivo de comparação não encontrado")
         return pd.DataFrame()
     
-    latest_file = max(comparacao_files)
-    comparacao = pd.read_csv(latest_file)
-    
     # Métricas principais
     dashboard_data = []
     
@@ -159,48 +290,47 @@ def create_dashboard_data() -> pd.DataFrame:
             'discrepancia_significativa': 'sum'
         }).round(3)
         
-        for regiao, stats in regioes_stats.iterrows():
-            dashboard_data.append({
-                'Métrica': f'{regiao} - Diferença Média',
-                'Valor': f"{stats['diferenca_absoluta']:+.3f}",
-                'Categoria': 'Regional'
-            })
-            
-            dashboard_data.append({
-                'Métrica': f'{regiao} - Discrepâncias',
-                'Valor': int(stats['discrepancia_significativa']),
-                'Categoria': 'Regional'
-            })
+        regioes = regioes_stats.reset_index()
+        diferencas = pd.DataFrame({
+            'Métrica': regioes['regiao'] + ' - Diferença Média',
+            'Valor': regioes['diferenca_absoluta'].map('{:+.3f}'.format),
+            'Categoria': 'Regional'
+        })
+        discrepancias = pd.DataFrame({
+            'Métrica': regioes['regiao'] + ' - Discrepâncias',
+            'Valor': regioes['discrepancia_significativa'].astype(int),
+            'Categoria': 'Regional'
+        })
+        # Intercala as duas métricas de cada região (sort estável pelo índice)
+        dashboard_data.extend(
+            pd.concat([diferencas, discrepancias])
+            .sort_index(kind='stable')
+            .to_dict('records')
+        )
     except Exception as e:
         print(f"⚠️ Erro no processamento regional: {e}")
     
     # Top 5 maiores discrepâncias
     try:
-        top_discrepancias = comparacao.nlargest(5, 'diferenca_absoluta', key=abs)
-        for i, (_, row) in enumerate(top_discrepancias.iterrows(), 1):
-            dashboard_data.append({
-                'Métrica': f'Top {i} Discrepância - {row["uf"]}',
-                'Valor': f"{row['diferenca_percentual']:+.1f}%",
-                'Categoria': 'Top Discrepâncias'
-            })
+        top = comparacao.loc[comparacao['diferenca_absoluta'].abs().nlargest(5).index]
+        posicoes = pd.Series(range(1, len(top) + 1), index=top.index).astype(str)
+        dashboard_data.extend(pd.DataFrame({
+            'Métrica': 'Top ' + posicoes + ' Discrepância - ' + top['uf'],
+            'Valor': top['diferenca_percentual'].map('{:+.1f}%'.format),
+            'Categoria': 'Top Discrepâncias'
+        }).to_dict('records'))
     except Exception as e:
         print(f"⚠️ Erro no top discrepâncias: {e}")
     
     return pd.DataFrame(dashboard_data)
 
-def create_regional_analysis() -> pd.DataFrame:
-    """Cria análise agregada por região."""
+def create_regional_analysis(comparacao: pd.DataFrame) -> pd.DataFrame:
+    """Cria análise agregada por região a partir do relatório de comparação."""
     print("🗺️  Criando análise regional...")
     
-    import glob
-    comparacao_files = glob.glob("configs/relatorio_comparacao_fatores_*.csv")
-    
-    if not comparacao_files:
+    if comparacao.empty:
         return pd.DataFrame()
     
-    latest_file = max(comparacao_files)
-    comparacao = pd.read_csv(latest_file)
-    
     try:
         # Análise por região
         regional = comparacao.groupby('regiao').agg({
@@ -247,45 +377,57 @@ def main():
     try:
         # Setup Google Sheets
         spreadsheet = setup_google_sheets()
+        ws_by_title = {ws.title: ws for ws in spreadsheet.worksheets()}
         
-        # Busca arquivos mais recentes da Fase 2
-        import glob
+        # As abas são preparadas localmente e enviadas em paralelo:
+        # (nome da aba, dados, formatação extra após o upload)
+        abas = []
         
         # 1. Dataset principal (dim_metodo atualizado)
-        dim_metodo_files = glob.glob("configs/dim_metodo_regional_FASE2_*.csv")
-        if dim_metodo_files:
-            latest_dim_metodo = max(dim_metodo_files)
-            dim_metodo_data = pd.read_csv(latest_dim_metodo)
-            worksheet1 = create_or_update_worksheet(spreadsheet, "dim_metodo_fase2", dim_metodo_data)
+        latest_dim_metodo = find_latest_file("dim_metodo_regional_FASE2_*.csv")
+        if latest_dim_metodo:
+            dim_metodo_data = read_csv_cached(latest_dim_metodo)
+            abas.append(("dim_metodo_fase2", dim_metodo_data, None))
             print(f"📊 Dim_metodo Fase 2 carregado: {latest_dim_metodo}")
         else:
             print("⚠️ Arquivo dim_metodo_regional_FASE2 não encontrado")
         
-        # 2. Comparação fatores
-        comparacao_files = glob.glob("configs/relatorio_comparacao_fatores_*.csv")
-        if comparacao_files:
-            latest_comparacao = max(comparacao_files)
-            comparacao_data = pd.read_csv(latest_comparacao)
-            worksheet2 = create_or_update_worksheet(spreadsheet, "comparacao_fatores", comparacao_data)
-            format_comparacao_sheet(worksheet2, comparacao_data)
+        # 2. Comparação fatores (lida uma vez; alimenta também os itens 3 e 4)
+        comparacao_data = pd.DataFrame()
+        latest_comparacao = find_latest_file("relatorio_comparacao_fatores_*.csv")
+        if latest_comparacao:
+            comparacao_data = read_csv_fast(latest_comparacao)
+            abas.append(("comparacao_fatores", comparacao_data, format_comparacao_sheet))
             print(f"📋 Comparação carregada: {latest_comparacao}")
         else:
             print("⚠️ Arquivo relatorio_comparacao_fatores não encontrado")
         
         # 3. Dashboard insights
-        dashboard_data = create_dashboard_data()
+        dashboard_data = create_dashboard_data(comparacao_data)
         if not dashboard_data.empty:
-            create_or_update_worksheet(spreadsheet, "dashboard_insights", dashboard_data)
+            abas.append(("dashboard_insights", dashboard_data, None))
         else:
             print("⚠️ Dashboard data vazio - pulando")
         
         # 4. Análise regional
-        regional_data = create_regional_analysis()
+        regional_data = create_regional_analysis(comparacao_data)
         if not regional_data.empty:
-            create_or_update_worksheet(spreadsheet, "fatores_por_regiao", regional_data)
+            abas.append(("fatores_por_regiao", regional_data, None))
         else:
             print("⚠️ Análise regional vazia - pulando")
         
+        def enviar_aba(aba):
+            sheet_name, data, formatar = aba
+            worksheet = create_or_update_worksheet(spreadsheet, sheet_name, data, ws_by_title)
+            if formatar is not None:
+                formatar(worksheet, data)
+        
+        # Chamadas à API são só latência de rede: as abas seguem concorrentes
+        # (o 429 é tratado por call_with_backoff)
+        if abas:
+            with ThreadPoolExecutor(max_workers=len(abas)) as executor:
+                list(executor.map(enviar_aba, abas))
+        
         print("🎉 UPLOAD FASE 2 CONCLUÍDO COM SUCESSO!")
         print(f"🔗 Acesse: https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}")
         
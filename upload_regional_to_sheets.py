@@ -2,10 +2,11 @@
 """
 Script para atualizar Google Sheets com a estrutura regional completa
 """
-import pandas as pd
 import gspread
 from google.oauth2.service_account import Credentials
 
+from upload_fase2_to_sheets import read_csv_fast
+
 def atualizar_google_sheets_regional():
     """Atualiza o Google Sheets com a estrutura regional de 270 linhas"""
     
@@ -21,7 +22,7 @@ def atualizar_google_sheets_regional():
     try:
         # 1. Carregar CSV
         print("📁 Carregando arquivo CSV...")
-        df = pd.read_csv(csv_path)
+        df = read_csv_fast(csv_path)
         print(f"✅ Dados carregados: {len(df)} linhas × {len(df.columns)} colunas")
         print(f"   📍 {df['uf'].nunique()} UF × {df['id_metodo'].nunique()} métodos")
         
@@ -48,36 +49,28 @@ def atualizar_google_sheets_regional():
         # Header + dados
         all_data = [df.columns.tolist()] + df.values.tolist()
         
-        # 5. Upload em lotes para evitar timeout
+        # 5. Upload em uma única requisição (header + 270 linhas cabem folgado)
         print(f"⬆️ Fazendo upload de {len(all_data)} linhas...")
+        resposta = spreadsheet.values_batch_update({
+            'valueInputOption': 'RAW',
+            'data': [{
+                'range': f"'{aba_name}'!A1",
+                'majorDimension': 'ROWS',
+                'values': all_data
+            }]
+        })
         
-        # Upload do cabeçalho
-        print("   📋 Uploading header...")
-        worksheet.update('A1:T1', [all_data[0]])
-        
-        # Upload dos dados em lotes de 50 linhas
-        batch_size = 50
-        data_rows = all_data[1:]  # Pular o header
-        
-        for i in range(0, len(data_rows), batch_size):
-            batch = data_rows[i:i+batch_size]
-            start_row = i + 2  # +2 porque: +1 para índice baseado em 1, +1 para pular header
-            end_row = start_row + len(batch) - 1
-            
-            range_name = f"A{start_row}:T{end_row}"
-            worksheet.update(range_name, batch)
-            
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(data_rows) // batch_size) + 1
-            print(f"   📦 Lote {batch_num}/{total_batches}: linhas {start_row}-{end_row}")
-        
-        # 6. Validação final
+        # 6. Validação final: contagens confirmadas pela própria resposta do
+        # batchUpdate (sem baixar de volta a aba com get_all_values)
         print("🔍 Validando resultado...")
-        sheet_data = worksheet.get_all_values()
+        linhas = resposta.get('totalUpdatedRows', 0)
+        colunas = resposta.get('totalUpdatedColumns', 0)
+        if linhas != len(all_data):
+            print(f"⚠️ Esperadas {len(all_data)} linhas, API confirmou {linhas}")
         
         print(f"✅ Upload concluído:")
-        print(f"   📊 {len(sheet_data)} linhas no Google Sheets")
-        print(f"   📊 {len(sheet_data[0])} colunas")
+        print(f"   📊 {linhas} linhas no Google Sheets")
+        print(f"   📊 {colunas} colunas")
         print(f"   📍 Estrutura: 10 métodos × 27 UF = 270 linhas + header")
         
         # 7. Resumo das correções implementadas